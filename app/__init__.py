@@ -1,6 +1,8 @@
 # app/__init__.py
 from flask import Flask
 from flask_socketio import SocketIO
+import json
+import logging
 import os
 
 from app.blueprints.arp import arp_bp
@@ -17,13 +19,26 @@ from app.blueprints.vendors import vendors_bp
 
 socketio = SocketIO()
 
+logger = logging.getLogger(__name__)
 
-def create_app(config_name='development'):
-    """Application factory pattern"""
+DEFAULT_SECRET_KEY = 'dev-secret-key-change-in-production'
+
+
+def create_app(config_name='development', socketio_options=None, config_file=None):
+    """
+    Application factory pattern
+
+    Args:
+        config_name: 'development' (run.py) or 'production' (serve.py)
+        socketio_options: Extra SocketIO options, e.g. async_mode and message_queue from serve.py
+        config_file: YAML configuration; default config.yaml in this directory
+    """
     app = Flask(__name__)
 
     # Basic configuration
-    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
+    app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', DEFAULT_SECRET_KEY)
+    if config_name == 'production' and app.config['SECRET_KEY'] == DEFAULT_SECRET_KEY:
+        logger.warning("SECRET_KEY is not set; sessions are signed with the development key")
     app.config['DATABASE'] = os.path.join(app.instance_path, 'assets.db')
 
     # Ensure instance folder exists
@@ -33,7 +48,7 @@ def create_app(config_name='development'):
         pass
 
     # Initialize SocketIO
-    socketio.init_app(app, cors_allowed_origins="*")
+    socketio.init_app(app, cors_allowed_origins="*", **(socketio_options or {}))
 
     # Register blueprints
     from app.blueprints.auth import auth_bp
@@ -61,15 +76,34 @@ def create_app(config_name='development'):
     app.register_blueprint(notes_bp, url_prefix='/notes')
 
     from app.config_loader import load_config
-    config = load_config('config.yaml')
+    config = load_config(config_file or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.yaml'))
     auth_config = config.get('authentication', {})
     init_auth_manager(auth_config)
 
+    from app.blueprints.terminal.routes import manager as terminal_sessions
+    terminal_sessions.configure(**config.get('terminal', {}))
+
     # Coverage analysis configuration
     app.config['SESSIONS_YAML'] = 'pcng/sessions.yaml'
     app.config['CAPTURE_DIR'] = 'pcng/capture'
     app.config['FINGERPRINTS_DIR'] = 'pcng/fingerprints'
 
+    @app.template_filter('from_json')
+    def from_json_filter(value):
+        """Custom Jinja2 filter to parse JSON strings"""
+        if value:
+            try:
+                return json.loads(value)
+            except (json.JSONDecodeError, TypeError):
+                return []
+        return []
+
+    # Apply login_required to dashboard routes (registered views live on the app, not the blueprint)
+    from app.blueprints.auth.routes import login_required
+    for endpoint, view_func in list(app.view_functions.items()):
+        if endpoint.startswith(f"{dashboard_bp.name}."):
+            app.view_functions[endpoint] = login_required(view_func)
+
     # Root route redirect
     @app.route('/')
     def index():
@@ -2,7 +2,10 @@
 from flask import render_template, jsonify, request
 from . import arp_bp
 from arp_cat_util import ArpCatUtil
+from app.utils.database import get_db_connection
+from contextlib import contextmanager
 import os
+import threading
 import traceback
 
 # Path to ARP database
@@ -12,6 +15,24 @@ ARP_DB = os.path.join(PROJECT_ROOT, 'arp_cat.db')
 print(f"ARP_DB path: {ARP_DB}")
 print(f"ARP_DB exists: {os.path.exists(ARP_DB)}")
 
+_arp_schema_checked = False
+_arp_schema_lock = threading.Lock()
+
+
+@contextmanager
+def open_arp_util():
+    """ArpCatUtil on a pooled arp_cat.db connection (read-only for GET requests)"""
+    global _arp_schema_checked
+    # Opening ArpCatUtil may create or migrate the schema, which needs a writable connection
+    with _arp_schema_lock:
+        if not _arp_schema_checked:
+            with get_db_connection(ARP_DB, readonly=False) as conn:
+                ArpCatUtil(ARP_DB, conn=conn)
+            _arp_schema_checked = True
+
+    with get_db_connection(ARP_DB) as conn:
+        yield ArpCatUtil(ARP_DB, conn=conn)
+
 
 @arp_bp.route('/search')
 def search_page():
@@ -24,7 +45,7 @@ def api_stats():
     """Get database statistics"""
     try:
         print(f"Attempting to open ARP DB: {ARP_DB}")
-        with ArpCatUtil(ARP_DB) as util:
+        with open_arp_util() as util:
             print("ArpCatUtil opened successfully")
             stats = util.get_statistics()
             print(f"Stats retrieved: {stats}")
@@ -43,7 +64,7 @@ def api_search_ip(ip):
 
     try:
         print(f"Searching for IP: {ip}, history={history}")
-        with ArpCatUtil(ARP_DB) as util:
+        with open_arp_util() as util:
             results = util.search_ip(ip, history=history)
             print(f"Found {len(results)} results")
             return jsonify({
@@ -66,7 +87,7 @@ def api_search_mac(mac):
 
     try:
         print(f"Searching for MAC: {mac}, history={history}")
-        with ArpCatUtil(ARP_DB) as util:
+        with open_arp_util() as util:
             results = util.search_mac(mac, history=history)
             print(f"Found {len(results)} results")
             return jsonify({
@@ -84,11 +105,47 @@ def api_search_mac(mac):
         return jsonify({'success': False, 'error': str(e), 'traceback': error_trace}), 500
 
 
+@arp_bp.route('/api/search/range')
+def api_search_range():
+    """Search a CIDR block (?ip=10.20.30.0/24) or MAC prefix/OUI (?mac=00:1B:17), one page at a time"""
+    network = request.args.get('ip', '').strip()
+    prefix = request.args.get('mac', '').strip()
+    history = request.args.get('history', 'false').lower() == 'true'
+    limit = request.args.get('limit', 100, type=int)
+    cursor = request.args.get('cursor', type=int)
+
+    if bool(network) == bool(prefix):
+        return jsonify({'success': False, 'error': 'Specify exactly one of ip (CIDR) or mac (prefix)'}), 400
+
+    try:
+        print(f"Range search: ip={network or '-'} mac={prefix or '-'}, history={history}, cursor={cursor}")
+        with open_arp_util() as util:
+            if network:
+                page = util.search_ip_network(network, history=history, limit=limit, cursor=cursor)
+            else:
+                page = util.search_mac_prefix(prefix, history=history, limit=limit, cursor=cursor)
+            print(f"Found {len(page['results'])} results")
+            return jsonify({
+                'success': True,
+                'query': network or prefix,
+                'count': len(page['results']),
+                'results': page['results'],
+                'next_cursor': page['next_cursor']
+            })
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        error_trace = traceback.format_exc()
+        print(f"ERROR in api_search_range: {e}")
+        print(f"Full traceback:\n{error_trace}")
+        return jsonify({'success': False, 'error': str(e), 'traceback': error_trace}), 500
+
+
 @arp_bp.route('/api/device/<hostname>')
 def api_device_summary(hostname):
     """Get ARP summary for specific device"""
     try:
-        with ArpCatUtil(ARP_DB) as util:
+        with open_arp_util() as util:
             summary = util.get_device_summary(hostname)
             return jsonify({
                 'success': True,
@@ -0,0 +1,191 @@
+# app/blueprints/assets/queries.py
+"""
+Device listing queries.
+
+v_device_status aggregates captures and fingerprint extractions for every device, so
+counting, filtering and paging directly against it re-runs the whole GROUP BY each time.
+Here a page of device ids is picked from devices and its dimension tables using a keyset
+on (last_updated, name). Only those ids are then read from v_device_status, which SQLite
+resolves by primary key. Counts and filter options are cached for a short time.
+"""
+import threading
+import time
+
+# Seconds a cached count or filter option list stays valid; loaders write to assets.db
+# outside the app, so the cache cannot rely on invalidation alone
+LISTING_CACHE_TTL = 60
+
+# Sort key matching v_device_status ORDER BY last_updated DESC; NULL timestamps sort last
+LISTING_SORT_KEY = "COALESCE(d.timestamp, '')"
+
+DEVICE_LISTING_COLUMNS = """
+    id, name, normalized_name, site_name, site_code,
+    vendor_name, device_type_name, model, os_version,
+    management_ip, is_stack, stack_count, have_sn,
+    current_captures, capture_types,
+    last_fingerprint, last_fingerprint_success,
+    last_updated, role_name, is_infrastructure
+"""
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _database_file(conn):
+    return conn.execute("PRAGMA database_list").fetchone()[2]
+
+
+def _cached(key, loader):
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry and now - entry[0] < LISTING_CACHE_TTL:
+            return entry[1]
+    value = loader()
+    with _cache_lock:
+        _cache[key] = (now, value)
+    return value
+
+
+def invalidate_device_listing_cache():
+    """Drop cached counts and filter options after devices change"""
+    with _cache_lock:
+        _cache.clear()
+
+
+def device_filter_clause(filters):
+    """
+    WHERE clause over devices d / vendors v / device_roles dr for the listing filters.
+
+    Same semantics as filtering the v_device_status columns, without the aggregate.
+    """
+    conditions = []
+    params = []
+
+    search = filters.get('search')
+    if search:
+        conditions.append("(d.name LIKE ? OR d.normalized_name LIKE ? OR d.management_ip LIKE ? OR d.model LIKE ?)")
+        search_param = f"%{search}%"
+        params.extend([search_param, search_param, search_param, search_param])
+
+    if filters.get('vendor'):
+        conditions.append("v.name = ?")
+        params.append(filters['vendor'])
+
+    if filters.get('site'):
+        conditions.append("d.site_code = ?")
+        params.append(filters['site'])
+
+    if filters.get('role'):
+        conditions.append("dr.name = ?")
+        params.append(filters['role'])
+
+    if filters.get('stack') == 'yes':
+        conditions.append("d.is_stack = 1")
+    elif filters.get('stack') == 'no':
+        conditions.append("d.is_stack = 0")
+
+    return " AND ".join(conditions) or "1=1", params
+
+
+def _filter_signature(filters):
+    return tuple(sorted((key, value) for key, value in filters.items() if value))
+
+
+def count_devices(conn, filters):
+    """Number of devices matching filters, cached per filter signature"""
+    where_clause, params = device_filter_clause(filters)
+
+    def load():
+        return conn.execute(f"""
+            SELECT COUNT(*)
+            FROM devices d
+            LEFT JOIN vendors v ON d.vendor_id = v.id
+            LEFT JOIN device_roles dr ON d.role_id = dr.id
+            WHERE {where_clause}
+        """, params).fetchone()[0]
+
+    return _cached(('count', _database_file(conn), _filter_signature(filters)), load)
+
+
+def device_filter_options(conn):
+    """Vendor names, site codes and role names that have at least one device"""
+    def load():
+        return {
+            'vendors': [row[0] for row in conn.execute("""
+                SELECT name FROM vendors v
+                WHERE EXISTS (SELECT 1 FROM devices d WHERE d.vendor_id = v.id)
+                ORDER BY name
+            """)],
+            'sites': [row[0] for row in conn.execute("""
+                SELECT code FROM sites s
+                WHERE EXISTS (SELECT 1 FROM devices d WHERE d.site_code = s.code)
+                ORDER BY code
+            """)],
+            'roles': [row[0] for row in conn.execute("""
+                SELECT name FROM device_roles dr
+                WHERE EXISTS (SELECT 1 FROM devices d WHERE d.role_id = dr.id)
+                ORDER BY name
+            """)],
+        }
+
+    return _cached(('options', _database_file(conn)), load)
+
+
+def list_devices_page(conn, filters, per_page, after=None, before=None, offset=0):
+    """
+    One page of the device listing, ordered by last_updated DESC, name.
+
+    after / before are the ids of the last / first device on the neighbouring page, so
+    Next / Previous cost the same on any page. Without a cursor, offset is used (numbered
+    page links); it only skips rows of the devices table, never the aggregate.
+
+    Returns:
+        (devices as dicts in listing order, True if more devices follow in that direction)
+    """
+    where_clause, params = device_filter_clause(filters)
+    descending = True
+    cursor_id = after if after is not None else before
+
+    if cursor_id is not None:
+        boundary = conn.execute(f"SELECT {LISTING_SORT_KEY}, d.name, d.id FROM devices d WHERE d.id = ?",
+                                (cursor_id,)).fetchone()
+        if boundary is not None:
+            # Walk away from the boundary device: forwards for after, backwards for before
+            newer, later = ('<', '>') if after is not None else ('>', '<')
+            descending = after is not None
+            where_clause += f"""
+                AND ({LISTING_SORT_KEY} {newer} ?
+                     OR ({LISTING_SORT_KEY} = ? AND (d.name {later} ? OR (d.name = ? AND d.id {later} ?))))
+            """
+            sort_key, name, device_id = boundary
+            params = params + [sort_key, sort_key, name, name, device_id]
+            offset = 0
+
+    direction, reverse_direction = ('DESC', 'ASC') if descending else ('ASC', 'DESC')
+    rows = conn.execute(f"""
+        SELECT d.id
+        FROM devices d
+        LEFT JOIN vendors v ON d.vendor_id = v.id
+        LEFT JOIN device_roles dr ON d.role_id = dr.id
+        WHERE {where_clause}
+        ORDER BY {LISTING_SORT_KEY} {direction}, d.name {reverse_direction}, d.id {reverse_direction}
+        LIMIT ? OFFSET ?
+    """, params + [per_page + 1, max(offset, 0)]).fetchall()
+
+    has_more = len(rows) > per_page
+    page_ids = [row[0] for row in rows[:per_page]]
+    if not descending:
+        page_ids.reverse()
+
+    if not page_ids:
+        return [], has_more
+
+    placeholders = ','.join('?' * len(page_ids))
+    by_id = {row['id']: dict(row) for row in conn.execute(f"""
+        SELECT {DEVICE_LISTING_COLUMNS}
+        FROM v_device_status
+        WHERE id IN ({placeholders})
+    """, page_ids)}
+
+    return [by_id[device_id] for device_id in page_ids if device_id in by_id], has_more
@@ -5,12 +5,18 @@ import os
 from flask import render_template, request, jsonify, redirect, url_for, flash
 from . import assets_bp
 from app.utils.database import get_db_connection
+from app.utils.csv_export import stream_csv_export
+from app.utils.http_cache import cached_json, file_validators, not_modified, values_etag
 import sqlite3
 import math
 import re
 from datetime import datetime
 
 from ..notes.models import NoteAssociation
+from .queries import count_devices, device_filter_options, invalidate_device_listing_cache, list_devices_page
+from pcng.fingerprint_store import FingerprintStore
+
+FINGERPRINT_DB = 'pcng/fingerprint_store.db'
 
 
 # ========== EXISTING READ OPERATIONS ==========
@@ -27,91 +33,38 @@ def devices():
     role_filter = request.args.get('role', '')
     stack_filter = request.args.get('stack', '')
 
+    # Keyset cursors set by the Next / Previous links
+    after = request.args.get('after', type=int)
+    before = request.args.get('before', type=int)
+
     # Ensure reasonable pagination limits
     per_page = min(max(per_page, 10), 100)
+    page = max(page, 1)
+
+    filters = {
+        'search': search,
+        'vendor': vendor_filter,
+        'site': site_filter,
+        'role': role_filter,
+        'stack': stack_filter
+    }
 
     try:
         with get_db_connection() as conn:
-            cursor = conn.cursor()
-
-            # Base query using the v_device_status view
-            base_query = """
-                SELECT 
-                    id, name, normalized_name, site_name, site_code,
-                    vendor_name, device_type_name, model, os_version,
-                    management_ip, is_stack, stack_count, have_sn,
-                    current_captures, capture_types,
-                    last_fingerprint, last_fingerprint_success,
-                    last_updated, role_name, is_infrastructure
-                FROM v_device_status
-                WHERE 1=1
-            """
-
-            # Count query for pagination
-            count_query = """
-                SELECT COUNT(*) FROM v_device_status WHERE 1=1
-            """
-
-            # Build WHERE conditions
-            conditions = []
-            params = []
-
-            if search:
-                conditions.append("(name LIKE ? OR normalized_name LIKE ? OR management_ip LIKE ? OR model LIKE ?)")
-                search_param = f"%{search}%"
-                params.extend([search_param, search_param, search_param, search_param])
-
-            if vendor_filter:
-                conditions.append("vendor_name = ?")
-                params.append(vendor_filter)
-
-            if site_filter:
-                conditions.append("site_code = ?")
-                params.append(site_filter)
-
-            if role_filter:
-                conditions.append("role_name = ?")
-                params.append(role_filter)
-
-            if stack_filter == 'yes':
-                conditions.append("is_stack = 1")
-            elif stack_filter == 'no':
-                conditions.append("is_stack = 0")
-
-            # Apply conditions
-            if conditions:
-                where_clause = " AND " + " AND ".join(conditions)
-                base_query += where_clause
-                count_query += where_clause
-
-            # Get total count
-            cursor.execute(count_query, params)
-            total_devices = cursor.fetchone()[0]
-
-            # Calculate pagination
+            # Count and filter options are cached; only the page itself touches v_device_status
+            total_devices = count_devices(conn, filters)
             total_pages = math.ceil(total_devices / per_page)
-            offset = (page - 1) * per_page
-
-            # Add ordering and pagination
-            base_query += " ORDER BY last_updated DESC, name LIMIT ? OFFSET ?"
-            params.extend([per_page, offset])
 
-            # Execute main query
-            cursor.execute(base_query, params)
-            devices = [dict(row) for row in cursor.fetchall()]
+            devices, has_more = list_devices_page(conn, filters, per_page, after=after, before=before,
+                                                  offset=(page - 1) * per_page)
 
-            # Get filter options
-            cursor.execute(
-                "SELECT DISTINCT vendor_name FROM v_device_status WHERE vendor_name IS NOT NULL ORDER BY vendor_name")
-            vendors = [row[0] for row in cursor.fetchall()]
-
-            cursor.execute(
-                "SELECT DISTINCT site_code FROM v_device_status WHERE site_code IS NOT NULL ORDER BY site_code")
-            sites = [row[0] for row in cursor.fetchall()]
+            if before is not None:
+                has_prev, has_next = has_more, True
+            else:
+                has_prev, has_next = page > 1, has_more
 
-            cursor.execute(
-                "SELECT DISTINCT role_name FROM v_device_status WHERE role_name IS NOT NULL ORDER BY role_name")
-            roles = [row[0] for row in cursor.fetchall()]
+            options = device_filter_options(conn)
+            vendors, sites, roles = options['vendors'], options['sites'], options['roles']
 
             # Pagination info
             pagination = {
@@ -119,10 +72,12 @@ def devices():
                 'per_page': per_page,
                 'total': total_devices,
                 'total_pages': total_pages,
-                'has_prev': page > 1,
-                'has_next': page < total_pages,
-                'prev_num': page - 1 if page > 1 else None,
-                'next_num': page + 1 if page < total_pages else None
+                'has_prev': has_prev,
+                'has_next': has_next,
+                'prev_num': page - 1 if has_prev else None,
+                'next_num': page + 1 if has_next else None,
+                'prev_cursor': devices[0]['id'] if has_prev and devices else None,
+                'next_cursor': devices[-1]['id'] if has_next and devices else None
             }
 
             return render_template('assets/devices.html',
@@ -131,13 +86,7 @@ def devices():
                                    vendors=vendors,
                                    sites=sites,
                                    roles=roles,
-                                   filters={
-                                       'search': search,
-                                       'vendor': vendor_filter,
-                                       'site': site_filter,
-                                       'role': role_filter,
-                                       'stack': stack_filter
-                                   })
+                                   filters=filters)
 
     except Exception as e:
         flash(f'Database error: {str(e)}', 'error')
@@ -288,6 +237,7 @@ def device_create():
 
                 device_id = cursor.lastrowid
                 conn.commit()
+                invalidate_device_listing_cache()
 
                 flash(f'Device "{name}" created successfully', 'success')
                 return redirect(url_for('assets.device_detail', device_id=device_id))
@@ -389,6 +339,7 @@ def device_edit(device_id):
                 ))
 
                 conn.commit()
+                invalidate_device_listing_cache()
 
                 flash(f'Device "{name}" updated successfully', 'success')
                 return redirect(url_for('assets.device_detail', device_id=device_id))
@@ -504,6 +455,7 @@ def device_delete(device_id):
             cursor.execute("DELETE FROM devices WHERE id = ?", (device_id,))
 
             conn.commit()
+            invalidate_device_listing_cache()
 
             flash(f'Device "{device_name}" deleted successfully', 'success')
             return redirect(url_for('assets.devices'))
@@ -519,10 +471,6 @@ def device_delete(device_id):
 @assets_bp.route('/devices/export')
 def devices_export():
     """Export devices to CSV with current filters"""
-    from flask import make_response
-    import io
-    import csv
-
     # Get filter parameters (same as main devices route)
     search = request.args.get('search', '').strip()
     vendor_filter = request.args.get('vendor', '')
@@ -531,119 +479,99 @@ def devices_export():
     stack_filter = request.args.get('stack', '')
 
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
+        # Use same query logic as devices route
+        base_query = """
+            SELECT 
+                name, normalized_name, site_code, site_name,
+                vendor_name, device_type_name, model, os_version,
+                management_ip, role_name, is_infrastructure,
+                is_stack, stack_count, have_sn,
+                current_captures, capture_types,
+                last_fingerprint, last_fingerprint_success,
+                last_updated
+            FROM v_device_status
+            WHERE 1=1
+        """
+
+        conditions = []
+        params = []
+
+        if search:
+            conditions.append("(name LIKE ? OR normalized_name LIKE ? OR management_ip LIKE ? OR model LIKE ?)")
+            search_param = f"%{search}%"
+            params.extend([search_param, search_param, search_param, search_param])
+
+        if vendor_filter:
+            conditions.append("vendor_name = ?")
+            params.append(vendor_filter)
+
+        if site_filter:
+            conditions.append("site_code = ?")
+            params.append(site_filter)
+
+        if role_filter:
+            conditions.append("role_name = ?")
+            params.append(role_filter)
+
+        if stack_filter == 'yes':
+            conditions.append("is_stack = 1")
+        elif stack_filter == 'no':
+            conditions.append("is_stack = 0")
+
+        if conditions:
+            base_query += " AND " + " AND ".join(conditions)
+
+        base_query += " ORDER BY last_updated DESC, name"
+
+        def device_row(device):
+            return [
+                device['name'],
+                device['normalized_name'],
+                device['site_code'] or '',
+                device['site_name'] or '',
+                device['vendor_name'] or '',
+                device['device_type_name'] or '',
+                device['model'] or '',
+                device['os_version'] or '',
+                device['management_ip'] or '',
+                device['role_name'] or '',
+                'Yes' if device['is_infrastructure'] else 'No',
+                'Yes' if device['is_stack'] else 'No',
+                device['stack_count'] or 0,
+                'Yes' if device['have_sn'] else 'No',
+                device['current_captures'] or 0,
+                device['capture_types'] or 0,
+                device['last_fingerprint'] or '',
+                'Yes' if device['last_fingerprint_success'] else 'No',
+                device['last_updated'] or ''
+            ]
 
-            # Use same query logic as devices route
-            base_query = """
-                SELECT 
-                    name, normalized_name, site_code, site_name,
-                    vendor_name, device_type_name, model, os_version,
-                    management_ip, role_name, is_infrastructure,
-                    is_stack, stack_count, have_sn,
-                    current_captures, capture_types,
-                    last_fingerprint, last_fingerprint_success,
-                    last_updated
-                FROM v_device_status
-                WHERE 1=1
-            """
-
-            conditions = []
-            params = []
-
-            if search:
-                conditions.append("(name LIKE ? OR normalized_name LIKE ? OR management_ip LIKE ? OR model LIKE ?)")
-                search_param = f"%{search}%"
-                params.extend([search_param, search_param, search_param, search_param])
-
-            if vendor_filter:
-                conditions.append("vendor_name = ?")
-                params.append(vendor_filter)
-
-            if site_filter:
-                conditions.append("site_code = ?")
-                params.append(site_filter)
-
-            if role_filter:
-                conditions.append("role_name = ?")
-                params.append(role_filter)
-
-            if stack_filter == 'yes':
-                conditions.append("is_stack = 1")
-            elif stack_filter == 'no':
-                conditions.append("is_stack = 0")
-
-            if conditions:
-                base_query += " AND " + " AND ".join(conditions)
-
-            base_query += " ORDER BY last_updated DESC, name"
-
-            cursor.execute(base_query, params)
-            devices = [dict(row) for row in cursor.fetchall()]
-
-            # Create CSV in memory
-            output = io.StringIO()
-            writer = csv.writer(output)
-
-            # Write header
-            writer.writerow([
-                'Name', 'Normalized Name', 'Site Code', 'Site Name',
-                'Vendor', 'Device Type', 'Model', 'OS Version',
-                'Management IP', 'Role', 'Is Infrastructure',
-                'Is Stack', 'Stack Count', 'Has Serials',
-                'Current Captures', 'Capture Types',
-                'Last Fingerprint', 'Fingerprint Success',
-                'Last Updated'
-            ])
-
-            # Write device rows
-            for device in devices:
-                writer.writerow([
-                    device['name'],
-                    device['normalized_name'],
-                    device['site_code'] or '',
-                    device['site_name'] or '',
-                    device['vendor_name'] or '',
-                    device['device_type_name'] or '',
-                    device['model'] or '',
-                    device['os_version'] or '',
-                    device['management_ip'] or '',
-                    device['role_name'] or '',
-                    'Yes' if device['is_infrastructure'] else 'No',
-                    'Yes' if device['is_stack'] else 'No',
-                    device['stack_count'] or 0,
-                    'Yes' if device['have_sn'] else 'No',
-                    device['current_captures'] or 0,
-                    device['capture_types'] or 0,
-                    device['last_fingerprint'] or '',
-                    'Yes' if device['last_fingerprint_success'] else 'No',
-                    device['last_updated'] or ''
-                ])
-
-            # Create response
-            output.seek(0)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-
-            # Build filename based on filters
-            filename_parts = ['devices']
-            if search:
-                filename_parts.append(f'search_{search[:20]}')
-            if vendor_filter:
-                filename_parts.append(vendor_filter)
-            if site_filter:
-                filename_parts.append(site_filter)
-            if role_filter:
-                filename_parts.append(role_filter)
-            if stack_filter:
-                filename_parts.append(f'stack_{stack_filter}')
-
-            filename = f"{'_'.join(filename_parts)}_{timestamp}.csv"
-
-            response = make_response(output.getvalue())
-            response.headers['Content-Type'] = 'text/csv'
-            response.headers['Content-Disposition'] = f'attachment; filename={filename}'
-
-            return response
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+        # Build filename based on filters
+        filename_parts = ['devices']
+        if search:
+            filename_parts.append(f'search_{search[:20]}')
+        if vendor_filter:
+            filename_parts.append(vendor_filter)
+        if site_filter:
+            filename_parts.append(site_filter)
+        if role_filter:
+            filename_parts.append(role_filter)
+        if stack_filter:
+            filename_parts.append(f'stack_{stack_filter}')
+
+        filename = f"{'_'.join(filename_parts)}_{timestamp}.csv"
+
+        return stream_csv_export(base_query, params, [
+            'Name', 'Normalized Name', 'Site Code', 'Site Name',
+            'Vendor', 'Device Type', 'Model', 'OS Version',
+            'Management IP', 'Role', 'Is Infrastructure',
+            'Is Stack', 'Stack Count', 'Has Serials',
+            'Current Captures', 'Capture Types',
+            'Last Fingerprint', 'Fingerprint Success',
+            'Last Updated'
+        ], filename, format_row=device_row)
 
     except Exception as e:
         flash(f'Export error: {str(e)}', 'error')
@@ -774,17 +702,23 @@ def api_device_capture_content(device_id, capture_type):
             if not os.path.exists(file_path):
                 return jsonify({'error': 'Capture file not found on disk', 'status': 'error'}), 404
 
+            # Unchanged since the browser's copy: answer without reading the file
+            etag, last_modified = file_validators(file_path, file_size, capture[2])
+            cached = not_modified(etag, last_modified)
+            if cached is not None:
+                return cached
+
             with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
                 content = f.read()
 
-            return jsonify({
+            return cached_json({
                 'content': content,
                 'size': file_size,
                 'lines': len(content.splitlines()),
                 'capture_type': capture_type,
                 'timestamp': capture[2],
                 'status': 'success'
-            })
+            }, etag, last_modified)
 
     except Exception as e:
         return jsonify({'error': str(e), 'status': 'error'}), 500
@@ -814,6 +748,11 @@ def api_device_inventory_content(device_id):
 
             components = [dict(row) for row in cursor.fetchall()]
 
+            etag = values_etag(tuple(device), [tuple(comp.values()) for comp in components])
+            cached = not_modified(etag)
+            if cached is not None:
+                return cached
+
             if not components:
                 content = f"No inventory data available for {device[0]}"
             else:
@@ -848,12 +787,12 @@ def api_device_inventory_content(device_id):
 
                 content = "\n".join(lines)
 
-            return jsonify({
+            return cached_json({
                 'content': content,
                 'component_count': len(components),
                 'device_name': device[0],
                 'status': 'success'
-            })
+            }, etag)
 
     except Exception as e:
         return jsonify({'error': str(e), 'status': 'error'}), 500
@@ -872,11 +811,20 @@ def api_device_fingerprint_content(device_id, timestamp):
             if not device:
                 return jsonify({'error': 'Device not found', 'status': 'error'}), 404
 
-            # Fingerprint files are typically stored in pcng/fingerprints/{normalized_name}_{timestamp}.json
-            # Adjust the path based on your actual structure
             normalized_name = device[1]
 
-            # Try different possible paths
+            # Fingerprint store first (keyed by session display name, also indexed by reported hostname)
+            fingerprint_data = None
+            found_path = None
+            store = FingerprintStore.open_existing(FINGERPRINT_DB)
+            if store:
+                for name in (device[0], normalized_name):
+                    fingerprint_data = store.find(name)
+                    if fingerprint_data:
+                        found_path = f"{FINGERPRINT_DB}#{name}"
+                        break
+
+            # Otherwise fingerprint files, typically pcng/fingerprints/{normalized_name}_{timestamp}.json
             possible_paths = [
                 f"pcng/fingerprints/{normalized_name}_{timestamp}.json",
                 f"pcng/fingerprints/{normalized_name}.json",
@@ -884,10 +832,9 @@ def api_device_fingerprint_content(device_id, timestamp):
                 f"fingerprints/{normalized_name}.json",
             ]
 
-            fingerprint_data = None
-            found_path = None
-
             for path in possible_paths:
+                if fingerprint_data:
+                    break
                 if os.path.exists(path):
                     found_path = path
                     with open(path, 'r', encoding='utf-8') as f:
@@ -1,17 +1,12 @@
 from flask import render_template, jsonify, request
-import sqlite3
+import os
 from datetime import datetime, timedelta
 from pathlib import Path
 
 from app.blueprints.changes import changes_bp
+from app.utils.database import get_db_connection
+from app.utils.http_cache import cached_response, not_modified, page_etag
 
-DB_PATH = 'assets.db'
-
-
-def get_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
 
 @changes_bp.route('/')
 def index():
@@ -19,7 +14,7 @@ def index():
     hours = request.args.get('hours', 24, type=int)
     severity = request.args.get('severity', '')
 
-    with get_db() as conn:
+    with get_db_connection() as conn:
         cursor = conn.cursor()
 
         query = """
@@ -76,7 +71,7 @@ def index():
 @changes_bp.route('/device/<int:device_id>')
 def device_history(device_id):
     """Change history for a specific device"""
-    with get_db() as conn:
+    with get_db_connection() as conn:
         cursor = conn.cursor()
 
         # Get device info
@@ -105,7 +100,7 @@ def device_history(device_id):
 @changes_bp.route('/diff/<int:change_id>')
 def view_diff(change_id):
     """View diff for a specific change"""
-    with get_db() as conn:
+    with get_db_connection() as conn:
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -121,6 +116,25 @@ def view_diff(change_id):
 
         change = dict(cursor.fetchone())
 
+        # Content hashes of the two snapshots the diff was made from
+        cursor.execute("""
+            SELECT id, content_hash FROM capture_snapshots WHERE id IN (?, ?)
+        """, (change['previous_snapshot_id'], change['current_snapshot_id']))
+        snapshot_hashes = sorted(tuple(row) for row in cursor.fetchall())
+
+    # A change record and its diff file are written once, so repeat views are a 304
+    diff_signature = None
+    if change['diff_path']:
+        try:
+            diff_stat = os.stat(change['diff_path'])
+            diff_signature = (diff_stat.st_mtime_ns, diff_stat.st_size)
+        except OSError:
+            pass
+    etag = page_etag(sorted(change.items()), snapshot_hashes, diff_signature)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+
     # Read diff file
     diff_content = ""
     if change['diff_path']:
@@ -129,9 +143,10 @@ def view_diff(change_id):
         except Exception as e:
             diff_content = f"Error reading diff: {e}"
 
-    return render_template('changes/view_diff.html',
-                           change=change,
-                           diff_content=diff_content)
+    return cached_response(render_template('changes/view_diff.html',
+                                           change=change,
+                                           diff_content=diff_content),
+                           'text/html', etag)
 
 
 @changes_bp.route('/api/recent')
@@ -139,7 +154,7 @@ def api_recent_changes():
     """API endpoint for recent changes"""
     hours = request.args.get('hours', 24, type=int)
 
-    with get_db() as conn:
+    with get_db_connection() as conn:
         cursor = conn.cursor()
         cursor.execute("""
             SELECT 
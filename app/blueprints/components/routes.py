@@ -2,6 +2,7 @@
 from flask import render_template, request, jsonify
 from . import components_bp
 from app.utils.database import get_db_connection
+from app.utils.csv_export import stream_csv_export
 import math
 from collections import defaultdict
 
@@ -317,10 +318,6 @@ def api_by_type(component_type):
 @components_bp.route('/export')
 def export_csv():
     """Export filtered components to CSV"""
-    from flask import make_response
-    import csv
-    from io import StringIO
-
     # Get filter parameters (same as index route)
     search = request.args.get('search', '').strip()
     type_filter = request.args.get('type', '')
@@ -328,92 +325,70 @@ def export_csv():
     has_serial = request.args.get('has_serial', '')
 
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-
-            # Same query as index but without pagination
-            base_query = """
-                SELECT 
-                    c.name, c.description, c.serial, c.position,
-                    c.type, c.subtype, c.have_sn, c.extraction_confidence,
-                    d.name as device_name, d.model as device_model,
-                    d.site_code, v.name as vendor_name
-                FROM components c
-                JOIN devices d ON c.device_id = d.id
-                LEFT JOIN vendors v ON d.vendor_id = v.id
-                WHERE 1=1
-            """
-
-            conditions = []
-            params = []
-
-            if search:
-                conditions.append("""
-                    (c.name LIKE ? OR c.description LIKE ? OR 
-                     c.serial LIKE ? OR d.name LIKE ?)
-                """)
-                search_param = f"%{search}%"
-                params.extend([search_param] * 4)
-
-            if type_filter:
-                conditions.append("c.type = ?")
-                params.append(type_filter)
-
-            if vendor_filter:
-                conditions.append("v.name = ?")
-                params.append(vendor_filter)
-
-            if has_serial == 'yes':
-                conditions.append("c.have_sn = 1")
-            elif has_serial == 'no':
-                conditions.append("c.have_sn = 0")
-
-            if conditions:
-                where_clause = " AND " + " AND ".join(conditions)
-                base_query += where_clause
-
-            base_query += " ORDER BY d.name, c.type, c.position, c.name"
-
-            cursor.execute(base_query, params)
-            components = cursor.fetchall()
-
-            # Create CSV
-            si = StringIO()
-            writer = csv.writer(si)
-
-            # Write header
-            writer.writerow([
-                'Component Name', 'Description', 'Serial Number', 'Position',
-                'Type', 'Subtype', 'Has Serial', 'Extraction Confidence',
-                'Device Name', 'Device Model', 'Site', 'Vendor'
-            ])
-
-            # Write data
-            for comp in components:
-                writer.writerow([
-                    comp[0] or '',  # name
-                    comp[1] or '',  # description
-                    comp[2] or '',  # serial
-                    comp[3] or '',  # position
-                    comp[4] or '',  # type
-                    comp[5] or '',  # subtype
-                    'Yes' if comp[6] else 'No',  # have_sn
-                    f"{comp[7] * 100:.1f}%" if comp[7] else '',  # confidence
-                    comp[8] or '',  # device_name
-                    comp[9] or '',  # device_model
-                    comp[10] or '',  # site_code
-                    comp[11] or ''  # vendor_name
-                ])
-
-            # Create response
-            output = si.getvalue()
-            si.close()
-
-            response = make_response(output)
-            response.headers['Content-Type'] = 'text/csv'
-            response.headers['Content-Disposition'] = 'attachment; filename=components_export.csv'
-
-            return response
+        # Same query as index but without pagination
+        base_query = """
+            SELECT 
+                c.name, c.description, c.serial, c.position,
+                c.type, c.subtype, c.have_sn, c.extraction_confidence,
+                d.name as device_name, d.model as device_model,
+                d.site_code, v.name as vendor_name
+            FROM components c
+            JOIN devices d ON c.device_id = d.id
+            LEFT JOIN vendors v ON d.vendor_id = v.id
+            WHERE 1=1
+        """
+
+        conditions = []
+        params = []
+
+        if search:
+            conditions.append("""
+                (c.name LIKE ? OR c.description LIKE ? OR 
+                 c.serial LIKE ? OR d.name LIKE ?)
+            """)
+            search_param = f"%{search}%"
+            params.extend([search_param] * 4)
+
+        if type_filter:
+            conditions.append("c.type = ?")
+            params.append(type_filter)
+
+        if vendor_filter:
+            conditions.append("v.name = ?")
+            params.append(vendor_filter)
+
+        if has_serial == 'yes':
+            conditions.append("c.have_sn = 1")
+        elif has_serial == 'no':
+            conditions.append("c.have_sn = 0")
+
+        if conditions:
+            where_clause = " AND " + " AND ".join(conditions)
+            base_query += where_clause
+
+        base_query += " ORDER BY d.name, c.type, c.position, c.name"
+
+        def component_row(comp):
+            return [
+                comp[0] or '',  # name
+                comp[1] or '',  # description
+                comp[2] or '',  # serial
+                comp[3] or '',  # position
+                comp[4] or '',  # type
+                comp[5] or '',  # subtype
+                'Yes' if comp[6] else 'No',  # have_sn
+                f"{comp[7] * 100:.1f}%" if comp[7] else '',  # confidence
+                comp[8] or '',  # device_name
+                comp[9] or '',  # device_model
+                comp[10] or '',  # site_code
+                comp[11] or ''  # vendor_name
+            ]
+
+        return stream_csv_export(base_query, params, [
+            'Component Name', 'Description', 'Serial Number', 'Position',
+            'Type', 'Subtype', 'Has Serial', 'Extraction Confidence',
+            'Device Name', 'Device Model', 'Site', 'Vendor'
+        ], 'components_export.csv', format_row=component_row)
 
     except Exception as e:
         from flask import flash, redirect, url_for
@@ -7,13 +7,24 @@ from . import routes
 
 # app/blueprints/maps/routes.py
 import os
+import threading
+import time
 from pathlib import Path
-from flask import render_template, send_file, current_app, abort, jsonify
+from flask import render_template, send_file, current_app, abort, jsonify, Response
 from datetime import datetime
 from typing import Dict, List, Any
 
+from app.utils.http_cache import cached_file
+from pcng.map_thumbnails import ThumbnailQueue, thumbnails_available
 from . import maps_bp
 
+# Seconds between checks of the maps directories for added, removed or renamed files
+MAP_CATALOG_CHECK_INTERVAL = 5
+
+# Seconds after which the catalog is rescanned even if no directory changed; a map file
+# rewritten in place changes its own mtime but not its directory's
+MAP_CATALOG_MAX_AGE = 300
+
 
 class MapScanner:
     """Scans and manages network topology maps"""
@@ -151,29 +162,143 @@ class MapScanner:
         return None
 
 
+class MapCatalog:
+    """
+    Cached scan_maps() result shared by all requests.
+
+    A rescan happens when the mtime of the maps directory or of a site directory changes,
+    or after MAP_CATALOG_MAX_AGE. Directory mtimes are checked at most every
+    MAP_CATALOG_CHECK_INTERVAL seconds, so most reads return the cached data directly.
+    The returned data is shared and must not be modified.
+    """
+
+    def __init__(self, scanner: MapScanner = None):
+        self.scanner = scanner or MapScanner()
+        self._lock = threading.Lock()
+        self._maps_data = None
+        self._summary = None
+        self._signature = None
+        self._scanned_at = 0.0
+        self._checked_at = 0.0
+
+    def _directory_signature(self):
+        base_dir = self.scanner.maps_base_dir
+        try:
+            signature = [('', base_dir.stat().st_mtime_ns)]
+            with os.scandir(base_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        signature.append((entry.name, entry.stat().st_mtime_ns))
+        except FileNotFoundError:
+            return None
+        return tuple(sorted(signature))
+
+    def _is_fresh(self, now):
+        return self._maps_data is not None and now - self._checked_at < MAP_CATALOG_CHECK_INTERVAL
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._is_fresh(now):
+            return
+
+        with self._lock:
+            if self._is_fresh(now):
+                return
+
+            # Taken before scanning, so changes made during the scan trigger another one
+            signature = self._directory_signature()
+            if (self._maps_data is None or signature != self._signature or
+                    now - self._scanned_at >= MAP_CATALOG_MAX_AGE):
+                maps_data = self.scanner.scan_maps()
+                self._summary = {
+                    'total_sites': len(maps_data['sites']),
+                    'total_maps': maps_data['total_maps'],
+                    'last_updated': maps_data['last_updated']
+                }
+                self._maps_data = maps_data
+                self._signature = signature
+                self._scanned_at = now
+            self._checked_at = now
+
+    @property
+    def maps_data(self) -> Dict[str, Any]:
+        """All sites with maps, as returned by MapScanner.scan_maps()"""
+        self._refresh()
+        return self._maps_data
+
+    @property
+    def summary(self) -> Dict[str, Any]:
+        """Site count, map count and latest map time"""
+        self._refresh()
+        return self._summary
+
+    def get_site(self, site_name: str) -> Dict[str, Any]:
+        """Maps of one site, or None if it has none"""
+        return self.maps_data['sites'].get(site_name)
+
+    def invalidate(self):
+        """Rescan on the next read"""
+        with self._lock:
+            self._maps_data = None
+
+
+map_catalog = MapCatalog()
+
+# Thumbnails are rendered off the request thread; see pcng/map_thumbnails.py
+thumbnail_queue = ThumbnailQueue()
+
+# Seconds the browser waits before asking again for a thumbnail that is still rendering
+THUMBNAIL_RETRY_AFTER = 2
+
+THUMBNAIL_PLACEHOLDER_SVG = """<svg xmlns="http://www.w3.org/2000/svg" width="300" height="200" viewBox="0 0 300 200">
+<rect width="300" height="200" fill="#1e1e1e"/>
+<text x="150" y="105" fill="#9e9e9e" font-family="sans-serif" font-size="14" text-anchor="middle">Rendering preview...</text>
+</svg>"""
+
+
+def _map_svg_paths():
+    """(site name, map name, SVG path) for every map in the catalog"""
+    for site_name, site_data in map_catalog.maps_data['sites'].items():
+        for map_data in site_data['maps']:
+            yield site_name, map_data['name'], Path(map_data['files']['.svg']['path'])
+
+
+def _pending_thumbnails(maps_data, per_site=6):
+    """'site/map' keys of the thumbnails shown on the overview that are still rendering"""
+    if not thumbnails_available():
+        return set()
+
+    pending = set()
+    for site_name, site_data in maps_data['sites'].items():
+        for map_data in site_data['maps'][:per_site]:
+            try:
+                state, _ = thumbnail_queue.request(map_data['files']['.svg']['path'])
+            except OSError:
+                continue
+            if state == ThumbnailQueue.PENDING:
+                pending.add(f"{site_name}/{map_data['name']}")
+    return pending
+
+
 @maps_bp.route('/')
 def index():
     """Maps overview page"""
-    scanner = MapScanner()
-    maps_data = scanner.scan_maps()
+    maps_data = map_catalog.maps_data
 
     return render_template('maps/index.html',
                            maps_data=maps_data,
+                           pending_thumbnails=_pending_thumbnails(maps_data),
                            title="Network Maps")
 
 
 @maps_bp.route('/site/<site_name>')
 def site_maps(site_name):
     """Show maps for a specific site"""
-    scanner = MapScanner()
-    site_dir = scanner.maps_base_dir / site_name
-
-    if not site_dir.exists():
-        abort(404, f"Site '{site_name}' not found")
+    site_data = map_catalog.get_site(site_name)
 
-    site_data = scanner.scan_site_maps(site_dir)
-
-    if not site_data['maps']:
+    if not site_data:
+        if not (map_catalog.scanner.maps_base_dir / site_name).exists():
+            abort(404, f"Site '{site_name}' not found")
         abort(404, f"No maps found for site '{site_name}'")
 
     return render_template('maps/site.html',
@@ -207,7 +332,7 @@ def serve_svg(site_name, map_name):
     if not svg_path.exists():
         abort(404, "SVG file not found")
 
-    return send_file(svg_path, mimetype='image/svg+xml')
+    return cached_file(svg_path, 'image/svg+xml')
 
 
 @maps_bp.route('/download/<site_name>/<map_name>/<format>')
@@ -238,17 +363,15 @@ def download_map(site_name, map_name, format):
         '.drawio': 'application/xml'
     }
 
-    return send_file(file_path,
-                     mimetype=mimetypes.get(format_map[format], 'application/octet-stream'),
-                     as_attachment=True,
-                     download_name=f"{map_name}{format_map[format]}")
+    return cached_file(file_path,
+                       mimetypes.get(format_map[format], 'application/octet-stream'),
+                       download_name=f"{map_name}{format_map[format]}")
 
 
 @maps_bp.route('/api/maps')
 def api_maps():
     """JSON API for maps data"""
-    scanner = MapScanner()
-    maps_data = scanner.scan_maps()
+    maps_data = map_catalog.maps_data
 
     # Convert datetime objects to ISO format for JSON serialization
     def convert_dates(obj):
@@ -265,63 +388,62 @@ def api_maps():
 
 @maps_bp.route('/api/thumbnail/<site_name>/<map_name>')
 def api_thumbnail(site_name, map_name):
-    """Generate/serve thumbnail for SVG map with caching"""
+    """Serve the PNG thumbnail for an SVG map, or a placeholder while it is rendered in the background"""
     scanner = MapScanner()
     svg_path = scanner.maps_base_dir / site_name / f"{map_name}.svg"
 
     if not svg_path.exists():
         abort(404, "SVG file not found")
 
-    # Create thumbnails directory if it doesn't exist
-    thumbnails_dir = scanner.maps_base_dir / 'thumbnails' / site_name
-    thumbnails_dir.mkdir(parents=True, exist_ok=True)
+    if not thumbnails_available():
+        # Fallback to serving SVG directly if PIL/cairosvg not available
+        current_app.logger.warning("PIL or cairosvg not installed - serving SVG instead of thumbnail")
+        return serve_svg(site_name, map_name)
 
-    thumbnail_path = thumbnails_dir / f"{map_name}_thumb.png"
+    try:
+        state, thumbnail_path = thumbnail_queue.request(svg_path)
+    except Exception as e:
+        current_app.logger.error(f"Error queueing thumbnail: {str(e)}")
+        return serve_svg(site_name, map_name)
 
-    # Check if thumbnail exists and is newer than SVG
-    if (thumbnail_path.exists() and
-            thumbnail_path.stat().st_mtime > svg_path.stat().st_mtime):
+    if state == ThumbnailQueue.READY:
         return send_file(thumbnail_path, mimetype='image/png')
 
-    # Generate thumbnail
-    try:
-        from PIL import Image
-        import cairosvg
-        import io
+    if state == ThumbnailQueue.FAILED:
+        # Fallback to serving SVG directly
+        return serve_svg(site_name, map_name)
 
-        # Convert SVG to PNG in memory
-        png_data = cairosvg.svg2png(url=str(svg_path), output_width=300, output_height=200)
+    response = Response(THUMBNAIL_PLACEHOLDER_SVG, status=202, mimetype='image/svg+xml')
+    response.headers['Retry-After'] = str(THUMBNAIL_RETRY_AFTER)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
 
-        # Use PIL to create thumbnail
-        img = Image.open(io.BytesIO(png_data))
-        img.thumbnail((300, 200), Image.Resampling.LANCZOS)
 
-        # Save thumbnail to cache
-        img.save(thumbnail_path, 'PNG', optimize=True)
+@maps_bp.route('/api/thumbnails/rebuild', methods=['POST'])
+def api_rebuild_thumbnails():
+    """Queue a fresh render of every map thumbnail"""
+    if not thumbnails_available():
+        return jsonify({'error': 'PIL or cairosvg not installed'}), 503
 
-        return send_file(thumbnail_path, mimetype='image/png')
+    queued = 0
+    for site_name, map_name, svg_path in _map_svg_paths():
+        try:
+            thumbnail_queue.request(svg_path, force=True)
+            queued += 1
+        except Exception as e:
+            current_app.logger.error(f"Error queueing thumbnail for {site_name}/{map_name}: {str(e)}")
 
-    except ImportError:
-        # Fallback to serving SVG directly if PIL/cairosvg not available
-        current_app.logger.warning("PIL or cairosvg not installed - serving SVG instead of thumbnail")
-        return serve_svg(site_name, map_name)
-    except Exception as e:
-        current_app.logger.error(f"Error generating thumbnail: {str(e)}")
-        # Fallback to serving SVG directly
-        return serve_svg(site_name, map_name)
+    return jsonify({'queued': queued, 'pending': thumbnail_queue.pending_count()})
+
+
+@maps_bp.route('/api/thumbnails/status')
+def api_thumbnail_status():
+    """Number of thumbnails still rendering"""
+    return jsonify({'pending': thumbnail_queue.pending_count()})
 
 
 # Template context processor for maps
 @maps_bp.app_context_processor
 def inject_maps_data():
     """Make maps data available to all templates"""
-    scanner = MapScanner()
-    maps_data = scanner.scan_maps()
-
-    return {
-        'maps_summary': {
-            'total_sites': len(maps_data['sites']),
-            'total_maps': maps_data['total_maps'],
-            'last_updated': maps_data['last_updated']
-        }
-    }
\ No newline at end of file
+    return {'maps_summary': map_catalog.summary}
\ No newline at end of file
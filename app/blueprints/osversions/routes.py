@@ -2,11 +2,10 @@
 
 
 # app/blueprints/osversions/routes.py
-from flask import render_template, request, jsonify, make_response
+from flask import render_template, request, jsonify
 from . import osversions_bp
 from app.utils.database import get_db_connection
-import csv
-from io import StringIO
+from app.utils.csv_export import stream_csv_export
 
 
 @osversions_bp.route('/')
@@ -169,42 +168,21 @@ def vendor_detail(vendor_name):
 def export_csv():
     """Export OS version report to CSV"""
     try:
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-
-            cursor.execute("""
-                SELECT 
-                    d.name as device_name,
-                    d.site_code,
-                    v.name as vendor,
-                    d.model,
-                    d.os_version,
-                    d.management_ip
-                FROM devices d
-                LEFT JOIN vendors v ON d.vendor_id = v.id
-                WHERE d.os_version IS NOT NULL 
-                  AND d.os_version != ''
-                ORDER BY v.name, d.os_version, d.name
-            """)
-
-            devices = cursor.fetchall()
-
-            si = StringIO()
-            writer = csv.writer(si)
-
-            writer.writerow(['Device', 'Site', 'Vendor', 'Model', 'OS Version', 'Management IP'])
-
-            for device in devices:
-                writer.writerow(device)
-
-            output = si.getvalue()
-            si.close()
-
-            response = make_response(output)
-            response.headers['Content-Type'] = 'text/csv'
-            response.headers['Content-Disposition'] = 'attachment; filename=os_versions_report.csv'
-
-            return response
+        return stream_csv_export("""
+            SELECT 
+                d.name as device_name,
+                d.site_code,
+                v.name as vendor,
+                d.model,
+                d.os_version,
+                d.management_ip
+            FROM devices d
+            LEFT JOIN vendors v ON d.vendor_id = v.id
+            WHERE d.os_version IS NOT NULL 
+              AND d.os_version != ''
+            ORDER BY v.name, d.os_version, d.name
+        """, [], ['Device', 'Site', 'Vendor', 'Model', 'OS Version', 'Management IP'],
+            'os_versions_report.csv')
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
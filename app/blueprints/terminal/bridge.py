@@ -0,0 +1,270 @@
+# app/blueprints/terminal/bridge.py
+"""
+Event-driven I/O between SSH channels and browser terminals.
+
+Every terminal used to cost a reader thread polling recv_ready() every 10 ms plus a thread
+draining its output queue. Here one loop per worker process waits on the fileno() of every
+open channel with a selector and reads a channel only when it has data.
+
+The browser acknowledges each output frame once xterm.js has rendered it. Output that arrives
+while no frame is in flight (interactive echo) is sent at once; output that arrives while the
+browser is still busy is coalesced into frames of up to OUTPUT_FRAME_SIZE bytes, sent when
+full, when a frame is acknowledged or after COALESCE_DELAY. Bulk output (show running-config)
+thus goes out in a few large messages. With MAX_UNACKED_FRAMES outstanding the channel is not
+read any further, so the SSH window fills and the device pauses instead of output piling up
+in server memory while a browser is slow.
+"""
+import codecs
+import collections
+import logging
+import queue
+import selectors
+import socket
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Bytes per output message; about one socket send buffer's worth
+OUTPUT_FRAME_SIZE = 16 * 1024
+
+# Longest time output waits for an acknowledgement before it is sent anyway
+COALESCE_DELAY = 0.02
+
+# Frames sent but not yet rendered by the browser before reading pauses
+MAX_UNACKED_FRAMES = 4
+
+
+class _Terminal:
+    """Output state of one channel"""
+
+    def __init__(self, sid, channel):
+        self.sid = sid
+        self.channel = channel
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.chunks = []
+        self.buffered = 0
+        self.flush_at = None
+        self.unacked = 0
+        self.reading = True
+        self.bytes_out = 0
+        self.sent_at = collections.deque()
+        self.rtt = None
+
+
+class TerminalBridge:
+    """
+    Relays output of registered SSH channels to Socket.IO clients.
+
+    add() / remove() / acknowledge() may be called from any thread; the selector is only
+    touched by the bridge loop, which picks up requests through a queue and a wakeup socket.
+    """
+
+    def __init__(self, socketio, namespace, on_closed=None):
+        """
+        Args:
+            socketio: SocketIO instance used to emit and to start the background loop
+            namespace: Socket.IO namespace of the terminals
+            on_closed: Called with the sid and the channel when the device closes a channel
+        """
+        self.socketio = socketio
+        self.namespace = namespace
+        self.on_closed = on_closed
+        self._terminals = {}
+        self._requests = queue.SimpleQueue()
+        self._selector = None
+        self._wakeup_r = self._wakeup_w = None
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def _start(self):
+        with self._start_lock:
+            if self._started:
+                return
+            self._selector = selectors.DefaultSelector()
+            self._wakeup_r, self._wakeup_w = socket.socketpair()
+            self._wakeup_r.setblocking(False)
+            self._selector.register(self._wakeup_r, selectors.EVENT_READ)
+            self.socketio.start_background_task(self._run)
+            self._started = True
+
+    def _post(self, request, *args):
+        self._requests.put((request, args))
+        try:
+            self._wakeup_w.send(b'\0')
+        except OSError:
+            pass
+
+    def add(self, sid, channel):
+        """Start relaying a channel's output to the client with this sid"""
+        self._start()
+        self._post(self._add, sid, channel)
+
+    def remove(self, sid):
+        """Stop relaying; the caller closes the channel"""
+        if self._started:
+            self._post(self._remove, sid)
+
+    def acknowledge(self, sid):
+        """The client rendered a frame"""
+        self._post(self._acknowledged, sid)
+
+    def stats(self, sid):
+        """(bytes sent to the browser, smoothed frame round trip in seconds or None)"""
+        terminal = self._terminals.get(sid)
+        if terminal is None:
+            return 0, None
+        return terminal.bytes_out, terminal.rtt
+
+    # Everything below runs in the bridge loop
+
+    def _add(self, sid, channel):
+        self._remove(sid)
+        terminal = _Terminal(sid, channel)
+        self._terminals[sid] = terminal
+        self._selector.register(channel.fileno(), selectors.EVENT_READ, terminal)
+
+    def _remove(self, sid):
+        terminal = self._terminals.pop(sid, None)
+        if terminal is not None:
+            self._watch(terminal, False)
+
+    def _watch(self, terminal, watching):
+        """Start or stop waiting for output; unread output stays in the channel meanwhile"""
+        if terminal.reading == watching:
+            return
+        terminal.reading = watching
+        try:
+            if watching:
+                # The channel's pipe is level-triggered: pending output is picked up right away
+                self._selector.register(terminal.channel.fileno(), selectors.EVENT_READ, terminal)
+            else:
+                self._selector.unregister(terminal.channel.fileno())
+        except (KeyError, ValueError, OSError):
+            pass
+
+    def _acknowledged(self, sid):
+        terminal = self._terminals.get(sid)
+        if terminal is None:
+            return
+        terminal.unacked = max(0, terminal.unacked - 1)
+        if terminal.sent_at:
+            sample = time.monotonic() - terminal.sent_at.popleft()
+            terminal.rtt = sample if terminal.rtt is None else 0.8 * terminal.rtt + 0.2 * sample
+        if terminal.chunks:
+            if terminal.unacked == 0:
+                self._send_frame(terminal)
+        elif terminal.unacked < MAX_UNACKED_FRAMES:
+            self._watch(terminal, True)
+
+    def _drain(self, terminal):
+        """Read what the channel has, up to a full frame; True once the device closed it"""
+        channel = terminal.channel
+        while terminal.buffered < OUTPUT_FRAME_SIZE:
+            if channel.recv_ready():
+                data = channel.recv(OUTPUT_FRAME_SIZE - terminal.buffered)
+            elif channel.recv_stderr_ready():
+                data = channel.recv_stderr(OUTPUT_FRAME_SIZE - terminal.buffered)
+            else:
+                break
+            if not data:
+                break
+            if terminal.flush_at is None:
+                terminal.flush_at = time.monotonic() + COALESCE_DELAY
+            terminal.chunks.append(data)
+            terminal.buffered += len(data)
+        return not channel.recv_ready() and (channel.eof_received or channel.closed)
+
+    def _read(self, terminal):
+        """The channel has output"""
+        if self._drain(terminal):
+            self._send_frame(terminal, final=True)
+        elif terminal.buffered >= OUTPUT_FRAME_SIZE or terminal.unacked == 0:
+            self._send_frame(terminal)
+        else:
+            # The browser is busy: let output collect in the channel until the frame is due,
+            # instead of waking up for every SSH packet
+            self._watch(terminal, False)
+
+    def _send_frame(self, terminal, final=False):
+        """Top up the frame from the channel and send it"""
+        if not final:
+            final = self._drain(terminal)
+        self._flush(terminal, final)
+        if final:
+            self._closed(terminal)
+        else:
+            self._watch(terminal, terminal.unacked < MAX_UNACKED_FRAMES)
+
+    def _flush(self, terminal, final=False):
+        data = b''.join(terminal.chunks)
+        terminal.chunks = []
+        terminal.buffered = 0
+        terminal.flush_at = None
+
+        text = terminal.decoder.decode(data, final=final)
+        if not text:
+            return
+        terminal.bytes_out += len(data)
+        terminal.unacked += 1
+        terminal.sent_at.append(time.monotonic())
+        sid = terminal.sid
+        self.socketio.emit('output', {'data': text}, namespace=self.namespace, to=sid,
+                           callback=lambda *args: self.acknowledge(sid))
+
+    def _current(self, terminal):
+        """Still registered, not removed or replaced by a new session on the same sid"""
+        return self._terminals.get(terminal.sid) is terminal
+
+    def _closed(self, terminal):
+        if not self._current(terminal):
+            return
+        self._remove(terminal.sid)
+        self.socketio.emit('closed', {'message': 'Session closed by remote host'},
+                           namespace=self.namespace, to=terminal.sid)
+        if self.on_closed:
+            self.on_closed(terminal.sid, terminal.channel)
+
+    def _process_requests(self):
+        while True:
+            try:
+                request, args = self._requests.get_nowait()
+            except queue.Empty:
+                return
+            request(*args)
+
+    def _timeout(self):
+        deadlines = [t.flush_at for t in self._terminals.values() if t.flush_at is not None]
+        if not deadlines:
+            return None
+        return max(0.0, min(deadlines) - time.monotonic())
+
+    def _run(self):
+        while True:
+            try:
+                events = self._selector.select(self._timeout())
+                try:
+                    while self._wakeup_r.recv(4096):
+                        pass
+                except BlockingIOError:
+                    pass
+
+                # Removals first: a channel closed by the server (idle reap, replaced session) reads
+                # as EOF, which must not be reported as a close by the remote host
+                self._process_requests()
+
+                for key, _ in events:
+                    if key.fileobj is not self._wakeup_r and self._current(key.data):
+                        try:
+                            self._read(key.data)
+                        except Exception as e:
+                            logger.error(f"Terminal output error for {key.data.sid}: {e}")
+                            self._closed(key.data)
+
+                now = time.monotonic()
+                for terminal in list(self._terminals.values()):
+                    if terminal.flush_at is not None and terminal.flush_at <= now:
+                        self._send_frame(terminal)
+            except Exception as e:
+                # Keep relaying for the other terminals
+                logger.error(f"Terminal bridge error: {e}")
@@ -3,14 +3,10 @@ from flask import render_template, request, jsonify, session
 from flask_socketio import emit, disconnect
 from . import terminal_bp
 from app import socketio
+from app.blueprints.auth.routes import login_required
 from app.utils.database import get_db_connection
-import paramiko
-import threading
-import queue
-import time
-
-# Store active SSH sessions
-active_sessions = {}
+from .bridge import TerminalBridge
+from .sessions import SessionManager, SessionLimitError
 
 
 @terminal_bp.route('/')
@@ -64,98 +60,29 @@ def api_devices():
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
-class SSHSession:
-    """Manage an SSH connection and channel"""
-
-    def __init__(self, host, username, password, port=22):
-        self.host = host
-        self.port = port
-        self.username = username
-        self.password = password
-        self.client = None
-        self.channel = None
-        self.output_queue = queue.Queue()
-        self.running = False
-
-    def connect(self):
-        """Establish SSH connection"""
-        try:
-            self.client = paramiko.SSHClient()
-            self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            self.client.connect(
-                self.host,
-                port=self.port,
-                username=self.username,
-                password=self.password,
-                timeout=10,
-                look_for_keys=False,
-                allow_agent=False
-            )
-
-            # Get interactive shell
-            self.channel = self.client.invoke_shell(
-                term='xterm-256color',
-                width=120,
-                height=40
-            )
-
-            self.running = True
-
-            # Start output reader thread
-            reader_thread = threading.Thread(target=self._read_output)
-            reader_thread.daemon = True
-            reader_thread.start()
-
-            return True
-
-        except Exception as e:
-            return False, str(e)
-
-    def _read_output(self):
-        """Read output from SSH channel"""
-        while self.running and self.channel:
-            try:
-                if self.channel.recv_ready():
-                    data = self.channel.recv(4096)
-                    if data:
-                        self.output_queue.put(data.decode('utf-8', errors='ignore'))
-                else:
-                    time.sleep(0.01)
-            except Exception as e:
-                self.running = False
-                break
-
-    def write(self, data):
-        """Send data to SSH channel"""
-        if self.channel and self.running:
-            try:
-                self.channel.send(data)
-                return True
-            except:
-                return False
-        return False
-
-    def resize(self, cols, rows):
-        """Resize terminal"""
-        if self.channel and self.running:
-            try:
-                self.channel.resize_pty(width=cols, height=rows)
-            except:
-                pass
-
-    def close(self):
-        """Close SSH connection"""
-        self.running = False
-        if self.channel:
-            try:
-                self.channel.close()
-            except:
-                pass
-        if self.client:
-            try:
-                self.client.close()
-            except:
-                pass
+def _session_closed(session_id, channel):
+    """The device ended the session (exit, reload, idle timeout); the bridge told the browser"""
+    # Closing the channel may wait on the transport; keep that out of the bridge loop
+    socketio.start_background_task(manager.close, session_id, channel=channel)
+
+
+# Relays channel output to the browsers of all terminals in this worker
+bridge = TerminalBridge(socketio, '/terminal', on_closed=_session_closed)
+
+# Shares SSH connections between terminals, enforces the caps and reaps idle sessions
+manager = SessionManager(socketio, bridge)
+
+
+def _session_user():
+    """Dashboard user the terminal counts against; the client address when not signed in"""
+    return session.get('username') or request.remote_addr
+
+
+@terminal_bp.route('/api/sessions')
+@login_required
+def api_sessions():
+    """Live terminal sessions, throughput and round trip times of this worker"""
+    return jsonify({'status': 'success', **manager.metrics()})
 
 
 @socketio.on('connect', namespace='/terminal')
@@ -172,9 +99,7 @@ def handle_disconnect():
     print(f"Client disconnected: {session_id}")
 
     # Close SSH session if exists
-    if session_id in active_sessions:
-        active_sessions[session_id].close()
-        del active_sessions[session_id]
+    manager.close(session_id)
 
 
 @socketio.on('start_session', namespace='/terminal')
@@ -192,79 +117,28 @@ def handle_start_session(data):
             emit('error', {'message': 'Missing required credentials'})
             return
 
-        # Close existing session if any
-        if session_id in active_sessions:
-            active_sessions[session_id].close()
-
-        # Create new SSH session
-        ssh_session = SSHSession(host, username, password, port)
-        result = ssh_session.connect()
-
-        if result is True:
-            active_sessions[session_id] = ssh_session
-            emit('connected', {'message': f'Connected to {host}'})
-
-            # Start sending output
-            def send_output():
-                while session_id in active_sessions:
-                    try:
-                        output = active_sessions[session_id].output_queue.get(timeout=0.1)
-                        socketio.emit('output', {'data': output},
-                                      namespace='/terminal', room=session_id)
-                    except queue.Empty:
-                        continue
-                    except:
-                        break
-
-            output_thread = threading.Thread(target=send_output)
-            output_thread.daemon = True
-            output_thread.start()
-        else:
-            emit('error', {'message': f'Connection failed: {result[1]}'})
+        manager.open(session_id, _session_user(), host, port, username, password)
+        emit('connected', {'message': f'Connected to {host}'})
 
+    except SessionLimitError as e:
+        emit('error', {'message': str(e)})
     except Exception as e:
-        emit('error', {'message': f'Error: {str(e)}'})
+        emit('error', {'message': f'Connection failed: {str(e)}'})
 
 
 @socketio.on('input', namespace='/terminal')
 def handle_input(data):
     """Handle terminal input"""
-    session_id = request.sid
-
-    if session_id in active_sessions:
-        input_data = data.get('data', '')
-        active_sessions[session_id].write(input_data)
-
-def cleanup_stale_sessions():
-    while True:
-        time.sleep(300)  # Every 5 minutes
-        stale = []
-        for sid, session in active_sessions.items():
-            if not session.running:
-                stale.append(sid)
-        for sid in stale:
-            try:
-                active_sessions[sid].close()
-                del active_sessions[sid]
-            except:
-                pass
+    terminal = manager.get(request.sid)
+    if terminal:
+        terminal.write(data.get('data', ''))
 
-@socketio.on('disconnect', namespace='/terminal')
-def handle_disconnect():
-    session_id = request.sid
-    if session_id in active_sessions:
-        active_sessions[session_id].close()
-        del active_sessions[session_id]
 
 @socketio.on('resize', namespace='/terminal')
 def handle_resize(data):
     """Handle terminal resize"""
-    session_id = request.sid
-
-    if session_id in active_sessions:
+    terminal = manager.get(request.sid)
+    if terminal:
         cols = data.get('cols', 80)
         rows = data.get('rows', 24)
-        active_sessions[session_id].resize(cols, rows)
-
-cleanup_thread = threading.Thread(target=cleanup_stale_sessions, daemon=True)
-cleanup_thread.start()
\ No newline at end of file
+        terminal.resize(cols, rows)
@@ -0,0 +1,373 @@
+# app/blueprints/terminal/sessions.py
+"""
+SSH session management for the web terminal.
+
+Browser tabs of the same user on the same device share one SSH connection: every terminal is
+its own shell channel, multiplexed over a transport keyed by (user, device, SSH username,
+password). Devices that refuse a second channel on a connection get a dedicated one.
+Connections stay open for TRANSPORT_LINGER seconds after their last terminal closes, so a
+page reload reconnects without a new SSH handshake.
+
+Sessions are capped per user and per worker process, and a sweep every SWEEP_INTERVAL seconds
+closes terminals idle (no input and no output) for longer than the idle timeout, samples
+throughput, and measures each connection's round trip with an SSH keepalive request.
+"""
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import threading
+import time
+
+import paramiko
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SESSIONS = 20
+DEFAULT_MAX_SESSIONS_PER_USER = 5
+DEFAULT_IDLE_TIMEOUT_MINUTES = 30
+
+# Seconds between sweeps (idle reaping, throughput samples, keepalive probes)
+SWEEP_INTERVAL = 5
+
+# Seconds between keepalive round trip probes per connection
+PROBE_INTERVAL = 30
+
+# Seconds an SSH connection without terminals stays open for reuse
+TRANSPORT_LINGER = 60
+
+# Credentials are only compared, never kept: transports are keyed by a keyed hash of the password
+_KEY_SECRET = secrets.token_bytes(32)
+
+
+class SessionLimitError(Exception):
+    """Opening another terminal would exceed a session cap"""
+
+
+class SharedTransport:
+    """One SSH connection carrying the shell channels of one or more terminals"""
+
+    def __init__(self, key, host, port, username):
+        self.key = key
+        self.host = host
+        self.port = port
+        self.username = username
+        self.client = None
+        self.sids = set()
+        self.single_channel = False
+        self.idle_since = time.monotonic()
+        self.rtt = None
+        self.probed_at = 0.0
+        self.probing = False
+        self.lock = threading.Lock()
+
+    def is_active(self):
+        transport = self.client.get_transport() if self.client else None
+        return bool(transport and transport.is_active())
+
+    def connect(self, password):
+        self.client = paramiko.SSHClient()
+        self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        self.client.connect(
+            self.host,
+            port=self.port,
+            username=self.username,
+            password=password,
+            timeout=10,
+            look_for_keys=False,
+            allow_agent=False
+        )
+
+    def open_shell(self):
+        return self.client.invoke_shell(term='xterm-256color', width=120, height=40)
+
+    def probe(self):
+        """Round trip of an SSH keepalive request (servers answer it even if unsupported)"""
+        transport = self.client.get_transport() if self.client else None
+        if transport is None:
+            return
+        start = time.monotonic()
+        transport.global_request('keepalive@openssh.com', wait=True)
+        if transport.is_active():
+            self.rtt = time.monotonic() - start
+
+    def close(self):
+        if self.client:
+            try:
+                self.client.close()
+            except Exception:
+                pass
+
+
+class TerminalSession:
+    """A browser terminal and its shell channel"""
+
+    def __init__(self, sid, user, transport, channel):
+        self.sid = sid
+        self.user = user
+        self.transport = transport
+        self.channel = channel
+        self.created = time.monotonic()
+        self.last_activity = self.created
+        self.bytes_in = 0
+        self.bytes_out = 0
+        # (time, bytes_in, bytes_out) at the last two sweeps, for rates
+        self.samples = [(self.created, 0, 0)]
+
+    def write(self, data):
+        """Send input to the device"""
+        try:
+            self.channel.sendall(data)
+        except Exception:
+            return False
+        self.bytes_in += len(data)
+        self.last_activity = time.monotonic()
+        return True
+
+    def resize(self, cols, rows):
+        try:
+            self.channel.resize_pty(width=cols, height=rows)
+        except Exception:
+            pass
+
+    def rates(self):
+        """(input, output) bytes per second between the last two sweeps (or the start)"""
+        if len(self.samples) < 2:
+            return 0.0, 0.0
+        (t0, in0, out0), (t1, in1, out1) = self.samples
+        elapsed = max(t1 - t0, 1e-6)
+        return (in1 - in0) / elapsed, (out1 - out0) / elapsed
+
+
+class SessionManager:
+    """Terminal sessions of one worker process, keyed by Socket.IO sid"""
+
+    def __init__(self, socketio, bridge):
+        self.socketio = socketio
+        self.bridge = bridge
+        self.max_sessions = DEFAULT_MAX_SESSIONS
+        self.max_sessions_per_user = DEFAULT_MAX_SESSIONS_PER_USER
+        self.idle_timeout = DEFAULT_IDLE_TIMEOUT_MINUTES * 60
+        self._sessions = {}
+        self._transports = {}
+        self._reserved = {}
+        self._lock = threading.Lock()
+        self._sweeper_started = False
+
+    def configure(self, max_sessions=None, max_sessions_per_user=None, idle_timeout_minutes=None):
+        """Apply the terminal section of config.yaml"""
+        if max_sessions:
+            self.max_sessions = int(max_sessions)
+        if max_sessions_per_user:
+            self.max_sessions_per_user = int(max_sessions_per_user)
+        if idle_timeout_minutes:
+            self.idle_timeout = float(idle_timeout_minutes) * 60
+
+    def get(self, sid):
+        return self._sessions.get(sid)
+
+    def _reserve(self, user):
+        """Hold a slot while connecting, so concurrent opens cannot overshoot the caps"""
+        with self._lock:
+            user_count = sum(1 for s in self._sessions.values() if s.user == user) + self._reserved.get(user, 0)
+            total = len(self._sessions) + sum(self._reserved.values())
+            if user_count >= self.max_sessions_per_user:
+                raise SessionLimitError(f"Limit of {self.max_sessions_per_user} terminal sessions per user reached")
+            if total >= self.max_sessions:
+                raise SessionLimitError(f"Server limit of {self.max_sessions} terminal sessions reached")
+            self._reserved[user] = self._reserved.get(user, 0) + 1
+
+    def _release(self, user):
+        with self._lock:
+            self._reserved[user] -= 1
+            if not self._reserved[user]:
+                del self._reserved[user]
+
+    def _transport_key(self, user, host, port, username, password):
+        digest = hmac.new(_KEY_SECRET, password.encode('utf-8'), hashlib.sha256).hexdigest()
+        return (user, host, int(port), username, digest)
+
+    def _open_channel(self, key, host, port, username, password):
+        """A shell channel on a shared connection, connecting a new one if none accepts it"""
+        with self._lock:
+            candidates = [t for t in self._transports.get(key, []) if not t.single_channel]
+
+        for shared in candidates:
+            with shared.lock:
+                if not shared.is_active():
+                    continue
+                try:
+                    return shared, shared.open_shell()
+                except paramiko.SSHException:
+                    # Many network OSes allow one shell per connection
+                    shared.single_channel = True
+
+        shared = SharedTransport(key, host, int(port), username)
+        with shared.lock:
+            shared.connect(password)
+            channel = shared.open_shell()
+        with self._lock:
+            self._transports.setdefault(key, []).append(shared)
+        return shared, channel
+
+    def open(self, sid, user, host, port, username, password):
+        """
+        Open a terminal for a Socket.IO client.
+
+        Raises:
+            SessionLimitError: A per-user or per-worker cap is reached
+            Exception: Connecting or opening the shell failed
+        """
+        self.close(sid)
+        self._reserve(user)
+        try:
+            key = self._transport_key(user, host, port, username, password)
+            shared, channel = self._open_channel(key, host, port, username, password)
+            terminal = TerminalSession(sid, user, shared, channel)
+            with self._lock:
+                shared.sids.add(sid)
+                self._sessions[sid] = terminal
+        finally:
+            self._release(user)
+
+        self._start_sweeper()
+        self.bridge.add(sid, channel)
+        return terminal
+
+    def close(self, sid, message=None, channel=None):
+        """
+        Close a terminal; the SSH connection lingers for reuse. message is shown in the browser.
+        With channel, only if the sid's session still uses that channel (not a newer session).
+        """
+        with self._lock:
+            terminal = self._sessions.get(sid)
+            if terminal is None or (channel is not None and terminal.channel is not channel):
+                return
+            del self._sessions[sid]
+            shared = terminal.transport
+            shared.sids.discard(sid)
+            if not shared.sids:
+                shared.idle_since = time.monotonic()
+
+        self.bridge.remove(sid)
+        try:
+            terminal.channel.close()
+        except Exception:
+            pass
+        if message:
+            self.socketio.emit('closed', {'message': message}, namespace=self.bridge.namespace, to=sid)
+
+    def _start_sweeper(self):
+        with self._lock:
+            if self._sweeper_started:
+                return
+            self._sweeper_started = True
+        self.socketio.start_background_task(self._sweep_forever)
+
+    def _sweep_forever(self):
+        while True:
+            self.socketio.sleep(SWEEP_INTERVAL)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Terminal session sweep failed: {e}")
+
+    def sweep(self):
+        """Sample throughput, reap idle terminals and unused connections, probe round trips"""
+        now = time.monotonic()
+        with self._lock:
+            sessions = list(self._sessions.values())
+            transports = [t for group in self._transports.values() for t in group]
+
+        for terminal in sessions:
+            bytes_out, _ = self.bridge.stats(terminal.sid)
+            if bytes_out != terminal.bytes_out:
+                terminal.bytes_out = bytes_out
+                terminal.last_activity = now
+            terminal.samples = (terminal.samples + [(now, terminal.bytes_in, terminal.bytes_out)])[-2:]
+
+            if now - terminal.last_activity > self.idle_timeout:
+                logger.info(f"Closing idle terminal {terminal.user}@{terminal.transport.host}")
+                self.close(terminal.sid, f"Session closed after {self.idle_timeout / 60:g} minutes idle")
+            elif not terminal.transport.is_active():
+                self.close(terminal.sid, 'Connection to device lost')
+
+        for shared in transports:
+            if not shared.sids and (now - shared.idle_since > TRANSPORT_LINGER or not shared.is_active()):
+                self._drop_transport(shared)
+            elif shared.sids and not shared.probing and now - shared.probed_at > PROBE_INTERVAL:
+                shared.probing = True
+                shared.probed_at = now
+                self.socketio.start_background_task(self._probe, shared)
+
+    def _probe(self, shared):
+        try:
+            shared.probe()
+        except Exception as e:
+            logger.debug(f"Keepalive probe to {shared.host} failed: {e}")
+        finally:
+            shared.probing = False
+
+    def _drop_transport(self, shared):
+        with self._lock:
+            if shared.sids:
+                return
+            group = self._transports.get(shared.key, [])
+            if shared in group:
+                group.remove(shared)
+            if not group:
+                self._transports.pop(shared.key, None)
+        shared.close()
+
+    def metrics(self):
+        """Live terminal statistics of this worker process"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            transport_count = sum(len(group) for group in self._transports.values())
+
+        now = time.monotonic()
+        details = []
+        total_in = total_out = 0.0
+        for terminal in sessions:
+            rate_in, rate_out = terminal.rates()
+            total_in += rate_in
+            total_out += rate_out
+            _, browser_rtt = self.bridge.stats(terminal.sid)
+            device_rtt = terminal.transport.rtt
+            details.append({
+                'user': terminal.user,
+                'host': terminal.transport.host,
+                'port': terminal.transport.port,
+                'username': terminal.transport.username,
+                'age_seconds': round(now - terminal.created),
+                'idle_seconds': round(now - terminal.last_activity),
+                'bytes_in': terminal.bytes_in,
+                'bytes_out': terminal.bytes_out,
+                'bytes_in_per_sec': round(rate_in, 1),
+                'bytes_out_per_sec': round(rate_out, 1),
+                'device_rtt_ms': round(device_rtt * 1000, 1) if device_rtt is not None else None,
+                'browser_rtt_ms': round(browser_rtt * 1000, 1) if browser_rtt is not None else None,
+                'shared_connection': len(terminal.transport.sids) > 1,
+            })
+
+        try:
+            open_fds = len(os.listdir('/proc/self/fd'))
+        except OSError:
+            open_fds = None
+
+        return {
+            'pid': os.getpid(),
+            'sessions': len(sessions),
+            'connections': transport_count,
+            'users': len({terminal.user for terminal in sessions}),
+            'bytes_in_per_sec': round(total_in, 1),
+            'bytes_out_per_sec': round(total_out, 1),
+            'open_fds': open_fds,
+            'limits': {
+                'max_sessions': self.max_sessions,
+                'max_sessions_per_user': self.max_sessions_per_user,
+                'idle_timeout_minutes': self.idle_timeout / 60,
+            },
+            'session_details': sorted(details, key=lambda d: (d['user'], d['host'])),
+        }
@@ -78,7 +78,20 @@ class ConfigLoader:
             'server': {
                 'host': '0.0.0.0',
                 'port': 8086,
-                'debug': False
+                'debug': False,
+                # Production server (app/serve.py)
+                'workers': None,  # Auto: 2 x CPUs + 1, at most 8
+                'worker_class': 'gthread',  # gthread, eventlet or gevent
+                'threads': 32,  # Per gthread worker; each open terminal holds one
+                'timeout': 120,
+                'graceful_timeout': 30,
+                'message_queue': None  # e.g. redis://localhost:6379/0 to emit across workers
+            },
+            'terminal': {
+                # Per worker process
+                'max_sessions': 20,
+                'max_sessions_per_user': 5,
+                'idle_timeout_minutes': 30
             },
             'logging': {
                 'level': 'INFO',
@@ -118,6 +131,28 @@ class ConfigLoader:
         if os.getenv('Anguis_DEBUG'):
             config['server']['debug'] = os.getenv('Anguis_DEBUG').lower() in ('true', '1', 'yes')
 
+        if os.getenv('Anguis_WORKERS'):
+            config['server']['workers'] = int(os.getenv('Anguis_WORKERS'))
+
+        if os.getenv('Anguis_WORKER_CLASS'):
+            config['server']['worker_class'] = os.getenv('Anguis_WORKER_CLASS')
+
+        if os.getenv('Anguis_THREADS'):
+            config['server']['threads'] = int(os.getenv('Anguis_THREADS'))
+
+        if os.getenv('Anguis_MESSAGE_QUEUE'):
+            config['server']['message_queue'] = os.getenv('Anguis_MESSAGE_QUEUE')
+
+        # Web terminal settings
+        if os.getenv('TERMINAL_MAX_SESSIONS'):
+            config['terminal']['max_sessions'] = int(os.getenv('TERMINAL_MAX_SESSIONS'))
+
+        if os.getenv('TERMINAL_MAX_SESSIONS_PER_USER'):
+            config['terminal']['max_sessions_per_user'] = int(os.getenv('TERMINAL_MAX_SESSIONS_PER_USER'))
+
+        if os.getenv('TERMINAL_IDLE_TIMEOUT_MINUTES'):
+            config['terminal']['idle_timeout_minutes'] = float(os.getenv('TERMINAL_IDLE_TIMEOUT_MINUTES'))
+
         # Authentication settings
         if os.getenv('AUTH_DEFAULT_METHOD'):
             config['authentication']['default_method'] = os.getenv('AUTH_DEFAULT_METHOD')
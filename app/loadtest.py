@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Load test for the Anguis dashboard.
+
+Simulates concurrent signed-in users requesting dashboard pages and reports throughput and
+latency per path, to compare run.py with serve.py and to size the worker count. Each user
+logs in once and then requests the paths in turn for the given duration.
+
+Usage:
+  python loadtest.py --username admin --users 20 --duration 60
+  python loadtest.py --url http://nms:8086 --username admin --capture-search "ip route"
+  python loadtest.py --username admin --revalidate      # send If-None-Match like a browser
+
+The password is read from ANGUIS_PASSWORD or prompted for.
+"""
+
+import argparse
+import getpass
+import math
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+DEFAULT_PATHS = [
+    '/dashboard/',
+    '/dashboard/api/stats',
+    '/assets/devices',
+    '/components/',
+    '/coverage/',
+    '/maps/',
+    '/capture/search',
+    '/arp/search',
+    '/changes/',
+]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+class LoadTest:
+    """Runs simulated users and collects per-path latencies"""
+
+    def __init__(self, base_url, username, password, auth_method='local', revalidate=False,
+                 capture_search=None, timeout=60):
+        self.base_url = base_url.rstrip('/')
+        self.username = username
+        self.password = password
+        self.auth_method = auth_method
+        self.revalidate = revalidate
+        self.capture_search = capture_search
+        self.timeout = timeout
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.not_modified = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def login(self):
+        """A signed-in requests session"""
+        http = requests.Session()
+        response = http.post(f"{self.base_url}/auth/login", data={
+            'username': self.username,
+            'password': self.password,
+            'auth_method': self.auth_method,
+        }, timeout=self.timeout)
+        if response.status_code != 200 or '/auth/login' in response.url:
+            raise RuntimeError(f"Login failed for {self.username} (HTTP {response.status_code})")
+        return http
+
+    def _record(self, path, elapsed, response=None, error=False):
+        with self._lock:
+            if error or response is None or response.status_code >= 400:
+                self.errors[path] += 1
+                return
+            self.latencies[path].append(elapsed)
+            if response.status_code == 304:
+                self.not_modified[path] += 1
+
+    def _request(self, http, path, etags):
+        headers = {}
+        if self.revalidate and path in etags:
+            headers['If-None-Match'] = etags[path]
+
+        start = time.perf_counter()
+        try:
+            if path == 'POST /capture/api/search':
+                response = http.post(f"{self.base_url}/capture/api/search",
+                                     json={'query': self.capture_search}, timeout=self.timeout)
+            else:
+                response = http.get(f"{self.base_url}{path}", headers=headers, timeout=self.timeout)
+        except requests.RequestException:
+            self._record(path, time.perf_counter() - start, error=True)
+            return
+        self._record(path, time.perf_counter() - start, response)
+
+        if response.headers.get('ETag'):
+            etags[path] = response.headers['ETag']
+
+    def user(self, paths, deadline, offset):
+        """One simulated user; starts at a different path than its neighbours"""
+        http = self.login()
+        etags = {}
+        i = offset
+        while time.monotonic() < deadline:
+            self._request(http, paths[i % len(paths)], etags)
+            i += 1
+
+    def run(self, paths, users, duration):
+        if self.capture_search:
+            paths = paths + ['POST /capture/api/search']
+
+        deadline = time.monotonic() + duration
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=users) as executor:
+            futures = [executor.submit(self.user, paths, deadline, n) for n in range(users)]
+            for future in futures:
+                future.result()
+        return time.perf_counter() - start
+
+    def print_report(self, elapsed, paths):
+        total = sum(len(v) for v in self.latencies.values())
+        errors = sum(self.errors.values())
+
+        print(f"\n{'Path':<32} {'Reqs':>7} {'Err':>5} {'304':>5} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'p99 ms':>8} {'max ms':>8}")
+        print("-" * 89)
+        for path in paths + [p for p in self.latencies if p not in paths]:
+            values = sorted(self.latencies.get(path, []))
+            if not values and not self.errors.get(path):
+                continue
+            print(f"{path:<32} {len(values):>7} {self.errors.get(path, 0):>5} "
+                  f"{self.not_modified.get(path, 0):>5} "
+                  f"{percentile(values, 50) * 1000:>8.1f} {percentile(values, 95) * 1000:>8.1f} "
+                  f"{percentile(values, 99) * 1000:>8.1f} {(values[-1] if values else 0) * 1000:>8.1f}")
+
+        all_values = sorted(v for values in self.latencies.values() for v in values)
+        print("-" * 89)
+        print(f"{total} requests, {errors} errors in {elapsed:.1f}s: {total / elapsed:.1f} req/s, "
+              f"p50 {percentile(all_values, 50) * 1000:.1f} ms, p95 {percentile(all_values, 95) * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Anguis dashboard with concurrent users")
+    parser.add_argument("--url", default="http://localhost:8086", help="Dashboard URL (default: http://localhost:8086)")
+    parser.add_argument("--username", "-u", required=True, help="Login username")
+    parser.add_argument("--auth-method", default="local", help="Authentication method (default: local)")
+    parser.add_argument("--users", "-c", type=int, default=10, help="Concurrent users (default: 10)")
+    parser.add_argument("--duration", "-d", type=int, default=30, help="Seconds to run (default: 30)")
+    parser.add_argument("--path", "-p", action="append", dest="paths",
+                        help="Path to request (repeatable; default: the main dashboard pages)")
+    parser.add_argument("--capture-search", metavar="QUERY",
+                        help="Also run capture content searches for QUERY (CPU heavy)")
+    parser.add_argument("--revalidate", action="store_true",
+                        help="Send If-None-Match with the last ETag per path, like a browser cache")
+    parser.add_argument("--timeout", type=int, default=60, help="Request timeout in seconds (default: 60)")
+    args = parser.parse_args()
+
+    password = os.environ.get('ANGUIS_PASSWORD') or getpass.getpass(f"Password for {args.username}: ")
+    paths = args.paths or DEFAULT_PATHS
+
+    test = LoadTest(args.url, args.username, password, auth_method=args.auth_method,
+                    revalidate=args.revalidate, capture_search=args.capture_search, timeout=args.timeout)
+    try:
+        test.login()
+    except (RuntimeError, requests.RequestException) as e:
+        print(f"Error: {e}")
+        return 1
+
+    print(f"Load testing {args.url}: {args.users} users for {args.duration}s over {len(paths)} path(s)")
+    elapsed = test.run(paths, args.users, args.duration)
+    test.print_report(elapsed, paths + (['POST /capture/api/search'] if args.capture_search else []))
+    return 1 if sum(test.errors.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
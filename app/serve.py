@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Production server for the Anguis dashboard.
+
+run.py starts the Flask-SocketIO development server: one process with the reloader and the
+debugger, so a capture search or a coverage rebuild holds up every other user. This runs the
+same app under gunicorn with several worker processes, each with its own connection pools and
+caches.
+
+Socket.IO clients connect over WebSocket only, so a terminal session stays on the worker that
+accepted it and no sticky load balancing is needed. Events emitted by one worker reach clients
+of another only through a message queue (server.message_queue, e.g. redis://localhost:6379/0);
+without one each worker delivers its own events in-process, which is all the web terminal needs.
+
+Settings come from the server section of config.yaml, Anguis_* environment variables and the
+options below, in increasing order of precedence.
+
+Usage (from the project root, where assets.db and pcng/ live):
+  python app/serve.py                          # app/config.yaml settings, bind 0.0.0.0:8086
+  python app/serve.py --workers 4 --pid anguis.pid
+  kill -HUP $(cat anguis.pid)                  # graceful reload: new workers start with fresh
+                                               # code, old ones finish their requests
+  kill -TERM $(cat anguis.pid)                 # graceful shutdown
+"""
+
+import argparse
+import importlib.util
+import multiprocessing
+import os
+import sys
+
+# Only the config loader: the app itself is imported in the workers (see create_production_app)
+try:
+    from .config_loader import load_config  # python -m app.serve
+except ImportError:
+    from config_loader import load_config  # python app/serve.py
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_CONFIG = os.path.join(APP_DIR, 'config.yaml')
+
+# Upper bound for the automatic worker count; every worker holds its own caches and pools
+MAX_AUTO_WORKERS = 8
+
+# Connections per eventlet/gevent worker
+WORKER_CONNECTIONS = 1000
+
+# worker_class setting -> (gunicorn worker class, Flask-SocketIO async_mode, required package)
+WORKER_CLASSES = {
+    'gthread': ('gthread', 'threading', None),
+    'eventlet': ('eventlet', 'eventlet', 'eventlet'),
+    'gevent': ('gevent', 'gevent', 'gevent'),
+}
+
+
+def default_workers():
+    """2 x CPUs + 1, at most MAX_AUTO_WORKERS"""
+    return min(multiprocessing.cpu_count() * 2 + 1, MAX_AUTO_WORKERS)
+
+
+def build_settings(server_config, args):
+    """gunicorn settings and Flask-SocketIO options from config.yaml and the command line"""
+    worker_class = args.worker_class or server_config.get('worker_class') or 'gthread'
+    if worker_class not in WORKER_CLASSES:
+        raise ValueError(f"Unknown worker class '{worker_class}' (choose from {', '.join(WORKER_CLASSES)})")
+    gunicorn_worker, async_mode, package = WORKER_CLASSES[worker_class]
+    if package and not importlib.util.find_spec(package):
+        raise ValueError(f"Worker class '{worker_class}' requires the {package} package")
+
+    host = server_config.get('host') or '0.0.0.0'
+    port = server_config.get('port') or 8086
+    gunicorn_settings = {
+        'bind': args.bind or f"{host}:{port}",
+        'workers': args.workers or server_config.get('workers') or default_workers(),
+        'worker_class': gunicorn_worker,
+        'timeout': server_config.get('timeout') or 120,
+        'graceful_timeout': server_config.get('graceful_timeout') or 30,
+        'keepalive': 5,
+        'errorlog': '-',
+        'accesslog': '-' if args.access_log else None,
+        'pidfile': args.pid,
+        'proc_name': 'anguis',
+    }
+    if worker_class == 'gthread':
+        # A web terminal's WebSocket occupies a thread for as long as it is open
+        gunicorn_settings['threads'] = args.threads or server_config.get('threads') or 32
+    else:
+        gunicorn_settings['worker_connections'] = WORKER_CONNECTIONS
+
+    socketio_options = {
+        'async_mode': async_mode,
+        'transports': ['websocket'],
+    }
+    message_queue = args.message_queue or server_config.get('message_queue')
+    if message_queue:
+        socketio_options['message_queue'] = message_queue
+
+    return gunicorn_settings, socketio_options
+
+
+def create_production_app(socketio_options, config_file):
+    """Build the app inside a worker, after gevent/eventlet have patched the standard library"""
+    project_dir = os.path.dirname(APP_DIR)
+    if project_dir not in sys.path:
+        sys.path.insert(0, project_dir)
+
+    from app import create_app
+    app, _ = create_app('production', socketio_options=socketio_options, config_file=config_file)
+    return app
+
+
+def worker_exit(server, worker):
+    """Release pooled database connections and thumbnail render processes"""
+    from app.utils.database import close_all_connections
+    close_all_connections()
+
+    maps_routes = sys.modules.get('app.blueprints.maps.routes')
+    if maps_routes is not None:
+        maps_routes.thumbnail_queue.shutdown()
+
+
+def run_gunicorn(gunicorn_settings, socketio_options, config_file):
+    from gunicorn.app.base import BaseApplication
+
+    class AnguisApplication(BaseApplication):
+        def load_config(self):
+            for key, value in gunicorn_settings.items():
+                if value is not None:
+                    self.cfg.set(key, value)
+            self.cfg.set('worker_exit', worker_exit)
+
+        def load(self):
+            return create_production_app(socketio_options, config_file)
+
+    AnguisApplication().run()
+
+
+def run_single_process(gunicorn_settings, socketio_options, config_file):
+    """Fallback where gunicorn is unavailable (Windows): one process, no reloader or debugger"""
+    print("gunicorn is not installed (it does not run on Windows); serving from a single process")
+    socketio_options = dict(socketio_options, async_mode='threading')
+    app = create_production_app(socketio_options, config_file)
+
+    from app import socketio
+    host, _, port = gunicorn_settings['bind'].rpartition(':')
+    socketio.run(app, host=host, port=int(port), debug=False, use_reloader=False,
+                 allow_unsafe_werkzeug=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Anguis dashboard with multiple worker processes")
+    parser.add_argument("--bind", "-b", help="host:port to listen on (default: server.host/port from config.yaml)")
+    parser.add_argument("--workers", "-w", type=int,
+                        help=f"Worker processes (default: 2 x CPUs + 1, at most {MAX_AUTO_WORKERS})")
+    parser.add_argument("--worker-class", "-k", choices=sorted(WORKER_CLASSES),
+                        help="gthread (default), eventlet or gevent")
+    parser.add_argument("--threads", type=int, help="Threads per gthread worker (default: 32)")
+    parser.add_argument("--message-queue", help="Socket.IO message queue URL, e.g. redis://localhost:6379/0")
+    parser.add_argument("--pid", help="Write the master PID here, for kill -HUP (reload) / -TERM (stop)")
+    parser.add_argument("--config", default=DEFAULT_CONFIG,
+                        help="Configuration file (default: config.yaml next to serve.py)")
+    parser.add_argument("--access-log", action="store_true", help="Log every request to stdout")
+    args = parser.parse_args()
+
+    config_file = os.path.abspath(args.config)
+    server_config = load_config(config_file).get('server', {})
+    try:
+        gunicorn_settings, socketio_options = build_settings(server_config, args)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if importlib.util.find_spec('gunicorn') is None:
+        run_single_process(gunicorn_settings, socketio_options, config_file)
+        return 0
+
+    print(f"Serving on {gunicorn_settings['bind']} with {gunicorn_settings['workers']} "
+          f"{gunicorn_settings['worker_class']} worker(s)")
+    if gunicorn_settings['workers'] > 1 and 'message_queue' not in socketio_options:
+        print("No Socket.IO message queue configured: events are delivered within each worker")
+    run_gunicorn(gunicorn_settings, socketio_options, config_file)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+# app/utils/csv_export.py
+import csv
+import io
+import zlib
+from contextlib import ExitStack
+
+from flask import Response, request
+
+from app.utils.database import get_db_connection
+
+# Rows fetched from the cursor per fetchmany() call
+EXPORT_BATCH_SIZE = 1000
+
+# Buffered CSV text is flushed to the client once it reaches this size
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def iter_csv_chunks(cursor, header, format_row=None, compress=False, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yield an export as CSV byte chunks, reading the cursor batch by batch.
+
+    Only one batch of rows and one chunk of output are held at a time, so memory does not
+    grow with the size of the export. With compress=True the chunks form a gzip stream.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush():
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+
+    writer.writerow(header)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        if format_row:
+            rows = [format_row(row) for row in rows]
+        writer.writerows(rows)
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            chunk = flush()
+            if chunk:
+                yield chunk
+
+    chunk = flush()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+
+def stream_csv_export(query, params, header, filename, format_row=None, compress=None):
+    """
+    Streaming CSV download of a query against the assets database.
+
+    The query runs before the response is returned, so SQL errors still reach the route's
+    error handling. The connection then stays open until the last row has been sent.
+
+    Args:
+        query: SELECT to export
+        params: Query parameters
+        header: CSV header row
+        filename: Download file name
+        format_row: Maps a sqlite3.Row to the CSV row; rows are written as-is without it
+        compress: gzip the body; by default when the client sends Accept-Encoding: gzip
+    """
+    if compress is None:
+        compress = 'gzip' in request.headers.get('Accept-Encoding', '')
+
+    resources = ExitStack()
+    conn = resources.enter_context(get_db_connection())
+    try:
+        cursor = conn.execute(query, params)
+    except Exception:
+        resources.close()
+        raise
+
+    def generate():
+        # Also runs if the client disconnects and the server closes the generator
+        with resources:
+            yield from iter_csv_chunks(cursor, header, format_row, compress)
+
+    response = Response(generate(), mimetype='text/csv')
+    # Covers a response that is closed before the body was ever iterated
+    response.call_on_close(resources.close)
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    response.headers['Vary'] = 'Accept-Encoding'
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
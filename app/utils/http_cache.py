@@ -0,0 +1,196 @@
+# app/utils/http_cache.py
+"""
+HTTP validators and pre-compressed bodies for content endpoints.
+
+Capture files, diffs and maps only change when a loader or the map pipeline rewrites them, so
+responses carry an ETag (and Last-Modified where there is a file). Browsers revalidate with
+If-None-Match / If-Modified-Since and get a bodyless 304 when nothing changed; the route
+checks the validator before reading the file or rendering anything.
+
+Bodies sent in full are compressed once per ETag and encoding (brotli when the optional
+brotli package is installed and the client accepts it, otherwise gzip) and kept in a
+byte-bounded LRU, so repeat downloads by other clients skip the compression too.
+"""
+import hashlib
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from flask import Response, json, request, session
+from werkzeug.http import is_resource_modified
+
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+# Smaller bodies are sent as-is; compression would barely pay for its headers
+COMPRESS_MIN_SIZE = 1024
+
+# Upper bound for cached compressed bodies, across all endpoints
+COMPRESSED_CACHE_BYTES = 32 * 1024 * 1024
+
+# Private content that may be reused only after revalidation
+CACHE_CONTROL = 'private, no-cache'
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _release_token():
+    """
+    Identifies the deployed templates and code, the same in every worker process.
+
+    ANGUIS_RELEASE (e.g. a git commit set by the deploy) wins; otherwise the paths, sizes and
+    mtimes of the app's templates and Python modules, so a deploy changes page ETags.
+    """
+    release = os.environ.get('ANGUIS_RELEASE')
+    if release:
+        return release
+
+    files = []
+    for root, dirs, names in os.walk(APP_DIR):
+        dirs[:] = sorted(d for d in dirs if d not in ('__pycache__', 'static'))
+        for name in sorted(names):
+            if name.endswith(('.html', '.py')):
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((os.path.relpath(path, APP_DIR), stat.st_mtime_ns, stat.st_size))
+    return values_etag(*files)
+
+_compressed = OrderedDict()
+_compressed_bytes = 0
+_compressed_lock = threading.Lock()
+
+
+def values_etag(*values):
+    """ETag for content derived from the given values (database rows, content hashes, ...)"""
+    return hashlib.sha1(repr(values).encode('utf-8')).hexdigest()[:24]
+
+
+def page_etag(*values):
+    """ETag for a rendered template: the values plus the deployed release and the signed-in user"""
+    return values_etag(_RELEASE_TOKEN, session.get('username'), *values)
+
+
+# Rendered pages depend on templates and code too, not only on their values
+_RELEASE_TOKEN = _release_token()
+
+
+def file_validators(path, *extra):
+    """
+    (etag, last_modified) for a file from its size and mtime, without reading it.
+
+    extra values (e.g. the capture timestamp from the database) are folded into the ETag.
+    """
+    stat = os.stat(path)
+    etag = values_etag(os.path.abspath(path), stat.st_mtime_ns, stat.st_size, *extra)
+    last_modified = datetime.fromtimestamp(int(stat.st_mtime), tz=timezone.utc)
+    return etag, last_modified
+
+
+def _set_validators(response, etag, last_modified=None):
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def not_modified(etag, last_modified=None):
+    """A 304 response if the client's cached copy is current, else None"""
+    if is_resource_modified(request.environ, etag=f'W/"{etag}"', last_modified=last_modified):
+        return None
+    return _set_validators(Response(status=304), etag, last_modified)
+
+
+def _accepted_encoding():
+    accepted = request.headers.get('Accept-Encoding', '')
+    if BROTLI_AVAILABLE and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def _compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=5)
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _compressed_body(etag, data, encoding):
+    global _compressed_bytes
+    key = (etag, encoding)
+    with _compressed_lock:
+        body = _compressed.get(key)
+        if body is not None:
+            _compressed.move_to_end(key)
+            return body
+
+    body = _compress(data, encoding)
+    if len(body) > COMPRESSED_CACHE_BYTES // 4:
+        return body
+
+    with _compressed_lock:
+        if key not in _compressed:
+            _compressed[key] = body
+            _compressed_bytes += len(body)
+            while _compressed_bytes > COMPRESSED_CACHE_BYTES:
+                _, evicted = _compressed.popitem(last=False)
+                _compressed_bytes -= len(evicted)
+    return body
+
+
+def cached_response(data, mimetype, etag, last_modified=None, headers=None):
+    """
+    Full response with validators, compressed when the client accepts it.
+
+    Args:
+        data: Body as bytes or str (UTF-8)
+        mimetype: Response mimetype
+        etag: Value from values_etag / file_validators / page_etag
+        last_modified: Optional Last-Modified datetime
+        headers: Extra headers, e.g. Content-Disposition
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+
+    encoding = _accepted_encoding() if len(data) >= COMPRESS_MIN_SIZE else None
+    if encoding:
+        data = _compressed_body(etag, data, encoding)
+
+    response = Response(data, mimetype=mimetype, headers=headers)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return _set_validators(response, etag, last_modified)
+
+
+def cached_json(payload, etag, last_modified=None):
+    """cached_response for a JSON payload"""
+    return cached_response(json.dumps(payload), 'application/json', etag, last_modified)
+
+
+def cached_file(path, mimetype, download_name=None):
+    """Serve a file with validators; answers 304 without reading it when the client is current"""
+    etag, last_modified = file_validators(path)
+    response = not_modified(etag, last_modified)
+    if response is not None:
+        return response
+
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    headers = None
+    if download_name:
+        headers = {'Content-Disposition': f'attachment; filename="{download_name}"'}
+    return cached_response(data, mimetype, etag, last_modified, headers)
@@ -525,6 +525,9 @@ class ArpCaptureLoader:
         if max_files:
             captures = captures[:max_files]
 
+        # ARP history is stored as intervals, so captures must be applied oldest first
+        captures.reverse()
+
         stats = {
             'files_processed': 0,
             'files_skipped': 0,
@@ -1,35 +1,198 @@
 #!/usr/bin/env python3
 """
 Anguis Network Management System - ARP Database Initialization
-Creates fresh arp_cat.db with complete schema
+Creates fresh arp_cat.db with complete schema, and migrates existing databases to the
+compact arp_entries layout.
+
+arp_entries stores MACs as 48-bit integers and IPv4 addresses as integers. IPv6
+addresses (NDP tables) are stored as their canonical compressed text. Interface names
+and source files are interned. The v_current_arp / v_mac_history / v_device_summary
+views keep returning the original text columns.
+
+History is interval encoded. Each arp_entries row is one binding (IP, MAC, interface)
+with first_seen / last_seen / seen_count. A capture in which the binding is unchanged
+only moves last_seen forward.
+
+Usage:
+  python arp_cat_init_schema.py                        # create a fresh arp_cat.db
+  python arp_cat_init_schema.py --migrate arp_cat.db   # upgrade in place, keeps data
+  python arp_cat_init_schema.py --benchmark 20000      # legacy vs compact size and lookups
 """
 
+import argparse
+import ipaddress
+import os
+import random
+import re
+import shutil
 import sqlite3
+import tempfile
+import time
+from itertools import groupby
 from pathlib import Path
+from typing import Optional, Tuple, Union
 
+# Layout version stored in PRAGMA user_version; databases below it are migrated on open
+#   2 - integer MAC/IP, interned names, one row per binding per capture
+#   3 - one row per binding interval (first_seen / last_seen / seen_count)
+ARP_SCHEMA_VERSION = 3
 
-def init_arp_cat_db(db_path: str = "arp_cat.db"):
-    """Initialize arp_cat.db with complete schema"""
+# MAC notations a device may print. arp_entries keeps the integer MAC plus the notation
+# code, and the views rebuild mac_address_raw from the pair. Notations that are not
+# listed here are stored verbatim in arp_entries.mac_address_raw.
+MAC_FORMAT_COLON = 1    # aa:bb:cc:dd:ee:ff (Juniper, Fortinet, Linux)
+MAC_FORMAT_DOTTED = 2   # aabb.ccdd.eeff (Cisco, Arista)
+MAC_FORMAT_HYPHEN = 3   # aa-bb-cc-dd-ee-ff
+MAC_FORMAT_HP = 4       # aabbcc-ddeeff (HP/Aruba)
+MAC_FORMAT_BARE = 5     # aabbccddeeff
+MAC_FORMATS = (MAC_FORMAT_COLON, MAC_FORMAT_DOTTED, MAC_FORMAT_HYPHEN, MAC_FORMAT_HP, MAC_FORMAT_BARE)
 
-    db_file = Path(db_path)
+# SQL rendering of the compact columns, shared by the views and ArpCatUtil's searches
+MAC_TEXT_SQL = """printf('%02x:%02x:%02x:%02x:%02x:%02x', (ae.mac >> 40) & 255, (ae.mac >> 32) & 255,
+                       (ae.mac >> 24) & 255, (ae.mac >> 16) & 255, (ae.mac >> 8) & 255, ae.mac & 255)"""
 
-    # Remove existing database if present
-    if db_file.exists():
-        print(f"Removing existing {db_path}...")
-        db_file.unlink()
+MAC_RAW_SQL = f"""COALESCE(ae.mac_address_raw, CASE ae.mac_format
+                WHEN {MAC_FORMAT_DOTTED} THEN printf('%04x.%04x.%04x', (ae.mac >> 32) & 65535,
+                                                     (ae.mac >> 16) & 65535, ae.mac & 65535)
+                WHEN {MAC_FORMAT_HYPHEN} THEN replace({MAC_TEXT_SQL}, ':', '-')
+                WHEN {MAC_FORMAT_HP} THEN printf('%06x-%06x', ae.mac >> 24, ae.mac & 16777215)
+                WHEN {MAC_FORMAT_BARE} THEN printf('%012x', ae.mac)
+                ELSE {MAC_TEXT_SQL}
+            END)"""
 
-    print(f"Creating {db_path}...")
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+IP_TEXT_SQL = """CASE WHEN typeof(ae.ip) = 'integer'
+                THEN printf('%d.%d.%d.%d', (ae.ip >> 24) & 255, (ae.ip >> 16) & 255,
+                            (ae.ip >> 8) & 255, ae.ip & 255)
+                ELSE ae.ip
+            END"""
 
-    # Enable foreign keys
-    cursor.execute("PRAGMA foreign_keys = ON")
+CURRENT_ARP_COLUMNS_SQL = f"""
+            ae.id,
+            d.hostname,
+            d.device_type,
+            d.vendor,
+            c.context_name,
+            c.context_type,
+            {IP_TEXT_SQL} AS ip_address,
+            {MAC_TEXT_SQL} AS mac_address,
+            {MAC_RAW_SQL} AS mac_address_raw,
+            i.name AS interface_name,
+            ae.entry_type,
+            ae.age,
+            ae.protocol,
+            ae.last_seen AS capture_timestamp,
+            sf.path AS source_file,
+            ae.first_seen,
+            ae.last_seen"""
 
-    print("Creating tables...")
+MAC_HISTORY_COLUMNS_SQL = f"""
+            {MAC_TEXT_SQL} AS mac_address,
+            {IP_TEXT_SQL} AS ip_address,
+            d.hostname,
+            c.context_name,
+            c.context_type,
+            i.name AS interface_name,
+            ae.last_seen AS capture_timestamp,
+            ae.entry_type,
+            ae.first_seen,
+            ae.last_seen,
+            ae.seen_count"""
+
+ARP_ENTRY_JOINS_SQL = """
+        FROM arp_entries ae
+        JOIN devices d ON ae.device_id = d.id
+        JOIN contexts c ON ae.context_id = c.id
+        LEFT JOIN interfaces i ON ae.interface_id = i.id
+        LEFT JOIN source_files sf ON ae.source_file_id = sf.id"""
+
+# tr_update_snapshot_count (schema 0-2) is dropped on migration; ingestion sets total_entries
+ARP_TRIGGERS = ('tr_update_device_last_seen', 'tr_update_context_last_seen', 'tr_update_snapshot_count')
+ARP_VIEWS = ('v_current_arp', 'v_device_summary', 'v_mac_history')
+
+# Text-column arp_entries layout (schema version 0/1), kept for migration and the benchmark
+LEGACY_ARP_ENTRIES_SQL = """
+        CREATE TABLE arp_entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            device_id INTEGER NOT NULL,
+            context_id INTEGER NOT NULL,
+            ip_address TEXT NOT NULL,
+            mac_address TEXT NOT NULL,
+            mac_address_raw TEXT NOT NULL,
+            interface_name TEXT,
+            entry_type TEXT,
+            age TEXT,
+            protocol TEXT DEFAULT 'IPv4',
+            capture_timestamp TEXT NOT NULL,
+            source_file TEXT,
+            source_command TEXT,
+            is_current BOOLEAN DEFAULT 1,
+            FOREIGN KEY (device_id) REFERENCES devices(id) ON DELETE CASCADE,
+            FOREIGN KEY (context_id) REFERENCES contexts(id) ON DELETE CASCADE
+        )
+    """
 
+LEGACY_ARP_INDEXES = {
+    'idx_arp_entries_device_context': 'arp_entries(device_id, context_id)',
+    'idx_arp_entries_mac': 'arp_entries(mac_address)',
+    'idx_arp_entries_ip': 'arp_entries(ip_address)',
+    'idx_arp_entries_mac_ip': 'arp_entries(mac_address, ip_address)',
+    'idx_arp_entries_timestamp': 'arp_entries(capture_timestamp)',
+    'idx_arp_entries_current': 'arp_entries(is_current)',
+}
+
+
+def mac_to_int(mac: str) -> int:
+    """Convert a MAC address in any vendor notation to its 48-bit integer value"""
+    clean_mac = re.sub(r'[^a-fA-F0-9]', '', mac or '')
+    if len(clean_mac) != 12:
+        raise ValueError(f"Invalid MAC address length: {mac} (cleaned: {clean_mac})")
+    return int(clean_mac, 16)
+
+
+def format_mac(mac: int, mac_format: int = MAC_FORMAT_COLON) -> str:
+    """Render a 48-bit MAC in one of the MAC_FORMATS notations"""
+    hex_mac = f"{mac:012x}"
+    if mac_format == MAC_FORMAT_DOTTED:
+        return f"{hex_mac[0:4]}.{hex_mac[4:8]}.{hex_mac[8:12]}"
+    if mac_format == MAC_FORMAT_HP:
+        return f"{hex_mac[0:6]}-{hex_mac[6:12]}"
+    if mac_format == MAC_FORMAT_BARE:
+        return hex_mac
+    separator = '-' if mac_format == MAC_FORMAT_HYPHEN else ':'
+    return separator.join(hex_mac[i:i + 2] for i in range(0, 12, 2))
+
+
+def mac_format_code(mac_raw: Optional[str], mac: int) -> Optional[int]:
+    """Notation code that reproduces mac_raw exactly, or None if it has to be stored verbatim"""
+    if mac_raw is None:
+        return None
+    for mac_format in MAC_FORMATS:
+        if format_mac(mac, mac_format) == mac_raw:
+            return mac_format
+    return None
+
+
+def encode_ip(ip: str) -> Union[int, str]:
+    """Storage key for an IP address: IPv4 as an integer, IPv6 as compressed text"""
+    address = ipaddress.ip_address(ip.strip())
+    return int(address) if address.version == 4 else address.compressed
+
+
+def mac_prefix_range(prefix: str) -> Tuple[int, int]:
+    """Inclusive 48-bit range of MACs starting with a hex prefix, e.g. an OUI like 00:1B:17"""
+    clean_prefix = re.sub(r'[\s:.\-]', '', prefix or '')
+    if not re.fullmatch(r'[a-fA-F0-9]{1,12}', clean_prefix):
+        raise ValueError(f"Invalid MAC prefix: {prefix}")
+    free_bits = 4 * (12 - len(clean_prefix))
+    low = int(clean_prefix, 16) << free_bits
+    return low, low | ((1 << free_bits) - 1)
+
+
+def create_tables(cursor):
+    """Create any missing tables (existing tables are left untouched)"""
     # Devices table
     cursor.execute("""
-        CREATE TABLE devices (
+        CREATE TABLE IF NOT EXISTS devices (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             hostname TEXT UNIQUE NOT NULL,
             normalized_hostname TEXT UNIQUE NOT NULL,
@@ -45,7 +208,7 @@ def init_arp_cat_db(db_path: str = "arp_cat.db"):
 
     # Contexts table
     cursor.execute("""
-        CREATE TABLE contexts (
+        CREATE TABLE IF NOT EXISTS contexts (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             device_id INTEGER NOT NULL,
             context_name TEXT NOT NULL DEFAULT 'default',
@@ -60,7 +223,7 @@ def init_arp_cat_db(db_path: str = "arp_cat.db"):
 
     # ARP snapshots table
     cursor.execute("""
-        CREATE TABLE arp_snapshots (
+        CREATE TABLE IF NOT EXISTS arp_snapshots (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             device_id INTEGER NOT NULL,
             context_id INTEGER NOT NULL,
@@ -77,51 +240,78 @@ def init_arp_cat_db(db_path: str = "arp_cat.db"):
         )
     """)
 
-    # ARP entries table
+    # Interned interface names and capture files
     cursor.execute("""
-        CREATE TABLE arp_entries (
+        CREATE TABLE IF NOT EXISTS interfaces (
+            id INTEGER PRIMARY KEY,
+            name TEXT UNIQUE NOT NULL
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS source_files (
+            id INTEGER PRIMARY KEY,
+            path TEXT UNIQUE NOT NULL
+        )
+    """)
+
+    # ARP entries table, one row per binding interval - ip has no declared type so IPv4
+    # integers and IPv6 text are kept as-is
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS arp_entries (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             device_id INTEGER NOT NULL,
             context_id INTEGER NOT NULL,
-            ip_address TEXT NOT NULL,
-            mac_address TEXT NOT NULL,
-            mac_address_raw TEXT NOT NULL,
-            interface_name TEXT,
+            ip NOT NULL,
+            mac INTEGER NOT NULL,
+            mac_format INTEGER,
+            mac_address_raw TEXT,
+            interface_id INTEGER,
             entry_type TEXT,
             age TEXT,
             protocol TEXT DEFAULT 'IPv4',
-            capture_timestamp TEXT NOT NULL,
-            source_file TEXT,
+            first_seen TEXT NOT NULL,
+            last_seen TEXT NOT NULL,
+            seen_count INTEGER NOT NULL DEFAULT 1,
+            source_file_id INTEGER,
             source_command TEXT,
-            is_current BOOLEAN DEFAULT 1,
+            is_current INTEGER DEFAULT 1,
             FOREIGN KEY (device_id) REFERENCES devices(id) ON DELETE CASCADE,
-            FOREIGN KEY (context_id) REFERENCES contexts(id) ON DELETE CASCADE
+            FOREIGN KEY (context_id) REFERENCES contexts(id) ON DELETE CASCADE,
+            FOREIGN KEY (interface_id) REFERENCES interfaces(id),
+            FOREIGN KEY (source_file_id) REFERENCES source_files(id)
         )
     """)
 
-    print("Creating indexes...")
 
+def create_indexes(cursor):
+    """Create any missing indexes"""
     # Context indexes
-    cursor.execute("CREATE INDEX idx_contexts_device ON contexts(device_id)")
-    cursor.execute("CREATE INDEX idx_contexts_name_type ON contexts(context_name, context_type)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_contexts_device ON contexts(device_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_contexts_name_type ON contexts(context_name, context_type)")
 
     # Snapshot indexes
-    cursor.execute("CREATE INDEX idx_snapshots_device_context ON arp_snapshots(device_id, context_id)")
-    cursor.execute("CREATE INDEX idx_snapshots_timestamp ON arp_snapshots(capture_timestamp)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_device_context ON arp_snapshots(device_id, context_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_snapshots_timestamp ON arp_snapshots(capture_timestamp)")
 
-    # ARP entry indexes
-    cursor.execute("CREATE INDEX idx_arp_entries_device_context ON arp_entries(device_id, context_id)")
-    cursor.execute("CREATE INDEX idx_arp_entries_mac ON arp_entries(mac_address)")
-    cursor.execute("CREATE INDEX idx_arp_entries_ip ON arp_entries(ip_address)")
-    cursor.execute("CREATE INDEX idx_arp_entries_mac_ip ON arp_entries(mac_address, ip_address)")
-    cursor.execute("CREATE INDEX idx_arp_entries_timestamp ON arp_entries(capture_timestamp)")
-    cursor.execute("CREATE INDEX idx_arp_entries_current ON arp_entries(is_current)")
+    # ARP entry indexes - (mac, ip) also serves MAC-only lookups
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_arp_entries_device_context ON arp_entries(device_id, context_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_arp_entries_mac_ip ON arp_entries(mac, ip)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_arp_entries_ip ON arp_entries(ip)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_arp_entries_last_seen ON arp_entries(last_seen)")
 
-    print("Creating triggers...")
+    # Only current rows are indexed; retiring a device/context's table touches just these
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_arp_entries_current
+        ON arp_entries(device_id, context_id) WHERE is_current = 1
+    """)
 
+
+def create_triggers(cursor):
+    """Create any missing triggers"""
     # Update device last seen on ARP entry insert
     cursor.execute("""
-        CREATE TRIGGER tr_update_device_last_seen
+        CREATE TRIGGER IF NOT EXISTS tr_update_device_last_seen
         AFTER INSERT ON arp_entries
         FOR EACH ROW
         BEGIN
@@ -133,7 +323,7 @@ def init_arp_cat_db(db_path: str = "arp_cat.db"):
 
     # Update context last seen on ARP entry insert
     cursor.execute("""
-        CREATE TRIGGER tr_update_context_last_seen
+        CREATE TRIGGER IF NOT EXISTS tr_update_context_last_seen
         AFTER INSERT ON arp_entries
         FOR EACH ROW
         BEGIN
@@ -143,66 +333,30 @@ def init_arp_cat_db(db_path: str = "arp_cat.db"):
         END
     """)
 
-    # Update snapshot count on ARP entry insert
-    cursor.execute("""
-        CREATE TRIGGER tr_update_snapshot_count
-        AFTER INSERT ON arp_entries
-        FOR EACH ROW
-        BEGIN
-            UPDATE arp_snapshots
-            SET total_entries = (
-                SELECT COUNT(*)
-                FROM arp_entries
-                WHERE device_id = NEW.device_id
-                AND context_id = NEW.context_id
-                AND capture_timestamp = NEW.capture_timestamp
-            )
-            WHERE device_id = NEW.device_id
-            AND context_id = NEW.context_id
-            AND capture_timestamp = NEW.capture_timestamp;
-        END
-    """)
-
-    print("Creating views...")
 
+def create_views(cursor):
+    """Create any missing views; column names match the original text-column views"""
     # Current ARP view
-    cursor.execute("""
-        CREATE VIEW v_current_arp AS
-        SELECT
-            ae.id,
-            d.hostname,
-            d.device_type,
-            d.vendor,
-            c.context_name,
-            c.context_type,
-            ae.ip_address,
-            ae.mac_address,
-            ae.mac_address_raw,
-            ae.interface_name,
-            ae.entry_type,
-            ae.age,
-            ae.protocol,
-            ae.capture_timestamp,
-            ae.source_file
-        FROM arp_entries ae
-        JOIN devices d ON ae.device_id = d.id
-        JOIN contexts c ON ae.context_id = c.id
+    cursor.execute(f"""
+        CREATE VIEW IF NOT EXISTS v_current_arp AS
+        SELECT {CURRENT_ARP_COLUMNS_SQL}
+        {ARP_ENTRY_JOINS_SQL}
         WHERE ae.is_current = 1
-        ORDER BY ae.capture_timestamp DESC
+        ORDER BY ae.last_seen DESC
     """)
 
     # Device summary view
     cursor.execute("""
-        CREATE VIEW v_device_summary AS
+        CREATE VIEW IF NOT EXISTS v_device_summary AS
         SELECT
             d.hostname,
             d.device_type,
             d.vendor,
             d.site_code,
             COUNT(DISTINCT c.id) as context_count,
-            COUNT(DISTINCT ae.mac_address) as unique_macs,
+            COUNT(DISTINCT ae.mac) as unique_macs,
             COUNT(ae.id) as total_arp_entries,
-            MAX(ae.capture_timestamp) as last_arp_capture,
+            MAX(ae.last_seen) as last_arp_capture,
             MAX(s.capture_timestamp) as last_snapshot
         FROM devices d
         LEFT JOIN contexts c ON d.id = c.device_id
@@ -213,34 +367,390 @@ def init_arp_cat_db(db_path: str = "arp_cat.db"):
     """)
 
     # MAC history view
+    cursor.execute(f"""
+        CREATE VIEW IF NOT EXISTS v_mac_history AS
+        SELECT {MAC_HISTORY_COLUMNS_SQL},
+            SUM(ae.seen_count) OVER (PARTITION BY ae.mac) as total_occurrences
+        {ARP_ENTRY_JOINS_SQL}
+        ORDER BY ae.mac, ae.last_seen DESC
+    """)
+
+
+def create_schema(conn: sqlite3.Connection):
+    """Create the complete schema in an empty (or partially created) database"""
+    cursor = conn.cursor()
+    create_tables(cursor)
+    create_indexes(cursor)
+    create_triggers(cursor)
+    create_views(cursor)
+    cursor.execute(f"PRAGMA user_version = {ARP_SCHEMA_VERSION}")
+    conn.commit()
+
+
+def collapse_to_intervals(rows):
+    """
+    Fold per-capture ARP rows into binding intervals.
+
+    Args:
+        rows: sqlite3.Row / dict rows in encoded form (ip, mac, interface_id, ...,
+              capture_timestamp), ordered by device_id, context_id, capture_timestamp
+
+    Yields:
+        Interval dicts ready for insertion into arp_entries. A binding seen in consecutive
+        captures of its device/context is one interval; a gap starts a new one.
+    """
+    for _, context_rows in groupby(rows, key=lambda row: (row['device_id'], row['context_id'])):
+        open_intervals = {}
+        for capture_timestamp, capture_rows in groupby(context_rows, key=lambda row: row['capture_timestamp']):
+            seen = {}
+            for row in capture_rows:
+                key = (row['ip'], row['mac'], row['interface_id'])
+                if key in seen:
+                    continue
+                interval = open_intervals.get(key)
+                if interval is None:
+                    interval = {column: row[column] for column in (
+                        'id', 'device_id', 'context_id', 'ip', 'mac', 'mac_format', 'mac_address_raw',
+                        'interface_id', 'protocol')}
+                    interval.update(first_seen=capture_timestamp, seen_count=0)
+                # The latest observation wins for the descriptive columns
+                interval.update(last_seen=capture_timestamp, seen_count=interval['seen_count'] + 1,
+                                entry_type=row['entry_type'], age=row['age'],
+                                source_file_id=row['source_file_id'], source_command=row['source_command'],
+                                is_current=row['is_current'])
+                seen[key] = interval
+
+            # Bindings missing from this capture have ended
+            for key, interval in open_intervals.items():
+                if key not in seen:
+                    yield interval
+            open_intervals = seen
+
+        yield from open_intervals.values()
+
+
+def migrate_arp_cat_db(conn: sqlite3.Connection) -> bool:
+    """
+    Upgrade an existing arp_cat.db to ARP_SCHEMA_VERSION in a single transaction.
+
+    Text-column rows (schema 0/1) are re-encoded (integer MAC/IP, interned interface and
+    source file). Per-capture rows (schema 0-2) are collapsed into binding intervals, each
+    keeping the id of its first row. Triggers and views are recreated.
+
+    Returns:
+        True if the database was migrated
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= ARP_SCHEMA_VERSION:
+        return False
+
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(arp_entries)")}
+    text_columns = 'mac_address' in columns and 'mac' not in columns
+    per_capture = 'capture_timestamp' in columns
+
+    conn.create_function('arp_encode_ip', 1, encode_ip, deterministic=True)
+    conn.create_function('arp_mac_to_int', 1, mac_to_int, deterministic=True)
+    conn.create_function('arp_mac_format', 2, mac_format_code, deterministic=True)
+
+    cursor = conn.cursor()
+    cursor.execute("BEGIN")
+    try:
+        # Triggers must not fire while rows are copied, and views reference the old columns
+        for trigger in ARP_TRIGGERS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        for view in ARP_VIEWS:
+            cursor.execute(f"DROP VIEW IF EXISTS {view}")
+
+        if per_capture:
+            cursor.execute("ALTER TABLE arp_entries RENAME TO arp_entries_old")
+            old_indexes = cursor.execute("""
+                SELECT name FROM sqlite_master
+                WHERE type = 'index' AND tbl_name = 'arp_entries_old' AND sql IS NOT NULL
+            """).fetchall()
+            for (index,) in old_indexes:
+                cursor.execute(f"DROP INDEX {index}")
+
+        create_tables(cursor)
+        create_indexes(cursor)
+
+        if text_columns:
+            cursor.execute("""
+                INSERT OR IGNORE INTO interfaces (name)
+                SELECT DISTINCT interface_name FROM arp_entries_old
+                WHERE interface_name IS NOT NULL
+            """)
+            cursor.execute("""
+                INSERT OR IGNORE INTO source_files (path)
+                SELECT DISTINCT source_file FROM arp_entries_old
+                WHERE source_file IS NOT NULL
+            """)
+            source_sql = """
+                SELECT
+                    l.id, l.device_id, l.context_id, l.ip, l.mac, l.mac_format,
+                    CASE WHEN l.mac_format IS NULL THEN l.mac_address_raw END AS mac_address_raw,
+                    i.id AS interface_id, l.entry_type, l.age, l.protocol, l.capture_timestamp,
+                    sf.id AS source_file_id, l.source_command, l.is_current
+                FROM (
+                    SELECT *,
+                        arp_encode_ip(ip_address) AS ip,
+                        arp_mac_to_int(mac_address) AS mac,
+                        arp_mac_format(mac_address_raw, arp_mac_to_int(mac_address)) AS mac_format
+                    FROM arp_entries_old
+                ) l
+                LEFT JOIN interfaces i ON i.name = l.interface_name
+                LEFT JOIN source_files sf ON sf.path = l.source_file
+                ORDER BY l.device_id, l.context_id, l.capture_timestamp, l.id
+            """
+        else:
+            source_sql = """
+                SELECT * FROM arp_entries_old
+                ORDER BY device_id, context_id, capture_timestamp, id
+            """
+
+        if per_capture:
+            reader = conn.cursor()
+            reader.row_factory = sqlite3.Row
+            cursor.executemany("""
+                INSERT INTO arp_entries (
+                    id, device_id, context_id, ip, mac, mac_format, mac_address_raw,
+                    interface_id, entry_type, age, protocol, first_seen, last_seen,
+                    seen_count, source_file_id, source_command, is_current
+                ) VALUES (
+                    :id, :device_id, :context_id, :ip, :mac, :mac_format, :mac_address_raw,
+                    :interface_id, :entry_type, :age, :protocol, :first_seen, :last_seen,
+                    :seen_count, :source_file_id, :source_command, :is_current
+                )
+            """, collapse_to_intervals(reader.execute(source_sql)))
+            cursor.execute("DROP TABLE arp_entries_old")
+
+        create_triggers(cursor)
+        create_views(cursor)
+        cursor.execute(f"PRAGMA user_version = {ARP_SCHEMA_VERSION}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return True
+
+
+def init_arp_cat_db(db_path: str = "arp_cat.db"):
+    """Initialize arp_cat.db with complete schema"""
+
+    db_file = Path(db_path)
+
+    # Remove existing database if present
+    if db_file.exists():
+        print(f"Removing existing {db_path}...")
+        db_file.unlink()
+
+    print(f"Creating {db_path}...")
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+
+    # Enable foreign keys
+    cursor.execute("PRAGMA foreign_keys = ON")
+
+    print("Creating tables...")
+    create_tables(cursor)
+
+    print("Creating indexes...")
+    create_indexes(cursor)
+
+    print("Creating triggers...")
+    create_triggers(cursor)
+
+    print("Creating views...")
+    create_views(cursor)
+
+    cursor.execute(f"PRAGMA user_version = {ARP_SCHEMA_VERSION}")
+    conn.commit()
+    conn.close()
+
+    print(f"Database {db_path} initialized successfully!")
+    print("\nSchema created:")
+    print("  - 6 tables")
+    print("  - 9 indexes")
+    print("  - 2 triggers")
+    print("  - 3 views")
+
+
+def migrate_db_file(db_path: str) -> int:
+    """Migrate an arp_cat.db file in place, printing before/after sizes"""
+    if not os.path.exists(db_path):
+        print(f"Database not found: {db_path}")
+        return 1
+
+    size_before = os.path.getsize(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys = ON")
+    start_time = time.time()
+    migrated = migrate_arp_cat_db(conn)
+    elapsed = time.time() - start_time
+    if migrated:
+        conn.execute("VACUUM")
+    conn.close()
+
+    if not migrated:
+        print(f"{db_path} is already at schema version {ARP_SCHEMA_VERSION}")
+        return 0
+
+    size_after = os.path.getsize(db_path)
+    print(f"Migrated {db_path} to schema version {ARP_SCHEMA_VERSION} in {elapsed:.2f}s")
+    print(f"  Size: {size_before / 1024:.0f} KB -> {size_after / 1024:.0f} KB")
+    return 0
+
+
+def _build_legacy_benchmark_db(db_path: str, entries: int, captures: int, devices: int):
+    """Text-column database with `captures` snapshots of `entries` bindings spread over `devices`"""
+    rng = random.Random(42)
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute(LEGACY_ARP_ENTRIES_SQL)
+    create_tables(cursor)
+    for index, columns in LEGACY_ARP_INDEXES.items():
+        cursor.execute(f"CREATE INDEX {index} ON {columns}")
+    # Legacy views, as the text-column schema defined them
+    cursor.execute("""
+        CREATE VIEW v_current_arp AS
+        SELECT ae.id, d.hostname, d.device_type, d.vendor, c.context_name, c.context_type,
+               ae.ip_address, ae.mac_address, ae.mac_address_raw, ae.interface_name, ae.entry_type,
+               ae.age, ae.protocol, ae.capture_timestamp, ae.source_file
+        FROM arp_entries ae
+        JOIN devices d ON ae.device_id = d.id
+        JOIN contexts c ON ae.context_id = c.id
+        WHERE ae.is_current = 1
+        ORDER BY ae.capture_timestamp DESC
+    """)
     cursor.execute("""
         CREATE VIEW v_mac_history AS
-        SELECT
-            ae.mac_address,
-            ae.ip_address,
-            d.hostname,
-            c.context_name,
-            c.context_type,
-            ae.interface_name,
-            ae.capture_timestamp,
-            ae.entry_type,
-            COUNT(*) OVER (PARTITION BY ae.mac_address) as total_occurrences
+        SELECT ae.mac_address, ae.ip_address, d.hostname, c.context_name, c.context_type,
+               ae.interface_name, ae.capture_timestamp, ae.entry_type,
+               COUNT(*) OVER (PARTITION BY ae.mac_address) as total_occurrences
         FROM arp_entries ae
         JOIN devices d ON ae.device_id = d.id
         JOIN contexts c ON ae.context_id = c.id
         ORDER BY ae.mac_address, ae.capture_timestamp DESC
     """)
 
+    per_device = max(1, entries // devices)
+    for device_id in range(1, devices + 1):
+        cursor.execute("INSERT INTO devices (id, hostname, normalized_hostname) VALUES (?, ?, ?)",
+                       (device_id, f"core{device_id:02d}", f"core{device_id:02d}"))
+        cursor.execute("INSERT INTO contexts (id, device_id) VALUES (?, ?)", (device_id, device_id))
+
+        bindings = [(f"10.{device_id}.{i // 256}.{i % 256}", rng.getrandbits(48), f"Vlan{i % 64 + 1}")
+                    for i in range(per_device)]
+        for capture in range(captures):
+            timestamp = f"2025-01-{capture + 1:02d}T06:00:00"
+            source_file = f"capture/arp/core{device_id:02d}_2025-01-{capture + 1:02d}.txt"
+            # ~5% of bindings move to a new MAC between captures
+            bindings = [(ip, rng.getrandbits(48) if rng.random() < 0.05 else mac, interface)
+                        for ip, mac, interface in bindings]
+            cursor.executemany("""
+                INSERT INTO arp_entries (
+                    device_id, context_id, ip_address, mac_address, mac_address_raw,
+                    interface_name, entry_type, age, protocol, capture_timestamp,
+                    source_file, source_command, is_current
+                ) VALUES (?, ?, ?, ?, ?, ?, 'dynamic', '12', 'IPv4', ?, ?, 'show arp', ?)
+            """, [(device_id, device_id, ip, format_mac(mac), format_mac(mac, MAC_FORMAT_DOTTED), interface,
+                   timestamp, source_file, int(capture == captures - 1))
+                  for ip, mac, interface in bindings])
     conn.commit()
     conn.close()
 
-    print(f"Database {db_path} initialized successfully!")
-    print("\nSchema created:")
-    print("  - 4 tables")
-    print("  - 10 indexes")
-    print("  - 3 triggers")
-    print("  - 3 views")
+
+def _time_lookups(conn: sqlite3.Connection, sql: str, keys) -> float:
+    """Average milliseconds per lookup"""
+    start_time = time.perf_counter()
+    for key in keys:
+        conn.execute(sql, (key,)).fetchall()
+    return (time.perf_counter() - start_time) * 1000 / max(1, len(keys))
+
+
+def benchmark_compact_schema(entries: int = 20000, captures: int = 10, devices: int = 4,
+                             lookups: int = 200) -> int:
+    """Compare the text-column and compact layouts on the same synthetic history"""
+    from arp_cat_util import ArpCatUtil
+
+    work_dir = tempfile.mkdtemp(prefix='arp_cat_bench_')
+    legacy_db = os.path.join(work_dir, 'legacy.db')
+    compact_db = os.path.join(work_dir, 'compact.db')
+    try:
+        print(f"Building {captures} captures x {entries} entries over {devices} devices...")
+        _build_legacy_benchmark_db(legacy_db, entries, captures, devices)
+        shutil.copyfile(legacy_db, compact_db)
+
+        conn = sqlite3.connect(compact_db)
+        conn.execute("PRAGMA foreign_keys = ON")
+        start_time = time.time()
+        migrate_arp_cat_db(conn)
+        migrate_time = time.time() - start_time
+        intervals = conn.execute("SELECT COUNT(*) FROM arp_entries").fetchone()[0]
+        conn.execute("VACUUM")
+        conn.close()
+
+        conn = sqlite3.connect(legacy_db)
+        conn.execute("VACUUM")
+        rows = conn.execute("SELECT COUNT(*) FROM arp_entries").fetchone()[0]
+        sample = conn.execute(f"""
+            SELECT mac_address, ip_address FROM arp_entries
+            ORDER BY random() LIMIT {lookups}
+        """).fetchall()
+        macs = [mac for mac, _ in sample]
+        ips = [ip for _, ip in sample]
+        # The legacy history view scans the whole table per lookup; a few keys are enough
+        history_macs, history_ips = macs[:10], ips[:10]
+
+        legacy_times = {
+            'current by MAC': _time_lookups(conn, "SELECT * FROM v_current_arp WHERE mac_address = ?", macs),
+            'current by IP': _time_lookups(conn, "SELECT * FROM v_current_arp WHERE ip_address = ?", ips),
+            'history by MAC': _time_lookups(conn, "SELECT * FROM v_mac_history WHERE mac_address = ?", history_macs),
+            'history by IP': _time_lookups(conn, "SELECT * FROM v_mac_history WHERE ip_address = ?", history_ips),
+        }
+        conn.close()
+
+        with ArpCatUtil(compact_db) as arp_util:
+            def timed(search, keys, history):
+                start = time.perf_counter()
+                for key in keys:
+                    search(key, history=history)
+                return (time.perf_counter() - start) * 1000 / max(1, len(keys))
+
+            compact_times = {
+                'current by MAC': timed(arp_util.search_mac, macs, False),
+                'current by IP': timed(arp_util.search_ip, ips, False),
+                'history by MAC': timed(arp_util.search_mac, history_macs, True),
+                'history by IP': timed(arp_util.search_ip, history_ips, True),
+            }
+
+        legacy_size = os.path.getsize(legacy_db)
+        compact_size = os.path.getsize(compact_db)
+
+        print(f"\n{'=' * 60}")
+        print(f"arp_entries rows: {rows} -> {intervals} intervals  (migration: {migrate_time:.2f}s)")
+        print(f"Database size: {legacy_size / 1024 / 1024:.1f} MB -> {compact_size / 1024 / 1024:.1f} MB "
+              f"({compact_size / legacy_size:.0%})")
+        print(f"\n{'Lookup (ms)':<18} {'legacy':>10} {'compact':>10}")
+        for name, legacy_ms in legacy_times.items():
+            print(f"{name:<18} {legacy_ms:>10.3f} {compact_times[name]:>10.3f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return 0
 
 
 if __name__ == '__main__':
-    init_arp_cat_db()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Create or migrate arp_cat.db")
+    parser.add_argument('db_path', nargs='?', default='arp_cat.db', help='Database path (default: arp_cat.db)')
+    parser.add_argument('--migrate', action='store_true', help='Upgrade an existing database in place')
+    parser.add_argument('--benchmark', type=int, metavar='ENTRIES',
+                        help='Compare legacy and compact layouts with ENTRIES bindings per capture')
+    parser.add_argument('--captures', type=int, default=10, help='Captures per device for --benchmark')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        raise SystemExit(benchmark_compact_schema(args.benchmark, args.captures))
+    if args.migrate:
+        raise SystemExit(migrate_db_file(args.db_path))
+    init_arp_cat_db(args.db_path)
@@ -15,6 +15,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import ipaddress
+from concurrent.futures import ProcessPoolExecutor
 
 # Import our ARP Cat utility
 from arp_cat_util import ArpCatUtil, get_parser
@@ -37,6 +38,9 @@ except ImportError:
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Order of the per-entry tuples produced by ArpCaptureLoader.parse_arp_capture
+ARP_ENTRY_FIELDS = ('ip_address', 'mac_address', 'mac_address_raw', 'interface_name', 'age', 'entry_type')
+
 
 class ArpCaptureLoader:
     """Loads ARP captures from assets.db and processes them into arp_cat.db"""
@@ -434,10 +438,20 @@ class ArpCaptureLoader:
 
     def load_arp_capture(self, capture: Dict) -> int:
         """Load a single ARP capture into arp_cat.db"""
+        return self.store_arp_capture(capture, self.parse_arp_capture(capture))
+
+    def parse_arp_capture(self, capture: Dict) -> Optional[List[Tuple[str, str, List[Tuple]]]]:
+        """
+        Read and parse one ARP capture without touching arp_cat.db.
+
+        Returns [(context_name, context_type, entries)] with each entry a tuple in
+        ARP_ENTRY_FIELDS order, or None if the capture yields nothing to load. Only plain
+        tuples are returned so the result can come back from a worker process.
+        """
         file_path = capture.get('file_path')
         if not file_path or not os.path.exists(file_path):
             logger.warning(f"ARP file not found: {file_path}")
-            return 0
+            return None
 
         logger.info(f"Processing ARP capture: {file_path}")
 
@@ -447,21 +461,11 @@ class ArpCaptureLoader:
                 content = f.read()
         except Exception as e:
             logger.error(f"Error reading file {file_path}: {e}")
-            return 0
+            return None
 
         if not content.strip():
             logger.warning(f"Empty ARP file: {file_path}")
-            return 0
-
-        # Extract device and context information
-        device_info = {
-            'hostname': capture.get('device_name', capture.get('device_normalized_name', 'unknown')),
-            'device_type': capture.get('device_type_name'),
-            'vendor': capture.get('vendor_name'),
-            'model': capture.get('device_model'),
-            'site_code': capture.get('site_code'),
-            'management_ip': capture.get('management_ip')
-        }
+            return None
 
         # Parse ARP entries using TextFSM only
         arp_entries = []
@@ -477,69 +481,80 @@ class ArpCaptureLoader:
                 logger.info(f"TextFSM extracted {len(arp_entries)} ARP entries from {file_path}")
             else:
                 logger.warning(f"TextFSM found no matching templates for {file_path} (vendor: {vendor})")
-                return 0
+                return None
         else:
             logger.error("TextFSM engine not available")
-            return 0
+            return None
 
         if not arp_entries:
             logger.warning(f"No ARP entries extracted from {file_path}")
-            return 0
+            return None
 
         # Group entries by VRF/context
         context_groups = self._group_entries_by_context(arp_entries, vendor)
 
-        # Store in arp_cat.db
+        return [(context_name, self._get_context_type(vendor, context_name),
+                 [tuple(entry.get(field) for field in ARP_ENTRY_FIELDS) for entry in entries])
+                for context_name, entries in context_groups.items()]
+
+    def store_arp_capture(self, capture: Dict, contexts: Optional[List[Tuple[str, str, List[Tuple]]]],
+                          arp_util: ArpCatUtil = None) -> int:
+        """
+        Write a capture parsed by parse_arp_capture to arp_cat.db.
+
+        Each context table is written in one transaction by load_arp_snapshot. Pass an open
+        arp_util to reuse one connection across captures.
+        """
+        if not contexts:
+            return 0
+
+        if arp_util is None:
+            with ArpCatUtil(self.arp_cat_db_path) as arp_util:
+                return self.store_arp_capture(capture, contexts, arp_util)
+
+        file_path = capture.get('file_path')
+
+        # Extract device and context information
+        device_info = {
+            'hostname': capture.get('device_name', capture.get('device_normalized_name', 'unknown')),
+            'device_type': capture.get('device_type_name'),
+            'vendor': capture.get('vendor_name'),
+            'model': capture.get('device_model'),
+            'site_code': capture.get('site_code'),
+            'management_ip': capture.get('management_ip')
+        }
+
         total_entries_loaded = 0
+        capture_timestamp = self._normalize_timestamp(capture.get('capture_timestamp'))
         try:
-            with ArpCatUtil(self.arp_cat_db_path) as arp_util:
-                # Create device
-                device_id = arp_util.get_or_create_device(**device_info)
-
-                # Process each context group
-                for context_name, entries in context_groups.items():
-                    # Determine context type based on vendor
-                    context_type = self._get_context_type(vendor, context_name)
-
-                    context_info = {
-                        'context_name': context_name,
-                        'context_type': context_type,
-                        'description': f"ARP table from {capture.get('capture_timestamp')}"
-                    }
-
-                    context_id = arp_util.get_or_create_context(device_id, **context_info)
-
-                    # Create snapshot for this context
-                    capture_timestamp = self._normalize_timestamp(capture.get('capture_timestamp'))
-
-                    snapshot_id = arp_util.create_snapshot(
-                        device_id, context_id, capture_timestamp,
-                        source_file=file_path,
-                        source_command='show arp',
-                        processing_status='processed'
-                    )
-
-                    # Add ARP entries for this context
-                    entries_loaded = 0
-                    for entry in entries:
-                        try:
-                            arp_util.add_arp_entry(
-                                device_id, context_id,
-                                entry['ip_address'],
-                                entry['mac_address'],
-                                interface_name=entry.get('interface_name'),
-                                entry_type=entry.get('entry_type', 'dynamic'),
-                                age=entry.get('age'),
-                                capture_timestamp=capture_timestamp,
-                                source_file=file_path,
-                                source_command='show arp'
-                            )
-                            entries_loaded += 1
-                        except Exception as e:
-                            logger.warning(f"Error adding ARP entry {entry}: {e}")
-
-                    total_entries_loaded += entries_loaded
-                    logger.info(f"Loaded {entries_loaded} entries for context '{context_name}'")
+            # Create device
+            device_id = arp_util.get_or_create_device(commit=False, **device_info)
+
+            # Process each context group
+            for context_name, context_type, rows in contexts:
+                context_info = {
+                    'context_name': context_name,
+                    'context_type': context_type,
+                    'description': f"ARP table from {capture.get('capture_timestamp')}"
+                }
+
+                context_id = arp_util.get_or_create_context(device_id, commit=False, **context_info)
+
+                # Missing fields are left out so load_arp_snapshot applies its defaults
+                entries = [{field: value for field, value in zip(ARP_ENTRY_FIELDS, row) if value is not None}
+                           for row in rows]
+
+                # Snapshot plus all ARP entries for this context
+                entries_loaded = arp_util.load_arp_snapshot(
+                    device_id, context_id, entries,
+                    capture_timestamp=capture_timestamp,
+                    source_file=file_path,
+                    source_command='show arp',
+                    processing_status='processed'
+                )
+
+                total_entries_loaded += entries_loaded
+                logger.info(f"Loaded {entries_loaded} entries for context '{context_name}'")
 
         except Exception as e:
             logger.error(f"Error storing ARP data for {file_path}: {e}")
@@ -609,13 +624,23 @@ class ArpCaptureLoader:
         except:
             return datetime.now().isoformat()
 
-    def load_all_captures(self, max_files: int = None, device_filter: str = None) -> Dict[str, int]:
-        """Load all ARP captures from assets database"""
+    def load_all_captures(self, max_files: int = None, device_filter: str = None,
+                          workers: int = 1) -> Dict[str, int]:
+        """
+        Load all ARP captures from assets database.
+
+        With workers > 1, TextFSM parsing runs in a process pool while this process stays the
+        only writer to arp_cat.db, storing results in capture order as they become ready.
+        """
         captures = self.get_arp_captures(device_filter=device_filter)
 
         if max_files:
             captures = captures[:max_files]
 
+        # ARP history is stored as intervals, so captures must be applied
+        # oldest first; max_files still selects the newest ones
+        captures.reverse()
+
         stats = {
             'files_processed': 0,
             'files_skipped': 0,
@@ -625,31 +650,63 @@ class ArpCaptureLoader:
 
         logger.info(f"Processing {len(captures)} captures" +
                     (f" (max {max_files})" if max_files else "") +
-                    (f" (filtered by '{device_filter}')" if device_filter else ""))
-
-        for i, capture in enumerate(captures, 1):
-            logger.info(f"\n--- Processing {i}/{len(captures)}: {capture.get('device_name')} ---")
-            logger.info(f"File: {capture.get('file_path')}")
-            logger.info(f"Vendor: {capture.get('vendor_name')}")
-            logger.info(f"Device Type: {capture.get('device_type_name')}")
-
-            try:
-                entries_count = self.load_arp_capture(capture)
-                if entries_count > 0:
-                    stats['files_processed'] += 1
-                    stats['total_entries'] += entries_count
-                    logger.info(f"✓ SUCCESS: Loaded {entries_count} entries")
-                else:
-                    stats['files_skipped'] += 1
-                    logger.warning(f"✗ SKIPPED: No entries loaded")
-            except Exception as e:
-                logger.error(f"✗ ERROR: {e}")
-                stats['errors'] += 1
+                    (f" (filtered by '{device_filter}')" if device_filter else "") +
+                    (f" ({workers} parse workers)" if workers > 1 else ""))
+
+        executor = None
+        if workers > 1 and len(captures) > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker,
+                                           initargs=(self.textfsm_db_path,))
+            parsed = [executor.submit(_parse_capture_worker, capture) for capture in captures]
+
+        try:
+            with ArpCatUtil(self.arp_cat_db_path) as arp_util:
+                for i, capture in enumerate(captures, 1):
+                    logger.info(f"\n--- Processing {i}/{len(captures)}: {capture.get('device_name')} ---")
+                    logger.info(f"File: {capture.get('file_path')}")
+                    logger.info(f"Vendor: {capture.get('vendor_name')}")
+                    logger.info(f"Device Type: {capture.get('device_type_name')}")
+
+                    try:
+                        if executor:
+                            contexts = parsed[i - 1].result()
+                        else:
+                            contexts = self.parse_arp_capture(capture)
+                        entries_count = self.store_arp_capture(capture, contexts, arp_util)
+                        if entries_count > 0:
+                            stats['files_processed'] += 1
+                            stats['total_entries'] += entries_count
+                            logger.info(f"✓ SUCCESS: Loaded {entries_count} entries")
+                        else:
+                            stats['files_skipped'] += 1
+                            logger.warning(f"✗ SKIPPED: No entries loaded")
+                    except Exception as e:
+                        logger.error(f"✗ ERROR: {e}")
+                        stats['errors'] += 1
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
 
         logger.info(f"\nProcessing complete: {stats}")
         return stats
 
 
+# Set in each pool worker by _init_parse_worker
+_parse_loader = None
+
+
+def _init_parse_worker(textfsm_db_path: str):
+    global _parse_loader
+    # Per-capture INFO/DEBUG parse logging from every worker would swamp the console
+    logger.setLevel(logging.WARNING)
+    _parse_loader = ArpCaptureLoader(textfsm_db_path=textfsm_db_path)
+
+
+def _parse_capture_worker(capture: Dict) -> Optional[List[Tuple[str, str, List[Tuple]]]]:
+    """Module level so ProcessPoolExecutor can pickle it; each worker has its own TextFSM engine"""
+    return _parse_loader.parse_arp_capture(capture)
+
+
 def main():
     """Main CLI interface"""
     import argparse
@@ -659,6 +716,8 @@ def main():
     parser.add_argument("--arp-db", default="arp_cat.db", help="Path to ARP cat database")
     parser.add_argument("--textfsm-db", default="Anguis/tfsm_templates.db", help="Path to TextFSM templates")
     parser.add_argument("--max-files", type=int, help="Maximum files to process")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Processes for TextFSM parsing; arp_cat.db is written by this process only (default: 1)")
     parser.add_argument("--device-filter", help="Filter by device name (partial match)")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose logging")
     parser.add_argument("--debug", action="store_true", help="Debug level logging")
@@ -678,7 +737,8 @@ def main():
     )
 
     # Load captures
-    stats = loader.load_all_captures(max_files=args.max_files, device_filter=args.device_filter)
+    stats = loader.load_all_captures(max_files=args.max_files, device_filter=args.device_filter,
+                                     workers=args.workers)
 
     print(f"\nARP Capture Loading Complete:")
     print(f"  Files processed: {stats['files_processed']}")
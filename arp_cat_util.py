@@ -14,31 +14,59 @@ from datetime import datetime
 from typing import Dict, List, Tuple, Optional, Union
 from pathlib import Path
 import ipaddress
+from functools import lru_cache
+
+from arp_cat_init_schema import (
+    create_schema, migrate_arp_cat_db, encode_ip, mac_format_code, mac_prefix_range,
+    CURRENT_ARP_COLUMNS_SQL, MAC_HISTORY_COLUMNS_SQL, ARP_ENTRY_JOINS_SQL
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Largest page search_ip_network / search_mac_prefix will return
+MAX_SEARCH_PAGE = 1000
+
+
+@lru_cache(maxsize=64)
+def _ip_network(network: str):
+    return ipaddress.ip_network(network)
+
+
+def _ipv6_in_network(ip, network: str) -> bool:
+    """SQL function for IPv6 prefix searches; IPv6 keys are text, so they have no numeric range"""
+    return ipaddress.ip_address(ip) in _ip_network(network)
+
 
 class ArpCatUtil:
     """Main utility class for ARP Cat operations."""
 
-    def __init__(self, db_path: str = "arp_cat.db"):
+    def __init__(self, db_path: str = "arp_cat.db", conn: Optional[sqlite3.Connection] = None):
         """
         Initialize ARP Cat utility.
 
         Args:
             db_path: Path to SQLite database file
+            conn: Existing connection to db_path to use instead of opening one; it is
+                left open by close()
         """
         self.db_path = db_path
-        self.conn = None
+        self.conn = conn
+        self._owns_conn = conn is None
+        # Interned interface / source file ids, per table
+        self._name_ids = {}
         self._initialize_database()
 
     def _initialize_database(self):
         """Initialize database connection and create schema if needed."""
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            if self.conn is None:
+                self.conn = sqlite3.connect(self.db_path)
+            # Queries below index rows as plain tuples
+            self.conn.row_factory = None
             self.conn.execute("PRAGMA foreign_keys = ON")
+            self.conn.create_function('ipv6_in_network', 2, _ipv6_in_network, deterministic=True)
 
             # Check if tables exist, create if not
             cursor = self.conn.cursor()
@@ -49,18 +77,39 @@ class ArpCatUtil:
 
             if not cursor.fetchone():
                 self._create_schema()
+            elif migrate_arp_cat_db(self.conn):
+                logger.info(f"Migrated {self.db_path} to the compact arp_entries schema")
 
         except sqlite3.Error as e:
             logger.error(f"Database initialization error: {e}")
             raise
 
     def _create_schema(self):
-        """Create database schema from SQL file or embedded schema."""
-        # Note: In production, you'd load this from the schema file
-        # For now, this is a placeholder - you would execute the schema SQL here
+        """Create database schema (same layout as arp_cat_init_schema.py)."""
         logger.info("Creating database schema...")
-        # Execute the schema SQL from the previous artifact
-        pass
+        create_schema(self.conn)
+
+    def _intern_names(self, table: str, column: str, names) -> Dict[str, int]:
+        """
+        Map interface names / source file paths to their ids, adding any that are new.
+
+        Args:
+            table: 'interfaces' or 'source_files'
+            column: Name column of that table
+            names: Values to look up (None/empty are ignored)
+
+        Returns:
+            Cache dict of value -> id for the table
+        """
+        ids = self._name_ids.setdefault(table, {})
+        missing = {name for name in names if name and name not in ids}
+        if missing:
+            self.conn.executemany(f"INSERT OR IGNORE INTO {table} ({column}) VALUES (?)",
+                                  [(name,) for name in missing])
+            for name in missing:
+                ids[name] = self.conn.execute(f"SELECT id FROM {table} WHERE {column} = ?",
+                                              (name,)).fetchone()[0]
+        return ids
 
     def normalize_mac_address(self, mac: str) -> str:
         """
@@ -98,6 +147,22 @@ class ArpCatUtil:
 
         return normalized
 
+    def encode_mac(self, mac_address: str, mac_address_raw: str = None) -> Tuple[int, Optional[int], Optional[str]]:
+        """
+        Storage columns for a MAC address.
+
+        Args:
+            mac_address: MAC address in any format
+            mac_address_raw: MAC as the device printed it (defaults to mac_address)
+
+        Returns:
+            (48-bit MAC, notation code, raw text only when no notation code reproduces it)
+        """
+        mac = int(self.normalize_mac_address(mac_address).replace(':', ''), 16)
+        raw = mac_address_raw if mac_address_raw is not None else mac_address
+        mac_format = mac_format_code(raw, mac)
+        return mac, mac_format, raw if mac_format is None else None
+
     def validate_ip_address(self, ip: str) -> bool:
         """
         Validate IP address format.
@@ -114,12 +179,13 @@ class ArpCatUtil:
         except ValueError:
             return False
 
-    def get_or_create_device(self, hostname: str, **kwargs) -> int:
+    def get_or_create_device(self, hostname: str, commit: bool = True, **kwargs) -> int:
         """
         Get existing device ID or create new device.
 
         Args:
             hostname: Device hostname
+            commit: Commit immediately (False leaves it to the caller's transaction)
             **kwargs: Additional device attributes
 
         Returns:
@@ -141,7 +207,8 @@ class ArpCatUtil:
                 SET last_seen_timestamp = datetime('now')
                 WHERE id = ?
             """, (result[0],))
-            self.conn.commit()
+            if commit:
+                self.conn.commit()
             return result[0]
 
         # Create new device
@@ -160,11 +227,13 @@ class ArpCatUtil:
             kwargs.get('management_ip')
         ))
 
-        self.conn.commit()
+        if commit:
+            self.conn.commit()
         return cursor.lastrowid
 
     def get_or_create_context(self, device_id: int, context_name: str = 'default',
-                              context_type: str = 'vrf', description: str = None) -> int:
+                              context_type: str = 'vrf', description: str = None,
+                              commit: bool = True) -> int:
         """
         Get existing context ID or create new context.
 
@@ -173,6 +242,7 @@ class ArpCatUtil:
             context_name: Context name (default: 'default')
             context_type: Context type (default: 'vrf')
             description: Optional description
+            commit: Commit immediately (False leaves it to the caller's transaction)
 
         Returns:
             Context ID
@@ -193,7 +263,8 @@ class ArpCatUtil:
                 SET last_seen_timestamp = datetime('now')
                 WHERE id = ?
             """, (result[0],))
-            self.conn.commit()
+            if commit:
+                self.conn.commit()
             return result[0]
 
         # Create new context
@@ -203,7 +274,8 @@ class ArpCatUtil:
             ) VALUES (?, ?, ?, ?)
         """, (device_id, context_name, context_type, description))
 
-        self.conn.commit()
+        if commit:
+            self.conn.commit()
         return cursor.lastrowid
 
     def add_arp_entry(self, device_id: int, context_id: int, ip_address: str,
@@ -219,51 +291,89 @@ class ArpCatUtil:
             **kwargs: Additional ARP entry attributes
 
         Returns:
-            ARP entry ID
+            ID of the binding interval the entry was recorded in
         """
         # Validate IP address
         if not self.validate_ip_address(ip_address):
             raise ValueError(f"Invalid IP address: {ip_address}")
+        ip = encode_ip(ip_address)
+
+        # Normalize MAC address, keeping the original format
+        mac, mac_format, mac_raw = self.encode_mac(mac_address)
 
-        # Normalize MAC address
-        mac_normalized = self.normalize_mac_address(mac_address)
+        interface_name = kwargs.get('interface_name')
+        source_file = kwargs.get('source_file')
+        interface_ids = self._intern_names('interfaces', 'name', [interface_name])
+        source_file_ids = self._intern_names('source_files', 'path', [source_file])
+
+        capture_timestamp = kwargs.get('capture_timestamp', datetime.now().isoformat())
+        interface_id = interface_ids.get(interface_name)
+        observation = (
+            kwargs.get('entry_type', 'dynamic'),
+            kwargs.get('age'),
+            source_file_ids.get(source_file),
+            kwargs.get('source_command')
+        )
 
         cursor = self.conn.cursor()
 
-        # Mark previous entries as not current for this IP/MAC combo
+        # An unchanged binding only extends its open interval
         cursor.execute("""
-            UPDATE arp_entries 
-            SET is_current = 0 
-            WHERE device_id = ? AND context_id = ? AND ip_address = ?
-        """, (device_id, context_id, ip_address))
+            SELECT id FROM arp_entries
+            WHERE device_id = ? AND context_id = ? AND ip = ? AND mac = ?
+            AND interface_id IS ? AND is_current = 1
+        """, (device_id, context_id, ip, mac, interface_id))
+        result = cursor.fetchone()
+
+        if result:
+            entry_id = result[0]
+            cursor.execute("""
+                UPDATE arp_entries
+                SET last_seen = MAX(last_seen, ?), seen_count = seen_count + 1,
+                    entry_type = ?, age = ?, source_file_id = ?, source_command = ?
+                WHERE id = ?
+            """, (capture_timestamp, *observation, entry_id))
+        else:
+            # Close the IP's previous binding and open a new interval
+            cursor.execute("""
+                UPDATE arp_entries 
+                SET is_current = 0 
+                WHERE device_id = ? AND context_id = ? AND ip = ? AND is_current = 1
+            """, (device_id, context_id, ip))
 
-        # Insert new entry
+            cursor.execute("""
+                INSERT INTO arp_entries (
+                    device_id, context_id, ip, mac, mac_format, mac_address_raw,
+                    interface_id, protocol, first_seen, last_seen,
+                    entry_type, age, source_file_id, source_command, is_current
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+            """, (
+                device_id,
+                context_id,
+                ip,
+                mac,
+                mac_format,
+                mac_raw,
+                interface_id,
+                kwargs.get('protocol', 'IPv4'),
+                capture_timestamp,
+                capture_timestamp,
+                *observation
+            ))
+            entry_id = cursor.lastrowid
+
+        # Count the entry on its capture's snapshot, if there is one
         cursor.execute("""
-            INSERT INTO arp_entries (
-                device_id, context_id, ip_address, mac_address, mac_address_raw,
-                interface_name, entry_type, age, protocol, capture_timestamp,
-                source_file, source_command, is_current
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
-        """, (
-            device_id,
-            context_id,
-            ip_address,
-            mac_normalized,
-            mac_address,  # Keep original format
-            kwargs.get('interface_name'),
-            kwargs.get('entry_type', 'dynamic'),
-            kwargs.get('age'),
-            kwargs.get('protocol', 'IPv4'),
-            kwargs.get('capture_timestamp', datetime.now().isoformat()),
-            kwargs.get('source_file'),
-            kwargs.get('source_command')
-        ))
+            UPDATE arp_snapshots
+            SET total_entries = total_entries + 1
+            WHERE device_id = ? AND context_id = ? AND capture_timestamp = ?
+        """, (device_id, context_id, capture_timestamp))
 
         self.conn.commit()
-        return cursor.lastrowid
+        return entry_id
 
     def create_snapshot(self, device_id: int, context_id: int,
-                        capture_timestamp: str = None, **kwargs) -> int:
+                        capture_timestamp: str = None, commit: bool = True, **kwargs) -> int:
         """
         Create ARP snapshot record.
 
@@ -271,6 +381,7 @@ class ArpCatUtil:
             device_id: Device ID
             context_id: Context ID
             capture_timestamp: When snapshot was taken
+            commit: Commit immediately (False leaves it to the caller's transaction)
             **kwargs: Additional snapshot attributes
 
         Returns:
@@ -295,34 +406,145 @@ class ArpCatUtil:
             kwargs.get('processing_status', 'pending')
         ))
 
-        self.conn.commit()
+        if commit:
+            self.conn.commit()
         return cursor.lastrowid
 
+    def load_arp_snapshot(self, device_id: int, context_id: int, entries: List[Dict],
+                          capture_timestamp: str = None, source_file: str = None,
+                          source_command: str = None, processing_status: str = 'processed') -> int:
+        """
+        Load a complete ARP table for one device/context as a single transaction.
+
+        The table replaces the previous one as the current set. Bindings (IP, MAC, interface)
+        that are unchanged only get their interval's last_seen extended. Bindings that are
+        new or changed open new intervals. Bindings missing from the table are closed.
+        Rows with an invalid IP or MAC are skipped with a warning. Nothing is written if
+        any statement fails.
+
+        Captures must be loaded in time order per device/context. A capture older than the
+        current table raises ValueError.
+
+        Args:
+            device_id: Device ID
+            context_id: Context ID
+            entries: Dicts with ip_address, mac_address and optionally mac_address_raw,
+                     interface_name, entry_type, age, protocol
+            capture_timestamp: When the ARP table was captured
+            source_file: Capture file the entries came from
+            source_command: Command that produced the capture
+            processing_status: Status recorded on the snapshot
+
+        Returns:
+            Number of distinct bindings in the table
+        """
+        if not capture_timestamp:
+            capture_timestamp = datetime.now().isoformat()
+
+        valid_entries = []
+        for entry in entries:
+            ip_address = entry.get('ip_address')
+            if not ip_address or not self.validate_ip_address(ip_address):
+                logger.warning(f"Skipping ARP entry with invalid IP address: {entry}")
+                continue
+            if not entry.get('mac_address'):
+                logger.warning(f"Skipping ARP entry without MAC address: {entry}")
+                continue
+            try:
+                mac_columns = self.encode_mac(entry['mac_address'], entry.get('mac_address_raw'))
+            except ValueError as e:
+                logger.warning(f"Skipping ARP entry {entry}: {e}")
+                continue
+            valid_entries.append((entry, encode_ip(ip_address), mac_columns))
+
+        try:
+            with self.conn:
+                interface_ids = self._intern_names(
+                    'interfaces', 'name', [entry.get('interface_name') for entry, _, _ in valid_entries])
+                source_file_ids = self._intern_names('source_files', 'path', [source_file])
+                source_file_id = source_file_ids.get(source_file)
+
+                # (ip, mac, interface_id) -> (observation columns, encoding columns);
+                # a binding repeated within one table counts once
+                bindings = {}
+                for entry, ip, (mac, mac_format, mac_raw) in valid_entries:
+                    interface_id = interface_ids.get(entry.get('interface_name'))
+                    bindings.setdefault((ip, mac, interface_id), (
+                        (entry.get('entry_type', 'dynamic'), entry.get('age'), source_file_id, source_command),
+                        (mac_format, mac_raw, entry.get('protocol', 'IPv4'))
+                    ))
+
+                self._write_arp_snapshot(device_id, context_id, bindings, capture_timestamp,
+                                         source_file, source_command, processing_status)
+        except Exception:
+            # Ids interned inside the rolled-back transaction no longer exist
+            self._name_ids.clear()
+            raise
+
+        return len(bindings)
+
+    def _write_arp_snapshot(self, device_id: int, context_id: int, bindings: Dict[Tuple, Tuple],
+                            capture_timestamp: str, source_file: Optional[str],
+                            source_command: Optional[str], processing_status: str):
+        """Snapshot row and interval updates for load_arp_snapshot."""
+        cursor = self.conn.cursor()
+
+        cursor.execute("""
+            SELECT id, ip, mac, interface_id, last_seen FROM arp_entries
+            WHERE device_id = ? AND context_id = ? AND is_current = 1
+        """, (device_id, context_id))
+        current = {}
+        latest_seen = None
+        for entry_id, ip, mac, interface_id, last_seen in cursor.fetchall():
+            current[(ip, mac, interface_id)] = entry_id
+            latest_seen = max(latest_seen or last_seen, last_seen)
+
+        if latest_seen and capture_timestamp < latest_seen:
+            raise ValueError(f"Capture {capture_timestamp} is older than the current ARP table "
+                             f"({latest_seen}); load captures oldest first")
+
+        snapshot_id = self.create_snapshot(
+            device_id, context_id, capture_timestamp, commit=False,
+            source_file=source_file,
+            source_command=source_command,
+            processing_status=processing_status
+        )
+
+        extended = [(capture_timestamp, *observation, current[key])
+                    for key, (observation, _) in bindings.items() if key in current]
+        opened = [(device_id, context_id, *key, *encoding, capture_timestamp, capture_timestamp, *observation)
+                  for key, (observation, encoding) in bindings.items() if key not in current]
+        closed = [(entry_id,) for key, entry_id in current.items() if key not in bindings]
+
+        cursor.executemany("UPDATE arp_entries SET is_current = 0 WHERE id = ?", closed)
+
+        cursor.executemany("""
+            UPDATE arp_entries
+            SET last_seen = ?, seen_count = seen_count + 1,
+                entry_type = ?, age = ?, source_file_id = ?, source_command = ?
+            WHERE id = ?
+        """, extended)
+
+        cursor.executemany("""
+            INSERT INTO arp_entries (
+                device_id, context_id, ip, mac, interface_id, mac_format, mac_address_raw,
+                protocol, first_seen, last_seen, entry_type, age, source_file_id,
+                source_command, is_current
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+        """, opened)
+
+        cursor.execute("UPDATE arp_snapshots SET total_entries = ? WHERE id = ?",
+                       (len(bindings), snapshot_id))
+
     def search_mac(self, mac_address: str, history: bool = False) -> List[Dict]:
         """Search for MAC address across all entries."""
         try:
-            normalized_mac = self.normalize_mac_address(mac_address)
+            mac, _, _ = self.encode_mac(mac_address)
         except ValueError as e:
             logger.error(f"Invalid MAC address for search: {e}")
             return []
 
-        cursor = self.conn.cursor()
-
-        if history:
-            cursor.execute("""
-                SELECT * FROM v_mac_history 
-                WHERE mac_address = ?
-                ORDER BY capture_timestamp DESC
-            """, (normalized_mac,))
-        else:
-            cursor.execute("""
-                SELECT * FROM v_current_arp 
-                WHERE mac_address = ?
-                ORDER BY capture_timestamp DESC
-            """, (normalized_mac,))
-
-        columns = [desc[0] for desc in cursor.description]
-        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        return self._search_entries('ae.mac', mac, history)
 
     def search_ip(self, ip_address: str, history: bool = False) -> List[Dict]:
         """Search for IP address across all entries."""
@@ -330,20 +552,129 @@ class ArpCatUtil:
             logger.error(f"Invalid IP address for search: {ip_address}")
             return []
 
+        return self._search_entries('ae.ip', encode_ip(ip_address), history)
+
+    def search_ip_network(self, network: str, history: bool = False, limit: int = 100,
+                          cursor: int = None) -> Dict:
+        """
+        Search every address in a CIDR block, e.g. 10.20.30.0/24.
+
+        IPv4 keys are integers, so the block is one range scan of idx_arp_entries_ip.
+        IPv6 blocks scan the IPv6 part of the index only. Results are ordered by IP
+        and paged with a keyset cursor.
+
+        Args:
+            network: CIDR block; host bits may be set
+            history: Include closed intervals, not just current bindings
+            limit: Page size, at most MAX_SEARCH_PAGE
+            cursor: next_cursor from the previous page
+
+        Returns:
+            Dictionary with results and next_cursor (None on the last page)
+
+        Raises:
+            ValueError: If network is not a valid CIDR block
+        """
+        block = ipaddress.ip_network(network.strip(), strict=False)
+        if block.version == 4:
+            where_sql, params = "ae.ip BETWEEN ? AND ?", [int(block.network_address),
+                                                          int(block.broadcast_address)]
+        else:
+            # Text sorts after every integer, so ip >= '' skips all IPv4 rows in the index
+            where_sql, params = "ae.ip >= '' AND ipv6_in_network(ae.ip, ?)", [str(block)]
+
+        return self._search_range(where_sql, params, ('ip', 'id'), history, limit, cursor)
+
+    def search_mac_prefix(self, prefix: str, history: bool = False, limit: int = 100,
+                          cursor: int = None) -> Dict:
+        """
+        Search every MAC starting with a hex prefix, e.g. the OUI 00:1B:17.
+
+        MACs are 48-bit integers, so a prefix is one range scan of idx_arp_entries_mac_ip.
+        Results are ordered by MAC, then IP, and paged with a keyset cursor.
+
+        Args:
+            prefix: 1-12 hex digits in any notation
+            history: Include closed intervals, not just current bindings
+            limit: Page size, at most MAX_SEARCH_PAGE
+            cursor: next_cursor from the previous page
+
+        Returns:
+            Dictionary with results and next_cursor (None on the last page)
+
+        Raises:
+            ValueError: If prefix is not a hex MAC prefix
+        """
+        where_sql, params = "ae.mac BETWEEN ? AND ?", list(mac_prefix_range(prefix))
+        return self._search_range(where_sql, params, ('mac', 'ip', 'id'), history, limit, cursor)
+
+    def _search_range(self, where_sql: str, params: List, order_columns: Tuple[str, ...],
+                      history: bool, limit: int, cursor: Optional[int]) -> Dict:
+        """
+        One page of a range search, in index order.
+
+        The cursor is the id of the last row returned. The next page starts after that
+        row's sort key, so deep pages cost the same as the first one.
+        """
+        limit = max(1, min(int(limit), MAX_SEARCH_PAGE))
+        order_sql = ', '.join(f"ae.{column}" for column in order_columns)
+
+        if cursor is not None:
+            row = self.conn.execute(f"SELECT {', '.join(order_columns)} FROM arp_entries WHERE id = ?",
+                                    (int(cursor),)).fetchone()
+            if row is None:
+                raise ValueError(f"Unknown search cursor: {cursor}")
+            where_sql += f" AND ({order_sql}) > ({', '.join('?' * len(row))})"
+            params = params + list(row)
+
+        if history:
+            columns_sql = f"""ae.id, {MAC_HISTORY_COLUMNS_SQL},
+                    (SELECT SUM(o.seen_count) FROM arp_entries o WHERE o.mac = ae.mac) AS total_occurrences"""
+        else:
+            columns_sql = CURRENT_ARP_COLUMNS_SQL
+            where_sql += " AND ae.is_current = 1"
+
+        db_cursor = self.conn.execute(f"""
+            SELECT {columns_sql}
+            {ARP_ENTRY_JOINS_SQL}
+            WHERE {where_sql}
+            ORDER BY {order_sql}
+            LIMIT ?
+        """, params + [limit + 1])
+
+        columns = [desc[0] for desc in db_cursor.description]
+        results = [dict(zip(columns, row)) for row in db_cursor.fetchall()]
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_cursor = results[-1]['id']
+
+        return {'results': results, 'next_cursor': next_cursor}
+
+    def _search_entries(self, key_column: str, key, history: bool) -> List[Dict]:
+        """
+        Indexed lookup returning the same columns as v_current_arp / v_mac_history.
+
+        The views are kept for ad-hoc SQL; filtering v_mac_history would run its window
+        function over every row, so total_occurrences is computed per matched MAC instead.
+        """
         cursor = self.conn.cursor()
 
         if history:
-            cursor.execute("""
-                SELECT * FROM v_mac_history 
-                WHERE ip_address = ?
-                ORDER BY capture_timestamp DESC
-            """, (ip_address,))
+            cursor.execute(f"""
+                SELECT {MAC_HISTORY_COLUMNS_SQL},
+                    (SELECT SUM(o.seen_count) FROM arp_entries o WHERE o.mac = ae.mac) AS total_occurrences
+                {ARP_ENTRY_JOINS_SQL}
+                WHERE {key_column} = ?
+                ORDER BY ae.last_seen DESC
+            """, (key,))
         else:
-            cursor.execute("""
-                SELECT * FROM v_current_arp 
-                WHERE ip_address = ?
-                ORDER BY capture_timestamp DESC
-            """, (ip_address,))
+            cursor.execute(f"""
+                SELECT {CURRENT_ARP_COLUMNS_SQL}
+                {ARP_ENTRY_JOINS_SQL}
+                WHERE {key_column} = ? AND ae.is_current = 1
+                ORDER BY ae.last_seen DESC
+            """, (key,))
 
         columns = [desc[0] for desc in cursor.description]
         return [dict(zip(columns, row)) for row in cursor.fetchall()]
@@ -371,9 +702,50 @@ class ArpCatUtil:
         columns = [desc[0] for desc in cursor.description]
         return [dict(zip(columns, row)) for row in cursor.fetchall()]
 
+    def get_statistics(self) -> Dict:
+        """
+        Get overall database statistics.
+
+        Returns:
+            Dictionary with various statistics
+        """
+        cursor = self.conn.cursor()
+
+        stats = {}
+
+        # Device count
+        cursor.execute("SELECT COUNT(*) FROM devices")
+        stats['total_devices'] = cursor.fetchone()[0]
+
+        # Total ARP entries (binding intervals) and the captured rows they stand for
+        cursor.execute("SELECT COUNT(*), COALESCE(SUM(seen_count), 0) FROM arp_entries")
+        stats['total_arp_entries'], stats['total_observations'] = cursor.fetchone()
+
+        # Current entries
+        cursor.execute("SELECT COUNT(*) FROM arp_entries WHERE is_current = 1")
+        stats['current_entries'] = cursor.fetchone()[0]
+
+        # Unique MACs
+        cursor.execute("SELECT COUNT(DISTINCT mac) FROM arp_entries")
+        stats['unique_macs'] = cursor.fetchone()[0]
+
+        # Context count
+        cursor.execute("SELECT COUNT(*) FROM contexts")
+        stats['total_contexts'] = cursor.fetchone()[0]
+
+        # Snapshot count
+        cursor.execute("SELECT COUNT(*) FROM arp_snapshots")
+        stats['total_snapshots'] = cursor.fetchone()[0]
+
+        # Latest capture timestamp
+        cursor.execute("SELECT MAX(last_seen) FROM arp_entries")
+        stats['latest_capture'] = cursor.fetchone()[0]
+
+        return stats
+
     def close(self):
         """Close database connection."""
-        if self.conn:
+        if self.conn and self._owns_conn:
             self.conn.close()
 
     def __enter__(self):
@@ -492,47 +864,6 @@ def get_parser(vendor: str, arp_util: ArpCatUtil) -> ArpParser:
         raise ValueError(f"No parser available for vendor: {vendor}")
 
 
-def get_statistics(self) -> Dict:
-    """
-    Get overall database statistics.
-
-    Returns:
-        Dictionary with various statistics
-    """
-    cursor = self.conn.cursor()
-
-    stats = {}
-
-    # Device count
-    cursor.execute("SELECT COUNT(*) FROM devices")
-    stats['total_devices'] = cursor.fetchone()[0]
-
-    # Total ARP entries
-    cursor.execute("SELECT COUNT(*) FROM arp_entries")
-    stats['total_arp_entries'] = cursor.fetchone()[0]
-
-    # Current entries
-    cursor.execute("SELECT COUNT(*) FROM arp_entries WHERE is_current = 1")
-    stats['current_entries'] = cursor.fetchone()[0]
-
-    # Unique MACs
-    cursor.execute("SELECT COUNT(DISTINCT mac_address) FROM arp_entries")
-    stats['unique_macs'] = cursor.fetchone()[0]
-
-    # Context count
-    cursor.execute("SELECT COUNT(*) FROM contexts")
-    stats['total_contexts'] = cursor.fetchone()[0]
-
-    # Snapshot count
-    cursor.execute("SELECT COUNT(*) FROM arp_snapshots")
-    stats['total_snapshots'] = cursor.fetchone()[0]
-
-    # Latest capture timestamp
-    cursor.execute("SELECT MAX(capture_timestamp) FROM arp_entries")
-    stats['latest_capture'] = cursor.fetchone()[0]
-
-    return stats
-
 if __name__ == "__main__":
     # Example usage
     with ArpCatUtil() as util:
@@ -283,6 +283,8 @@ def init_assets_db(db_path: str = "assets.db"):
     cursor.execute("CREATE INDEX idx_devices_vendor ON devices(vendor_id)")
     cursor.execute("CREATE INDEX idx_devices_device_type ON devices(device_type_id)")
     cursor.execute("CREATE INDEX idx_devices_role ON devices(role_id)")
+    # Device listing order (last_updated DESC, name) - see app/blueprints/assets/queries.py
+    cursor.execute("CREATE INDEX idx_devices_listing ON devices(COALESCE(timestamp, '') DESC, name)")
 
     # Serial indexes
     cursor.execute("CREATE INDEX idx_device_serials_serial ON device_serials(serial)")
@@ -5,16 +5,23 @@ Loads device fingerprint JSON files into the network asset management database
 Handles new devices, updates, and complex stack configurations
 """
 
+import os
 import json
+import time
+import shutil
 import sqlite3
+import tempfile
 import re
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 import logging
 import click
 
+from pcng.fingerprint_store import FingerprintStore
+
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -252,7 +259,14 @@ class FingerprintLoader:
         try:
             with open(fingerprint_path, 'r') as f:
                 data = json.load(f)
+        except Exception as e:
+            logger.error(f"Error parsing {fingerprint_path}: {e}")
+            return None
+        return self.parse_fingerprint_data(data, fingerprint_path)
 
+    def parse_fingerprint_data(self, data: Dict, fingerprint_path) -> Optional[DeviceInfo]:
+        """Parse a fingerprint document (from a JSON file or the fingerprint store) into DeviceInfo"""
+        try:
             if not data.get('success', False):
                 logger.warning(f"Fingerprint marked as failed: {fingerprint_path}")
                 return None
@@ -487,6 +501,26 @@ class FingerprintLoader:
                 member.get('index', 1) == 1  # First member is master
             ))
 
+    @staticmethod
+    def extraction_metrics(fingerprint_data: Dict) -> Tuple[int, int, int]:
+        """(fields extracted, total fields, command count) from the first TextFSM record of each command"""
+        fields_extracted = 0
+        total_fields = 0
+        command_count = len(fingerprint_data.get('command_outputs', {}))
+
+        # Count TextFSM fields
+        for cmd_name, cmd_data in fingerprint_data.get('command_outputs', {}).items():
+            if cmd_name.endswith('_textfsm') and isinstance(cmd_data, dict):
+                records = cmd_data.get('records', [])
+                if records:
+                    record = records[0]
+                    for key, value in record.items():
+                        total_fields += 1
+                        if value and str(value).strip():
+                            fields_extracted += 1
+
+        return fields_extracted, total_fields, command_count
+
     def record_fingerprint_extraction(self, conn: sqlite3.Connection, device_id: int,
                                       fingerprint_path: Path, device_info: DeviceInfo):
         """Record fingerprint extraction in audit table (with duplicate prevention)"""
@@ -507,21 +541,7 @@ class FingerprintLoader:
                 f"Fingerprint extraction already exists for device {device_id} at {extraction_timestamp}, skipping")
             return
 
-        # Calculate metrics from TextFSM data
-        fields_extracted = 0
-        total_fields = 0
-        command_count = len(fingerprint_data.get('command_outputs', {}))
-
-        # Count TextFSM fields
-        for cmd_name, cmd_data in fingerprint_data.get('command_outputs', {}).items():
-            if cmd_name.endswith('_textfsm') and isinstance(cmd_data, dict):
-                records = cmd_data.get('records', [])
-                if records:
-                    record = records[0]
-                    for key, value in record.items():
-                        total_fields += 1
-                        if value and str(value).strip():
-                            fields_extracted += 1
+        fields_extracted, total_fields, command_count = self.extraction_metrics(fingerprint_data)
 
         cursor.execute("""
             INSERT INTO fingerprint_extractions (
@@ -542,8 +562,11 @@ class FingerprintLoader:
         ))
     def load_fingerprint_file(self, fingerprint_path: Path) -> bool:
         """Load a single fingerprint file into the database"""
+        return self.load_fingerprint_info(self.parse_fingerprint_json(fingerprint_path), fingerprint_path)
+
+    def load_fingerprint_info(self, device_info: Optional[DeviceInfo], fingerprint_path) -> bool:
+        """Write one parsed fingerprint to the database"""
         try:
-            device_info = self.parse_fingerprint_json(fingerprint_path)
             if not device_info:
                 return False
 
@@ -593,13 +616,246 @@ class FingerprintLoader:
 
         return results
 
+    def load_fingerprint_store(self, fingerprint_db: str) -> Dict[str, int]:
+        """Load every fingerprint from the SQLite fingerprint store (pcng/fingerprint_store.py)"""
+        results = {'success': 0, 'failed': 0, 'total': 0}
+
+        store = FingerprintStore.open_existing(fingerprint_db)
+        if not store:
+            logger.error(f"Fingerprint store not found: {fingerprint_db}")
+            return results
+
+        device_names = sorted(store.device_names())
+        results['total'] = len(device_names)
+        logger.info(f"Found {results['total']} fingerprints in {fingerprint_db}")
+
+        for device_name in device_names:
+            # Recorded as the fingerprint_file_path so extractions can be traced back to the store row
+            source = f"{fingerprint_db}#{device_name}"
+            device_info = self.parse_fingerprint_data(store.get(device_name), source)
+            if self.load_fingerprint_info(device_info, source):
+                results['success'] += 1
+            else:
+                results['failed'] += 1
+
+        return results
+
+    # ========== BULK MODE ==========
+
+    def parse_fingerprint_files(self, json_files: List[Path], workers: int) -> List[Tuple[str, Optional[DeviceInfo]]]:
+        """Parse fingerprint files in a process pool; (source path, DeviceInfo or None) in file order"""
+        if workers <= 1 or len(json_files) < 2:
+            return [(str(path), self.parse_fingerprint_json(path)) for path in json_files]
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_parse_worker) as executor:
+            return list(executor.map(_parse_fingerprint_worker, [str(path) for path in json_files],
+                                     chunksize=max(1, len(json_files) // (workers * 4))))
+
+    def bulk_write(self, parsed: List[Tuple[str, Optional[DeviceInfo]]]) -> Dict[str, int]:
+        """
+        Apply every parsed fingerprint in one transaction.
+
+        Dimension tables and existing device ids are loaded into dicts up front, so there are
+        no per-device SELECTs; device upserts, serial / stack member replacement and extraction
+        records all go through executemany. Any database error rolls back the whole batch.
+        """
+        results = {'success': 0, 'failed': 0, 'total': len(parsed)}
+
+        # Later files win for the same device, as in per-file mode
+        by_name: Dict[str, Tuple[str, DeviceInfo]] = {}
+        for source, device_info in parsed:
+            if device_info is None:
+                results['failed'] += 1
+                continue
+            by_name.pop(device_info.normalized_name, None)
+            by_name[device_info.normalized_name] = (source, device_info)
+        devices = list(by_name.values())
+        if not devices:
+            return results
+
+        conn = self.get_db_connection()
+        try:
+            with conn:
+                vendors = {name: vid for vid, name in conn.execute("SELECT id, name FROM vendors")}
+                device_types = {name: tid for tid, name in conn.execute("SELECT id, name FROM device_types")}
+                sites = {code for (code,) in conn.execute("SELECT code FROM sites")}
+
+                new_vendors = sorted({d.vendor_name for _, d in devices} - vendors.keys())
+                new_types = sorted({d.device_type_name for _, d in devices} - device_types.keys())
+                new_sites = sorted({d.site_code for _, d in devices} - sites)
+                conn.executemany("INSERT INTO vendors (name, short_name) VALUES (?, ?)",
+                                 [(name, name.split()[0].upper()) for name in new_vendors])
+                conn.executemany("""
+                    INSERT INTO device_types (name, netmiko_driver, transport, default_port)
+                    VALUES (?, ?, 'ssh', 22)
+                """, [(name, name.replace('_ssh', '')) for name in new_types])
+                conn.executemany("INSERT INTO sites (code, name) VALUES (?, ?)",
+                                 [(code, f"{code} Site") for code in new_sites])
+                if new_vendors:
+                    vendors = {name: vid for vid, name in conn.execute("SELECT id, name FROM vendors")}
+                if new_types:
+                    device_types = {name: tid for tid, name in conn.execute("SELECT id, name FROM device_types")}
+                for label, created in (('vendors', new_vendors), ('device types', new_types), ('sites', new_sites)):
+                    if created:
+                        logger.info(f"Created {len(created)} new {label}: {', '.join(created)}")
+
+                device_ids = {name: did for did, name in conn.execute("SELECT id, normalized_name FROM devices")}
+                updates, inserts = [], []
+                for _, d in devices:
+                    values = (d.hostname, d.site_code, vendors[d.vendor_name], device_types[d.device_type_name],
+                              d.model, d.os_version, d.uptime, d.management_ip, d.is_stack)
+                    if d.normalized_name in device_ids:
+                        updates.append(values + (device_ids[d.normalized_name],))
+                    else:
+                        inserts.append(values + (d.normalized_name,))
+
+                conn.executemany("""
+                    UPDATE devices SET
+                        name = ?, site_code = ?, vendor_id = ?, device_type_id = ?,
+                        model = ?, os_version = ?, uptime = ?, management_ip = ?,
+                        is_stack = ?, timestamp = datetime('now')
+                    WHERE id = ?
+                """, updates)
+                conn.executemany("""
+                    INSERT INTO devices (
+                        name, site_code, vendor_id, device_type_id,
+                        model, os_version, uptime, management_ip, is_stack, normalized_name, timestamp
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+                """, inserts)
+                if inserts:
+                    device_ids = {name: did for did, name in conn.execute("SELECT id, normalized_name FROM devices")}
+                logger.info(f"Devices: {len(inserts)} created, {len(updates)} updated")
+
+                # Child tables are replaced only for devices that report them, as in per-file mode
+                with_serials = [(device_ids[d.normalized_name], d) for _, d in devices if d.serial_numbers]
+                with_members = [(device_ids[d.normalized_name], d) for _, d in devices if d.stack_members]
+
+                conn.executemany("DELETE FROM device_serials WHERE device_id = ?",
+                                 [(device_id,) for device_id, _ in with_serials])
+                conn.executemany("""
+                    INSERT INTO device_serials (device_id, serial, is_primary) VALUES (?, ?, ?)
+                """, [(device_id, serial, i == 0)
+                      for device_id, d in with_serials
+                      for i, serial in enumerate(dict.fromkeys(d.serial_numbers)) if serial])
+
+                conn.executemany("DELETE FROM stack_members WHERE device_id = ?",
+                                 [(device_id,) for device_id, _ in with_members])
+                conn.executemany("""
+                    INSERT INTO stack_members (device_id, serial, position, model, is_master)
+                    VALUES (?, ?, ?, ?, ?)
+                """, [(device_id, member.get('serial', ''), member.get('index', 1), member.get('model', ''),
+                       member.get('index', 1) == 1)
+                      for device_id, d in with_members
+                      for member in {m.get('serial', ''): m for m in reversed(d.stack_members)}.values()])
+
+                existing = {tuple(row) for row in conn.execute("SELECT device_id, extraction_timestamp FROM fingerprint_extractions")}
+                extractions = []
+                for source, d in devices:
+                    device_id = device_ids[d.normalized_name]
+                    timestamp = d.fingerprint_data.get('fingerprint_time', datetime.now().isoformat())
+                    if (device_id, timestamp) in existing:
+                        continue
+                    fields_extracted, total_fields, command_count = self.extraction_metrics(d.fingerprint_data)
+                    extractions.append((device_id, timestamp, source, 'auto_detected', 100.0, True,
+                                        fields_extracted, total_fields, command_count))
+                conn.executemany("""
+                    INSERT INTO fingerprint_extractions (
+                        device_id, extraction_timestamp, fingerprint_file_path,
+                        template_used, template_score, extraction_success,
+                        fields_extracted, total_fields_available, command_count
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, extractions)
+
+            results['success'] = len(parsed) - results['failed']
+        except sqlite3.Error as e:
+            logger.error(f"Bulk load rolled back: {e}")
+            results['failed'] = results['total']
+        finally:
+            conn.close()
+
+        return results
+
+    def load_fingerprints_bulk(self, fingerprints_dir: Path, workers: int) -> Dict[str, int]:
+        """Bulk mode for a directory: parallel parse, then one transaction"""
+        results = {'success': 0, 'failed': 0, 'total': 0}
+
+        if not fingerprints_dir.exists():
+            logger.error(f"Fingerprints directory not found: {fingerprints_dir}")
+            return results
+
+        json_files = sorted(fingerprints_dir.glob('*.json'))
+        logger.info(f"Found {len(json_files)} fingerprint files to process (bulk, {workers} workers)")
+
+        parse_start = time.perf_counter()
+        parsed = self.parse_fingerprint_files(json_files, workers)
+        write_start = time.perf_counter()
+        results = self.bulk_write(parsed)
+        logger.info(f"Parsed in {write_start - parse_start:.2f}s, "
+                    f"written in {time.perf_counter() - write_start:.2f}s")
+        return results
+
+    def load_fingerprint_store_bulk(self, fingerprint_db: str) -> Dict[str, int]:
+        """Bulk mode for the SQLite fingerprint store (documents are already decoded JSON)"""
+        store = FingerprintStore.open_existing(fingerprint_db)
+        if not store:
+            logger.error(f"Fingerprint store not found: {fingerprint_db}")
+            return {'success': 0, 'failed': 0, 'total': 0}
+
+        parsed = []
+        for device_name in sorted(store.device_names()):
+            source = f"{fingerprint_db}#{device_name}"
+            parsed.append((source, self.parse_fingerprint_data(store.get(device_name), source)))
+        return self.bulk_write(parsed)
+
+
+def _init_parse_worker():
+    # Per-command INFO/DEBUG parse logging from every worker would swamp the console
+    logger.setLevel(logging.WARNING)
+
+
+def _parse_fingerprint_worker(path: str) -> Tuple[str, Optional[DeviceInfo]]:
+    """Module level so ProcessPoolExecutor can pickle it; parsing needs no database"""
+    return path, FingerprintLoader('').parse_fingerprint_json(Path(path))
+
+
+def benchmark_load(db_path: str, fingerprints_dir: Path, workers: int) -> Dict[str, float]:
+    """Load the directory per-file and in bulk into two scratch copies of the database"""
+    timings = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        for mode in ('per-file', 'bulk'):
+            scratch_db = str(Path(scratch) / f"{mode}.db")
+            shutil.copyfile(db_path, scratch_db)
+            loader = FingerprintLoader(scratch_db)
+
+            level = logger.level
+            logger.setLevel(logging.WARNING)
+            start = time.perf_counter()
+            try:
+                if mode == 'bulk':
+                    results = loader.load_fingerprints_bulk(fingerprints_dir, workers)
+                else:
+                    results = loader.load_fingerprints_directory(fingerprints_dir)
+            finally:
+                logger.setLevel(level)
+            timings[mode] = time.perf_counter() - start
+            logger.info(f"{mode:>8}: {timings[mode]:.2f}s ({results['success']}/{results['total']} loaded)")
+
+    if timings['bulk'] > 0:
+        logger.info(f"Speedup: {timings['per-file'] / timings['bulk']:.1f}x")
+    return timings
+
 
 @click.command()
 @click.option('--db-path', default='assets.db', help='Path to SQLite database')
 @click.option('--fingerprints-dir', default='fingerprints', help='Directory containing fingerprint JSON files')
+@click.option('--fingerprint-db', help='Load from a SQLite fingerprint store instead of the JSON directory')
 @click.option('--single-file', help='Process a single fingerprint file')
+@click.option('--bulk', is_flag=True, help='Parse in parallel and write everything in one transaction')
+@click.option('--workers', default=os.cpu_count() or 1, show_default=True, help='Parser processes for --bulk')
+@click.option('--benchmark', is_flag=True,
+              help='Time per-file vs bulk loading on scratch copies of the database (no changes to --db-path)')
 @click.option('--verbose', '-v', is_flag=True, help='Verbose logging')
-def main(db_path, fingerprints_dir, single_file, verbose):
+def main(db_path, fingerprints_dir, fingerprint_db, single_file, bulk, workers, benchmark, verbose):
     """Load fingerprint JSON files into the network asset database"""
 
     if verbose:
@@ -607,6 +863,10 @@ def main(db_path, fingerprints_dir, single_file, verbose):
 
     loader = FingerprintLoader(db_path)
 
+    if benchmark:
+        benchmark_load(db_path, Path(fingerprints_dir), workers)
+        return
+
     if single_file:
         # Process single file
         file_path = Path(single_file)
@@ -621,11 +881,21 @@ def main(db_path, fingerprints_dir, single_file, verbose):
         else:
             logger.error("Failed to process file")
     else:
-        # Process directory
-        fingerprints_path = Path(fingerprints_dir)
-        logger.info(f"Loading fingerprints from: {fingerprints_path}")
+        if fingerprint_db:
+            logger.info(f"Loading fingerprints from store: {fingerprint_db}")
+            if bulk:
+                results = loader.load_fingerprint_store_bulk(fingerprint_db)
+            else:
+                results = loader.load_fingerprint_store(fingerprint_db)
+        else:
+            # Process directory
+            fingerprints_path = Path(fingerprints_dir)
+            logger.info(f"Loading fingerprints from: {fingerprints_path}")
 
-        results = loader.load_fingerprints_directory(fingerprints_path)
+            if bulk:
+                results = loader.load_fingerprints_bulk(fingerprints_path, workers)
+            else:
+                results = loader.load_fingerprints_directory(fingerprints_path)
 
         logger.info("=" * 60)
         logger.info("FINGERPRINT LOADING RESULTS")
@@ -7,6 +7,8 @@ Enhanced with fingerprinting support
 
 import os
 import queue
+import random
+import socket
 import sys
 import threading
 import time
@@ -21,8 +23,15 @@ from pathlib import Path
 from datetime import datetime
 import re
 import concurrent.futures
+import sqlite3
+import tempfile
 from functools import partial
 
+from device_info import DeviceType
+from run_jobs_concurrent_batch import VendorCommandManager
+from collection_telemetry import TelemetryStore, DEFAULT_TELEMETRY_DB
+from fingerprint_store import FingerprintStore, DEFAULT_FINGERPRINT_DB
+
 # Optional: Hardcoded credential mapping (fallback if env vars not found)
 # For production, leave this empty and use environment variables only
 CREDENTIAL_MAP = {
@@ -30,6 +39,25 @@ CREDENTIAL_MAP = {
     # '2': {'user': 'netadmin', 'password': 'another_password'},
 }
 
+# Per-device execution policy (overridable from the CLI / job execution block)
+DEFAULT_DEVICE_TIMEOUT = 600  # seconds for one spn.py run
+DEFAULT_CONNECT_TIMEOUT = 5  # seconds for the TCP reachability pre-check (0 disables it)
+DEFAULT_DEVICE_RETRIES = 2  # extra attempts after unreachable / connection failures
+DEFAULT_RETRY_BACKOFF = 5  # seconds, doubled per retry with jitter
+DEFAULT_CIRCUIT_THRESHOLD = 3  # consecutive failed runs before a device is skipped (0 disables)
+DEFAULT_CIRCUIT_COOLDOWN_HOURS = 24  # skipped devices get one trial attempt after this
+DEFAULT_FINGERPRINT_TTL_HOURS = 168  # fingerprints younger than this only get a prompt probe (0 disables)
+
+# spn.py output that means retrying with the same credentials is pointless
+AUTH_FAILURE_PATTERN = re.compile(r'Authentication failed|AuthenticationException|Permission denied',
+                                  re.IGNORECASE)
+
+# spn.py output that means the connection itself failed - the only failures worth retrying
+CONNECTION_FAILURE_PATTERN = re.compile(
+    r'Unable to connect|Connection (?:refused|reset|closed|lost)|No route to host|'
+    r'Network is unreachable|Error reading SSH protocol banner|timed out|Socket is closed',
+    re.IGNORECASE)
+
 
 class DeviceFilter:
     """Handles device filtering based on query criteria"""
@@ -37,12 +65,16 @@ class DeviceFilter:
     def __init__(self, sessions_data: List[Dict]):
         self.sessions_data = sessions_data
 
-    def filter_fingerprinted_devices(self, devices: List[Dict], fingerprint_base_dir: str) -> List[Dict]:
-        """Filter devices to only include those with existing fingerprint files"""
+    def filter_fingerprinted_devices(self, devices: List[Dict], fingerprint_base_dir: str,
+                                     fingerprint_db: Optional[str] = None) -> List[Dict]:
+        """Filter devices to only include those with a stored fingerprint or fingerprint file"""
         fingerprinted_devices = []
         fingerprint_dir = Path(fingerprint_base_dir)
 
-        if not fingerprint_dir.exists():
+        store = FingerprintStore.open_existing(fingerprint_db)
+        stored_names = store.device_names() if store else set()
+
+        if not fingerprint_dir.exists() and not stored_names:
             print(f"Warning: Fingerprint directory '{fingerprint_base_dir}' does not exist")
             return []
 
@@ -50,7 +82,7 @@ class DeviceFilter:
             device_name = device.get('display_name', '')
             fingerprint_file = fingerprint_dir / f"{device_name}.json"
 
-            if fingerprint_file.exists():
+            if device_name in stored_names or fingerprint_file.exists():
                 fingerprinted_devices.append(device)
             else:
                 if hasattr(self, '_verbose') and self._verbose:
@@ -107,17 +139,200 @@ class DeviceFilter:
         return pattern in text
 
 
+class PagingCommandPlanner:
+    """Builds the paging-disable command list for a device from what we already know about it
+
+    Preference order: the stored fingerprint (fingerprint store, else fingerprints/<device>.json), then the
+    session Vendor via VendorCommandManager, then the legacy shotgun list.
+    """
+
+    # Sent when nothing is known about the device - covers most platforms
+    LEGACY_PAGING_COMMANDS = [
+        "terminal length 0",  # Cisco IOS/NXOS, Arista
+        "terminal width 0",  # Cisco additional
+        "set cli screen-length 0",  # Juniper
+        "set cli pager off",  # Palo Alto
+        "no page"  # HP ProCurve/Aruba
+    ]
+
+    # Extra commands worth sending beyond the primary paging command
+    DRIVER_EXTRA_COMMANDS = {
+        'cisco_ios': ["terminal width 0"],
+        'cisco_nxos': ["terminal width 511"],
+    }
+
+    # Netmiko driver (fingerprint additional_info.netmiko_driver) -> DeviceType
+    DRIVER_DEVICE_TYPES = {
+        'cisco_ios': DeviceType.CiscoIOS,
+        'cisco_nxos': DeviceType.CiscoNXOS,
+        'cisco_asa': DeviceType.CiscoASA,
+        'arista_eos': DeviceType.AristaEOS,
+        'juniper_junos': DeviceType.JuniperJunOS,
+        'hp_procurve': DeviceType.HPProCurve,
+        'fortinet': DeviceType.FortiOS,
+        'paloalto_panos': DeviceType.PaloAltoOS,
+    }
+
+    def __init__(self, fingerprint_dir: Optional[str] = None, fingerprint_db: Optional[str] = None):
+        self.fingerprint_dir = Path(fingerprint_dir) if fingerprint_dir else None
+        self.store = FingerprintStore.open_existing(fingerprint_db)
+        self.vendor_manager = VendorCommandManager()
+
+    def _load_fingerprint(self, device_name: str) -> Optional[Dict]:
+        if self.store:
+            summary = self.store.summary(device_name)
+            if summary:
+                # The typed columns carry everything the plan needs - no blob, no JSON file
+                return {'device_type': summary['device_type'] or 0,
+                        'disable_paging_command': summary['disable_paging_command'],
+                        'additional_info': {'netmiko_driver': summary['netmiko_driver'] or ''}}
+        if not self.fingerprint_dir:
+            return None
+        fingerprint_file = self.fingerprint_dir / f"{device_name}.json"
+        if not fingerprint_file.exists():
+            return None
+        try:
+            with open(fingerprint_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return None
+
+    def _plan_from_fingerprint(self, fingerprint: Dict) -> List[str]:
+        additional_info = fingerprint.get('additional_info') or {}
+        driver = additional_info.get('netmiko_driver', '') if isinstance(additional_info, dict) else ''
+
+        device_type = self.DRIVER_DEVICE_TYPES.get(driver)
+        if device_type is None:
+            try:
+                device_type = DeviceType(fingerprint.get('device_type', 0))
+            except ValueError:
+                device_type = DeviceType.Unknown
+
+        paging_cmd = fingerprint.get('disable_paging_command') or device_type.get_disable_paging_command()
+        if not paging_cmd or device_type == DeviceType.Unknown:
+            return []
+
+        return [paging_cmd] + self.DRIVER_EXTRA_COMMANDS.get(driver, [])
+
+    def plan(self, device: Dict) -> Tuple[List[str], str]:
+        """Return (paging commands, source) where source is fingerprint/vendor/legacy"""
+        fingerprint = self._load_fingerprint(device.get('display_name', ''))
+        if fingerprint:
+            commands = self._plan_from_fingerprint(fingerprint)
+            if commands:
+                return commands, 'fingerprint'
+
+        vendor_key = self.vendor_manager.resolve_vendor_key(device.get('Vendor', ''))
+        if vendor_key != 'generic':
+            paging_cmd = self.vendor_manager.get_vendor_config(vendor_key)['paging_disable']
+            if paging_cmd:
+                return [paging_cmd], 'vendor'
+
+        return list(self.LEGACY_PAGING_COMMANDS), 'legacy'
+
+
+class FingerprintFreshness:
+    """
+    Decides which devices can reuse their fingerprint instead of re-running identification.
+
+    A fingerprint is fresh when it succeeded, is younger than the TTL and no 'version'
+    capture change was recorded for the device after it was taken. Fresh devices are
+    handed to spn.py with --fingerprint-cache, which only checks the prompt still matches
+    (same box) before reusing it.
+    """
+
+    def __init__(self, fingerprint_dir: str, ttl_hours: float = DEFAULT_FINGERPRINT_TTL_HOURS,
+                 assets_db: Optional[str] = None, fingerprint_db: Optional[str] = None):
+        self.fingerprint_dir = Path(fingerprint_dir)
+        self.ttl_hours = ttl_hours
+        self.version_changes = self._load_version_changes(assets_db)
+        self.store = FingerprintStore.open_existing(fingerprint_db)
+        self._stored: Dict[str, Dict] = {}
+
+    @staticmethod
+    def _load_version_changes(assets_db: Optional[str]) -> Dict[str, str]:
+        """Latest 'version' change per normalized device name, in one query"""
+        if not assets_db or not os.path.exists(assets_db):
+            return {}
+        try:
+            conn = sqlite3.connect(f"file:{assets_db}?mode=ro", uri=True)
+            try:
+                rows = conn.execute("""
+                    SELECT d.normalized_name, MAX(cc.detected_at)
+                    FROM capture_changes cc
+                    JOIN devices d ON d.id = cc.device_id
+                    WHERE cc.capture_type = 'version'
+                    GROUP BY d.normalized_name
+                """).fetchall()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"Warning: could not read version changes from {assets_db}: {e}")
+            return {}
+        return {name: str(detected_at) for name, detected_at in rows if name and detected_at}
+
+    def check(self, device: Dict) -> Tuple[bool, str]:
+        """Return (fresh, reason)"""
+        device_name = device.get('display_name', '')
+        fingerprint = self._stored.get(device_name)
+        if fingerprint is None:
+            fingerprint_file = self.fingerprint_dir / f"{device_name}.json"
+            if not fingerprint_file.exists():
+                return False, 'no fingerprint'
+
+            try:
+                with open(fingerprint_file, 'r', encoding='utf-8') as f:
+                    fingerprint = json.load(f)
+            except Exception:
+                return False, 'unreadable fingerprint'
+
+        if not fingerprint.get('success') or not fingerprint.get('detected_prompt'):
+            return False, 'previous fingerprint failed'
+
+        try:
+            fingerprint_time = datetime.fromisoformat(fingerprint['fingerprint_time'])
+        except (KeyError, TypeError, ValueError):
+            return False, 'no fingerprint time'
+
+        age_hours = (datetime.now() - fingerprint_time).total_seconds() / 3600
+        if age_hours > self.ttl_hours:
+            return False, f'expired ({age_hours:.0f}h old)'
+
+        for name in {(fingerprint.get('hostname') or '').lower().strip(), device_name.lower().strip()}:
+            changed_at = self.version_changes.get(name)
+            if changed_at and changed_at.replace(' ', 'T') > fingerprint_time.isoformat():
+                return False, f'version changed {changed_at[:16]}'
+
+        return True, f'fresh ({age_hours:.0f}h old)'
+
+    def fresh_devices(self, devices: List[Dict]) -> Dict[str, str]:
+        """display_name -> reason, for every device that can skip identification"""
+        if self.store:
+            # One query for the typed columns instead of a json.load per device
+            self._stored = self.store.summaries(device['display_name'] for device in devices)
+        fresh = {}
+        for device in devices:
+            is_fresh, reason = self.check(device)
+            if is_fresh:
+                fresh[device['display_name']] = reason
+        return fresh
+
+
 class CredentialManager:
     """Handles credential lookup by credential ID"""
 
-    def __init__(self):
-        pass
+    def __init__(self, env_overrides: Optional[Dict[str, str]] = None):
+        # Per-job CRED_* values (e.g. from a job file) that take precedence over os.environ
+        self.env_overrides = env_overrides or {}
+
+    def _getenv(self, name: str) -> Optional[str]:
+        return self.env_overrides.get(name) or os.getenv(name)
 
     def get_credentials(self, cred_id: str) -> Dict[str, str]:
         """Get credentials for a given credential ID"""
         # First try environment variables (preferred method)
-        env_user = os.getenv(f'CRED_{cred_id}_USER')
-        env_pass = os.getenv(f'CRED_{cred_id}_PASS')
+        env_user = self._getenv(f'CRED_{cred_id}_USER')
+        env_pass = self._getenv(f'CRED_{cred_id}_PASS')
 
         if env_user and env_pass:
             return {'user': env_user, 'password': env_pass}
@@ -236,6 +451,33 @@ def stream_subprocess_output(process, device_name, timeout_seconds=600):
 
 # Replace the execute_single_device function in batch_spn_concurrent.py with this fixed version:
 
+def check_tcp_reachable(host: str, port, timeout: float) -> Tuple[bool, str]:
+    """Open and close a TCP connection to the SSH port - seconds, not a 600s spn.py timeout"""
+    try:
+        with socket.create_connection((host, int(port)), timeout=timeout):
+            return True, ''
+    except socket.timeout:
+        return False, f'no response on {host}:{port} within {timeout}s'
+    except OSError as e:
+        return False, f'{host}:{port} {e.strerror or e}'
+
+
+def read_telemetry_file(telemetry_file: str) -> Optional[Dict]:
+    """Load and remove the timing file spn.py writes with --telemetry-file"""
+    try:
+        if os.path.getsize(telemetry_file) == 0:
+            return None
+        with open(telemetry_file, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+    finally:
+        try:
+            os.remove(telemetry_file)
+        except OSError:
+            pass
+
+
 def execute_single_device(device_and_config: Tuple[Dict, Dict]) -> Dict[str, Any]:
     """
     Execute spn.py command against a single device in a separate process.
@@ -247,6 +489,7 @@ def execute_single_device(device_and_config: Tuple[Dict, Dict]) -> Dict[str, Any
     host = device['host']
     port = device.get('port', '22')
     cred_id = device.get('credsid', '')
+    vendor = device.get('Vendor', '')
 
     commands = config['commands']
     output_dir = Path(config['output_dir'])
@@ -256,13 +499,14 @@ def execute_single_device(device_and_config: Tuple[Dict, Dict]) -> Dict[str, Any
     print(f"[DEBUG] Process {os.getpid()} starting work on {device_name}")
 
     # Get credentials for this device
-    credential_manager = CredentialManager()
+    credential_manager = CredentialManager(config.get('credential_env'))
     try:
         credentials = credential_manager.get_credentials(cred_id)
     except ValueError as e:
         return {
             'device': device_name,
             'host': host,
+            'vendor': vendor,
             'success': False,
             'message': f'Credential error: {str(e)}',
             'execution_time': 0,
@@ -272,127 +516,215 @@ def execute_single_device(device_and_config: Tuple[Dict, Dict]) -> Dict[str, Any
     # Output file path - let spn.py create and manage this file
     output_file = output_dir / f"{device_name}.txt"
 
-    # Add common paging disable commands to ensure complete output
-    # These cover most network device types
-    paging_disable_commands = [
-        "terminal length 0",  # Cisco IOS/NXOS, Arista
-        "terminal width 0",  # Cisco additional
-        "set cli screen-length 0",  # Juniper
-        "set cli pager off",  # Palo Alto
-        "no page"  # HP ProCurve/Aruba
-    ]
+    # Only send the paging command(s) this platform understands; fall back to the
+    # full list of common commands when the device is unknown
+    if config.get('legacy_paging'):
+        paging_disable_commands = list(PagingCommandPlanner.LEGACY_PAGING_COMMANDS)
+        paging_source = 'legacy'
+    else:
+        planner = PagingCommandPlanner(config.get('fingerprint_lookup_dir'), config.get('fingerprint_db'))
+        paging_disable_commands, paging_source = planner.plan(device)
+
+    # Job files may already lead with the vendor paging command - don't send it twice
+    user_commands = [cmd.strip() for cmd in commands.split(',') if cmd.strip()]
+    paging_disable_commands = [cmd for cmd in paging_disable_commands if cmd not in user_commands]
+    print(f"[DEBUG] {device_name} paging plan ({paging_source}): {paging_disable_commands}")
 
     # Prepend paging disable commands to user commands
-    if commands.strip():
-        # Combine paging commands with user commands
-        all_commands = ",".join(paging_disable_commands) + "," + commands + ","
-    else:
-        # Just paging commands
-        all_commands = ",".join(paging_disable_commands) + ","
+    all_commands = ",".join(paging_disable_commands + [commands.strip()] if commands.strip()
+                            else paging_disable_commands) + ","
+
+    fingerprint_enabled = bool(config.get('enable_fingerprint') and config.get('fingerprint_dir'))
 
     # Build spn.py command - pass credentials via environment variables
     cmd_args = [
         sys.executable, spn_script_path,
         '--host', f"{host}:{port}",
-        '-c', all_commands,  # Use combined commands with paging disable
         '--invoke-shell',
         '--output-file', str(output_file),  # Let spn.py handle the file
         '--no-screen',  # Don't output to screen during batch
         '--verbose'
     ]
 
+    if fingerprint_enabled:
+        fingerprint_file = Path(config['fingerprint_dir']) / f"{device_name}.json"
+        cmd_args.extend(['--fingerprint', '--fingerprint-output', str(fingerprint_file)])
+        if config.get('fingerprint_db'):
+            cmd_args.extend(['--fingerprint-db', config['fingerprint_db'], '--device-name', device_name])
+        if device_name in (config.get('fresh_fingerprints') or {}):
+            # Prompt probe only; full identification runs if the prompt no longer matches
+            cmd_args.extend(['--fingerprint-cache', str(fingerprint_file)])
+        if commands.strip():
+            # One handshake for fingerprint + capture instead of two
+            cmd_args.extend(['-c', all_commands, '--shared-session'])
+    else:
+        cmd_args.extend(['-c', all_commands])  # Use combined commands with paging disable
+
+    # spn.py reports connect/auth/prompt/command timing here; it never lands in the capture dir
+    telemetry_fd, telemetry_file = tempfile.mkstemp(prefix='spn_telemetry_', suffix='.json')
+    os.close(telemetry_fd)
+    cmd_args.extend(['--telemetry-file', telemetry_file])
+
     # Set up environment variables for spn.py subprocess
     env = os.environ.copy()
     env['SSH_HOST'] = f"{host}:{port}"
     env['SSH_USER'] = credentials['user']
     env['SSH_PASSWORD'] = credentials['password']
 
+    device_timeout = config.get('device_timeout', DEFAULT_DEVICE_TIMEOUT)
+    connect_timeout = config.get('connect_timeout', DEFAULT_CONNECT_TIMEOUT)
+    max_attempts = max(0, config.get('device_retries', DEFAULT_DEVICE_RETRIES)) + 1
+    retry_backoff = config.get('retry_backoff', DEFAULT_RETRY_BACKOFF)
+
     start_time = datetime.now()
+    base_result = {
+        'device': device_name,
+        'host': host,
+        'vendor': vendor,
+        'cred_id': cred_id,
+        'process_id': os.getpid()
+    }
+
+    for attempt in range(1, max_attempts + 1):
+        if attempt > 1:
+            delay = retry_backoff * (2 ** (attempt - 2)) + random.uniform(0, retry_backoff / 2)
+            print(f"[DEBUG] {device_name} retry {attempt - 1}/{max_attempts - 1} in {delay:.1f}s")
+            time.sleep(delay)
+
+        # A closed port or dead host fails here in seconds instead of inside spn.py
+        if connect_timeout:
+            reachable, reason = check_tcp_reachable(host, port, connect_timeout)
+            if not reachable:
+                result = dict(base_result, success=False, retryable=True, outcome='unreachable',
+                              message=f'Unreachable: {reason}')
+                continue
 
-    try:
-        # Execute spn.py - let it handle all file output and cleanup
-        result = subprocess.run(
-            cmd_args,
-            capture_output=True,
-            text=True,
-            timeout=600,  # 10 minute timeout per device
-            env=env
-        )
+        try:
+            # Execute spn.py - let it handle all file output and cleanup
+            process = subprocess.run(
+                cmd_args,
+                capture_output=True,
+                text=True,
+                timeout=device_timeout,
+                env=env
+            )
+        except subprocess.TimeoutExpired:
+            # The device answered but hung; another ten minutes rarely helps
+            result = dict(base_result, success=False, retryable=False, outcome='timeout',
+                          message=f'Command timed out ({device_timeout}s)',
+                          telemetry=read_telemetry_file(telemetry_file))
+            break
+        except Exception as e:
+            result = dict(base_result, success=False, retryable=False, outcome='error',
+                          message=f'Execution error: {str(e)}',
+                          telemetry=read_telemetry_file(telemetry_file))
+            break
 
-        end_time = datetime.now()
-        execution_time = (end_time - start_time).total_seconds()
-        success = result.returncode == 0
+        success = process.returncode == 0
 
         # Only save stderr to log file if there were errors
-        if result.stderr:
+        if process.stderr:
             log_file = output_dir / f"{device_name}.log"
             with open(log_file, 'w') as f:
                 f.write(f"Command: {' '.join(cmd_args)}\n")
                 f.write(f"Device: {device_name} ({host})\n")
                 f.write(f"Credentials ID: {cred_id}\n")
                 f.write(f"Process ID: {os.getpid()}\n")
-                f.write(f"Return code: {result.returncode}\n")
-                f.write(f"STDERR:\n{result.stderr}\n")
-                if result.stdout:
-                    f.write(f"STDOUT:\n{result.stdout}\n")
+                f.write(f"Attempt: {attempt}/{max_attempts}\n")
+                f.write(f"Return code: {process.returncode}\n")
+                f.write(f"STDERR:\n{process.stderr}\n")
+                if process.stdout:
+                    f.write(f"STDOUT:\n{process.stdout}\n")
+
+        message = 'Completed successfully' if success else f'Exit code: {process.returncode}'
+        output = f"{process.stdout or ''}\n{process.stderr or ''}"
+        auth_failed = not success and bool(AUTH_FAILURE_PATTERN.search(output))
+        if auth_failed:
+            message = 'Authentication failed'
+        connection_failed = not success and not auth_failed and bool(CONNECTION_FAILURE_PATTERN.search(output))
+        if connection_failed:
+            message = f'Connection failed: exit code {process.returncode}'
+
+        if success:
+            outcome = 'success'
+        elif auth_failed:
+            outcome = 'auth'
+        elif connection_failed:
+            # Same as a failed TCP pre-check for the circuit breaker: the device is not answering SSH
+            outcome = 'unreachable'
+        else:
+            outcome = 'error'
+
+        result = dict(base_result,
+                      success=success,
+                      return_code=process.returncode,
+                      output_file=str(output_file),
+                      fingerprint_enabled=fingerprint_enabled,
+                      paging_source=paging_source,
+                      telemetry=read_telemetry_file(telemetry_file),
+                      retryable=connection_failed,
+                      outcome=outcome,
+                      message=message)
+
+        # Prompt, command and parse failures would fail the same way again
+        if not result['retryable']:
+            break
 
-        return {
-            'device': device_name,
-            'host': host,
-            'cred_id': cred_id,
-            'success': success,
-            'return_code': result.returncode,
-            'execution_time': execution_time,
-            'output_file': str(output_file),
-            'process_id': os.getpid(),
-            'message': 'Completed successfully' if success else f'Exit code: {result.returncode}'
-        }
+    if os.path.exists(telemetry_file):
+        read_telemetry_file(telemetry_file)
+
+    result['attempts'] = attempt
+    result['execution_time'] = (datetime.now() - start_time).total_seconds()
+    result.pop('retryable', None)
+    if attempt > 1:
+        result['message'] = f"{result['message']} (after {attempt} attempts)"
+    return result
 
-    except subprocess.TimeoutExpired:
-        return {
-            'device': device_name,
-            'host': host,
-            'cred_id': cred_id,
-            'success': False,
-            'message': 'Command timed out (600s)',
-            'execution_time': 600,
-            'process_id': os.getpid()
-        }
-    except Exception as e:
-        return {
-            'device': device_name,
-            'host': host,
-            'cred_id': cred_id,
-            'success': False,
-            'message': f'Execution error: {str(e)}',
-            'execution_time': 0,
-            'process_id': os.getpid()
-        }
 class BatchExecutor:
     """Executes spn.py commands in batch using concurrent processes"""
 
-    def __init__(self, spn_script_path: str, base_output_dir: str = "capture"):
+    def __init__(self, spn_script_path: str, base_output_dir: str = "capture",
+                 telemetry_db: Optional[str] = None):
         self.spn_script_path = spn_script_path
         self.base_output_dir = base_output_dir
+        self.telemetry_db = telemetry_db
         self.execution_results = []
         self.credential_manager = CredentialManager()
 
     def execute_batch(self, devices: List[Dict], commands: str, output_subdir: str,
                       max_processes: int = 4, dry_run: bool = False, verbose: bool = False,
-                      enable_fingerprint: bool = False, fingerprint_base_dir: str = "fingerprints") -> Dict[str, Any]:
+                      enable_fingerprint: bool = False, fingerprint_base_dir: str = "fingerprints",
+                      legacy_paging: bool = False, device_timeout: int = DEFAULT_DEVICE_TIMEOUT,
+                      connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                      device_retries: int = DEFAULT_DEVICE_RETRIES,
+                      retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+                      circuit_threshold: int = DEFAULT_CIRCUIT_THRESHOLD,
+                      circuit_cooldown_hours: float = DEFAULT_CIRCUIT_COOLDOWN_HOURS,
+                      fingerprint_ttl_hours: float = DEFAULT_FINGERPRINT_TTL_HOURS,
+                      assets_db: Optional[str] = None,
+                      fingerprint_db: Optional[str] = None) -> Dict[str, Any]:
         """Execute commands against all devices using concurrent processes with optional fingerprinting"""
 
         # Validate credentials first
         if not self.credential_manager.validate_credentials(devices):
             return {"error": "Credential validation failed"}
 
+        # Devices that failed the last N runs don't get a worker slot until their cooldown passes
+        devices, skipped_results = self._apply_circuit_breaker(devices, circuit_threshold, circuit_cooldown_hours)
+
         # Create directories
         output_dir = Path(self.base_output_dir) / output_subdir
         fingerprint_dir = None
 
+        fresh_fingerprints = {}
+
         if enable_fingerprint:
             fingerprint_dir = Path(fingerprint_base_dir)
             fingerprint_dir.mkdir(parents=True, exist_ok=True)
+            if fingerprint_ttl_hours > 0:
+                freshness = FingerprintFreshness(str(fingerprint_dir), fingerprint_ttl_hours, assets_db,
+                                                 fingerprint_db)
+                fresh_fingerprints = freshness.fresh_devices(devices)
 
         if commands:  # Only create output dir if commands are provided
             output_dir.mkdir(parents=True, exist_ok=True)
@@ -412,7 +744,8 @@ class BatchExecutor:
                 if commands:
                     output_info.append(f"output: {output_subdir}/{device['display_name']}.txt")
                 if enable_fingerprint:
-                    output_info.append(f"fingerprint: {fingerprint_dir}/{device['display_name']}.json")
+                    cache_info = " (cached, probe only)" if device['display_name'] in fresh_fingerprints else ""
+                    output_info.append(f"fingerprint: {fingerprint_dir}/{device['display_name']}.json{cache_info}")
                 output_str = " | ".join(output_info) if output_info else "fingerprint only"
                 print(f"  - {device['display_name']} ({device['host']}) [cred_id: {cred_id}] -> {output_str}")
             return {"dry_run": True, "device_count": len(devices)}
@@ -423,6 +756,9 @@ class BatchExecutor:
             print(f"Commands: {commands}")
         if enable_fingerprint:
             print(f"Fingerprinting: ENABLED -> {fingerprint_dir}/")
+            if fingerprint_ttl_hours > 0:
+                print(f"Fingerprint cache: {len(fresh_fingerprints)}/{len(devices)} devices fresh "
+                      f"(TTL {fingerprint_ttl_hours:g}h) - prompt probe only")
         else:
             print(f"Fingerprinting: DISABLED")
         print(f"CPU cores available: {multiprocessing.cpu_count()}")
@@ -437,7 +773,15 @@ class BatchExecutor:
             'output_dir': str(output_dir),
             'spn_script_path': self.spn_script_path,
             'enable_fingerprint': enable_fingerprint,
-            'fingerprint_dir': str(fingerprint_dir) if fingerprint_dir else None
+            'fingerprint_dir': str(fingerprint_dir) if fingerprint_dir else None,
+            'fingerprint_lookup_dir': fingerprint_base_dir,
+            'fingerprint_db': fingerprint_db,
+            'legacy_paging': legacy_paging,
+            'device_timeout': device_timeout,
+            'connect_timeout': connect_timeout,
+            'device_retries': device_retries,
+            'retry_backoff': retry_backoff,
+            'fresh_fingerprints': fresh_fingerprints
         }
 
         # Prepare data for workers - combine device with config
@@ -480,6 +824,7 @@ class BatchExecutor:
                         error_result = {
                             'device': device['display_name'],
                             'host': device['host'],
+                            'vendor': device.get('Vendor', ''),
                             'success': False,
                             'message': f'Process exception: {exc}',
                             'execution_time': 0,
@@ -496,16 +841,67 @@ class BatchExecutor:
             return {"error": "Operation cancelled", "partial_results": self.execution_results}
 
         end_time = datetime.now()
+        self.execution_results.extend(skipped_results)
         execution_summary = self._generate_summary(start_time, end_time, max_processes, enable_fingerprint)
+        self._record_telemetry(start_time, end_time, output_subdir, max_processes)
 
         return execution_summary
 
+    def _apply_circuit_breaker(self, devices: List[Dict], threshold: int,
+                               cooldown_hours: float) -> Tuple[List[Dict], List[Dict[str, Any]]]:
+        """Split devices into (to run, skipped results) using failure history in the telemetry store"""
+        if not self.telemetry_db or threshold <= 0:
+            return devices, []
+
+        try:
+            circuits = TelemetryStore(self.telemetry_db).open_circuits(threshold, cooldown_hours)
+        except Exception as e:
+            print(f"Warning: circuit breaker unavailable: {e}")
+            return devices, []
+
+        runnable = []
+        skipped = []
+        for device in devices:
+            circuit = circuits.get(device['display_name'])
+            if not circuit:
+                runnable.append(device)
+                continue
+            skipped.append({
+                'device': device['display_name'],
+                'host': device['host'],
+                'vendor': device.get('Vendor', ''),
+                'success': False,
+                'skipped': True,
+                'execution_time': 0,
+                'message': f"Circuit open: failed last {circuit['failures']} runs "
+                           f"(last {circuit['last_failure'][:16]}: {circuit['last_message']})"
+            })
+
+        if skipped:
+            print(f"Circuit breaker: skipping {len(skipped)} devices that failed their last {threshold} runs "
+                  f"(retry after {cooldown_hours:g}h, or use --circuit-threshold 0)")
+        return runnable, skipped
+
+    def _record_telemetry(self, start_time: datetime, end_time: datetime, output_subdir: str,
+                          max_processes: int):
+        """Persist per-device timing; a telemetry failure never fails the batch"""
+        if not self.telemetry_db or not self.execution_results:
+            return
+        try:
+            store = TelemetryStore(self.telemetry_db)
+            run_id = store.record_run('batch_spn_concurrent', self.execution_results, start_time, end_time,
+                                      capture_type=output_subdir, max_workers=max_processes)
+            print(f"Telemetry recorded: run {run_id} -> {self.telemetry_db}")
+        except Exception as e:
+            print(f"Warning: could not record telemetry: {e}")
+
     def _generate_summary(self, start_time: datetime, end_time: datetime, max_processes: int,
                           fingerprint_enabled: bool) -> Dict[str, Any]:
         """Generate execution summary"""
         total_time = (end_time - start_time).total_seconds()
         successful = len([r for r in self.execution_results if r['success']])
-        failed = len(self.execution_results) - successful
+        skipped = len([r for r in self.execution_results if r.get('skipped')])
+        failed = len(self.execution_results) - successful - skipped
 
         # Calculate process utilization stats
         process_ids = set(r.get('process_id', 'unknown') for r in self.execution_results if r.get('process_id'))
@@ -524,6 +920,7 @@ class BatchExecutor:
             'total_devices': len(self.execution_results),
             'successful': successful,
             'failed': failed,
+            'skipped': skipped,
             'total_execution_time': total_time,
             'max_processes_configured': max_processes,
             'actual_processes_used': unique_processes,
@@ -542,6 +939,8 @@ class BatchExecutor:
         print(f"Total devices: {summary['total_devices']}")
         print(f"Successful: {successful}")
         print(f"Failed: {failed}")
+        if skipped:
+            print(f"Skipped (circuit open): {skipped}")
         if fingerprint_enabled:
             print(f"Fingerprints successful: {fingerprint_successful}")
             print(f"Fingerprints failed: {fingerprint_failed}")
@@ -553,7 +952,7 @@ class BatchExecutor:
         if failed > 0:
             print(f"\nFailed devices:")
             for result in self.execution_results:
-                if not result['success']:
+                if not result['success'] and not result.get('skipped'):
                     print(f"  - {result['device']}: {result['message']}")
 
         return summary
@@ -630,6 +1029,34 @@ Examples:
                         help='Only execute against devices that have existing fingerprint files')
     parser.add_argument('--fingerprint-base', default='fingerprints',
                         help='Base directory for fingerprint files (default: fingerprints)')
+    parser.add_argument('--fingerprint-db', default=DEFAULT_FINGERPRINT_DB,
+                        help=f'SQLite fingerprint store written by spn.py and queried by filters '
+                             f'(default: {DEFAULT_FINGERPRINT_DB})')
+    parser.add_argument('--no-fingerprint-db', action='store_true',
+                        help='Use only the per-device fingerprint JSON files')
+    parser.add_argument('--fingerprint-ttl', type=float, default=DEFAULT_FINGERPRINT_TTL_HOURS,
+                        help='Reuse fingerprints younger than this many hours after a prompt check, '
+                             f'0 to always re-fingerprint (default: {DEFAULT_FINGERPRINT_TTL_HOURS})')
+    parser.add_argument('--assets-db', default='assets.db',
+                        help='Database whose version changes invalidate cached fingerprints (default: assets.db)')
+    parser.add_argument('--legacy-paging', action='store_true',
+                        help='Send every common paging-disable command instead of the vendor-specific one')
+
+    # Per-device resilience
+    parser.add_argument('--device-timeout', type=int, default=DEFAULT_DEVICE_TIMEOUT,
+                        help=f'Seconds allowed for one device run (default: {DEFAULT_DEVICE_TIMEOUT})')
+    parser.add_argument('--connect-timeout', type=float, default=DEFAULT_CONNECT_TIMEOUT,
+                        help=f'TCP reachability pre-check timeout, 0 to disable (default: {DEFAULT_CONNECT_TIMEOUT})')
+    parser.add_argument('--device-retries', type=int, default=DEFAULT_DEVICE_RETRIES,
+                        help=f'Retries per device after unreachable/connection failures (default: {DEFAULT_DEVICE_RETRIES})')
+    parser.add_argument('--retry-backoff', type=float, default=DEFAULT_RETRY_BACKOFF,
+                        help=f'Initial retry delay in seconds, doubled per retry (default: {DEFAULT_RETRY_BACKOFF})')
+    parser.add_argument('--circuit-threshold', type=int, default=DEFAULT_CIRCUIT_THRESHOLD,
+                        help='Skip devices that failed this many consecutive runs, 0 to disable '
+                             f'(default: {DEFAULT_CIRCUIT_THRESHOLD})')
+    parser.add_argument('--circuit-cooldown', type=float, default=DEFAULT_CIRCUIT_COOLDOWN_HOURS,
+                        help='Hours before a skipped device gets a trial attempt '
+                             f'(default: {DEFAULT_CIRCUIT_COOLDOWN_HOURS})')
 
     # Process control
     parser.add_argument('--max-processes', type=int, default=4,
@@ -640,6 +1067,9 @@ Examples:
 
     # Output control
     parser.add_argument('--save-summary', help='Save execution summary to JSON file')
+    parser.add_argument('--telemetry-db', default=DEFAULT_TELEMETRY_DB,
+                        help=f'Record per-device timing to this SQLite file (default: {DEFAULT_TELEMETRY_DB})')
+    parser.add_argument('--no-telemetry', action='store_true', help='Do not record per-device timing')
     parser.add_argument('--list-devices', action='store_true', help='Just list matching devices and exit')
 
     args = parser.parse_args()
@@ -647,6 +1077,10 @@ Examples:
     # Replace the argument validation section with this enhanced version:
 
     # Validate arguments
+    if args.device_retries < 0:
+        print("Error: --device-retries must be 0 or more")
+        sys.exit(1)
+
     if args.fingerprint_only and args.fingerprinted_only:
         print("Error: --fingerprint-only and --fingerprinted-only are mutually exclusive")
         print("  Use --fingerprint-only to perform fingerprinting on devices")
@@ -692,10 +1126,13 @@ Examples:
         device_type=args.device_type
     )
 
+    fingerprint_db = None if args.no_fingerprint_db else args.fingerprint_db
+
     # Apply fingerprinted-only filter if requested
     if args.fingerprinted_only:
         before_count = len(matched_devices)
-        matched_devices = device_filter.filter_fingerprinted_devices(matched_devices, args.fingerprint_base)
+        matched_devices = device_filter.filter_fingerprinted_devices(matched_devices, args.fingerprint_base,
+                                                                     fingerprint_db)
         after_count = len(matched_devices)
         print(f"Filtered to fingerprinted devices only: {before_count} -> {after_count} devices")
 
@@ -717,7 +1154,8 @@ Examples:
         sys.exit(0)
 
     # Execute batch commands using processes with optional fingerprinting
-    executor = BatchExecutor(args.spn_script, args.output_base)
+    executor = BatchExecutor(args.spn_script, args.output_base,
+                             telemetry_db=None if args.no_telemetry else args.telemetry_db)
     summary = executor.execute_batch(
         devices=matched_devices,
         commands=args.commands or "",
@@ -726,7 +1164,17 @@ Examples:
         dry_run=args.dry_run,
         verbose=args.verbose,
         enable_fingerprint=args.fingerprint,
-        fingerprint_base_dir=args.fingerprint_base
+        fingerprint_base_dir=args.fingerprint_base,
+        legacy_paging=args.legacy_paging,
+        device_timeout=args.device_timeout,
+        connect_timeout=args.connect_timeout,
+        device_retries=args.device_retries,
+        retry_backoff=args.retry_backoff,
+        circuit_threshold=args.circuit_threshold,
+        circuit_cooldown_hours=args.circuit_cooldown,
+        fingerprint_ttl_hours=args.fingerprint_ttl,
+        assets_db=args.assets_db,
+        fingerprint_db=fingerprint_db
     )
 
     # Save summary if requested
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Central Collection Scheduler
+Expands every job file in a job list into (device, capture type) work items and runs
+them through one shared pool instead of one batch_spn_concurrent.py per job.
+
+Enforces:
+  - a global cap on concurrent SSH sessions
+  - at most one session per device (host) at a time
+  - a per-site (session folder) cap
+Work is ordered longest-expected-first using durations from previous runs, so the
+slow devices start early and the pipe stays full at the end of the run.
+"""
+
+import os
+import sys
+import json
+import argparse
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from batch_spn_concurrent import (DeviceFilter, execute_single_device, load_sessions,
+                                  DEFAULT_CIRCUIT_THRESHOLD, DEFAULT_CIRCUIT_COOLDOWN_HOURS)
+from collection_telemetry import TelemetryStore, DEFAULT_TELEMETRY_DB
+from fingerprint_store import DEFAULT_FINGERPRINT_DB
+from run_jobs_concurrent_batch import (VendorCommandManager, JobBatchRunner,
+                                       get_credential_env_vars, log_message)
+
+
+DEFAULT_EXPECTED_SECONDS = 30.0
+
+
+@dataclass
+class WorkItem:
+    """A single (device, capture type) collection"""
+    device: Dict[str, Any]
+    capture_type: str
+    job_name: str
+    config: Dict[str, Any]
+    expected_seconds: float = DEFAULT_EXPECTED_SECONDS
+
+    @property
+    def device_name(self) -> str:
+        return self.device.get('display_name', '')
+
+    @property
+    def device_key(self) -> str:
+        return f"{self.device.get('host', '')}:{self.device.get('port', '22')}"
+
+    @property
+    def site(self) -> str:
+        return self.device.get('folder_name', '') or 'UNKNOWN'
+
+    @property
+    def history_key(self) -> str:
+        return f"{self.device_name}|{self.capture_type}"
+
+
+class DurationHistory:
+    """Expected run time per (device, capture type), kept as an EWMA in a JSON file"""
+
+    def __init__(self, history_file: str, alpha: float = 0.3):
+        self.history_file = Path(history_file)
+        self.alpha = alpha
+        self.durations: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.history_file.exists():
+            return
+        try:
+            with open(self.history_file, 'r', encoding='utf-8') as f:
+                self.durations = {k: float(v) for k, v in json.load(f).items()}
+        except Exception as e:
+            log_message(f"Could not read duration history {self.history_file}: {e}", "WARN")
+            self.durations = {}
+
+    def save(self):
+        with self._lock:
+            tmp_file = self.history_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.durations, f, indent=2, sort_keys=True)
+            os.replace(tmp_file, self.history_file)
+
+    def expected(self, item: WorkItem) -> float:
+        """Device history first, then the mean for the capture type, then a default"""
+        if item.history_key in self.durations:
+            return self.durations[item.history_key]
+
+        suffix = f"|{item.capture_type}"
+        same_capture = [v for k, v in self.durations.items() if k.endswith(suffix)]
+        if same_capture:
+            return sum(same_capture) / len(same_capture)
+
+        return DEFAULT_EXPECTED_SECONDS
+
+    def record(self, item: WorkItem, seconds: float):
+        with self._lock:
+            previous = self.durations.get(item.history_key)
+            if previous is None:
+                self.durations[item.history_key] = seconds
+            else:
+                self.durations[item.history_key] = self.alpha * seconds + (1 - self.alpha) * previous
+
+
+class WorkItemBuilder:
+    """Turns job configuration files into WorkItems"""
+
+    def __init__(self, spn_script_path: str = 'spn.py', output_base: str = 'capture'):
+        self.spn_script_path = spn_script_path
+        self.output_base = output_base
+        self.vendor_manager = VendorCommandManager()
+        self._sessions_cache: Dict[str, List[Dict]] = {}
+
+    def _sessions(self, session_file: str) -> List[Dict]:
+        if session_file not in self._sessions_cache:
+            self._sessions_cache[session_file] = load_sessions([session_file])
+        return self._sessions_cache[session_file]
+
+    def build(self, job_file: str, job_config: Dict[str, Any]) -> List[WorkItem]:
+        job_name = os.path.basename(job_file)
+
+        for required in ['session_file', 'commands', 'execution']:
+            if required not in job_config:
+                raise ValueError(f"Missing required field in job config: {required}")
+
+        session_file = job_config['session_file']
+        if not os.path.exists(session_file):
+            raise FileNotFoundError(f"Session file not found: {session_file}")
+
+        vendor_info = job_config.get('vendor', {})
+        vendor = vendor_info.get('selected', 'generic').lower()
+        commands_info = job_config.get('commands', {})
+        filters = job_config.get('filters', {})
+        fingerprint_options = job_config.get('fingerprint_options', {})
+
+        base_commands = commands_info.get('command_text', '')
+        if vendor_info.get('auto_paging', True):
+            final_commands = self.vendor_manager.build_command_with_paging(vendor, base_commands)
+        else:
+            final_commands = base_commands
+
+        capture_type = commands_info.get('output_directory', 'output')
+        output_dir = Path(self.output_base) / capture_type
+
+        device_filter = DeviceFilter(self._sessions(session_file))
+        devices = device_filter.filter_devices(
+            folder_pattern=(filters.get('folder') or '').strip() or None,
+            name_pattern=(filters.get('name') or '').strip() or None,
+            vendor_pattern=(filters.get('vendor') or '').strip() or None,
+            device_type=(filters.get('device_type') or '').strip() or None
+        )
+
+        fingerprint_base = (fingerprint_options.get('fingerprint_base') or 'fingerprints').strip()
+        fingerprint_db = (fingerprint_options.get('fingerprint_db', DEFAULT_FINGERPRINT_DB) or '').strip() or None
+        if fingerprint_options.get('fingerprinted_only', False):
+            devices = device_filter.filter_fingerprinted_devices(devices, fingerprint_base, fingerprint_db)
+
+        config = {
+            'commands': final_commands,
+            'output_dir': str(output_dir),
+            'spn_script_path': self.spn_script_path,
+            'enable_fingerprint': False,
+            'fingerprint_dir': None,
+            'fingerprint_lookup_dir': fingerprint_base,
+            'fingerprint_db': fingerprint_db,
+            'credential_env': get_credential_env_vars(job_config)
+        }
+
+        return [WorkItem(device=device, capture_type=capture_type, job_name=job_name, config=config)
+                for device in devices]
+
+
+class CollectionScheduler:
+    """Runs WorkItems under global, per-device and per-site concurrency limits"""
+
+    def __init__(self, max_sessions: int = 24, per_site: int = 4,
+                 history: Optional[DurationHistory] = None, verbose: bool = False):
+        self.max_sessions = max_sessions
+        self.per_site = per_site
+        self.history = history
+        self.verbose = verbose
+
+        self._busy_devices = set()
+        self._site_sessions: Dict[str, int] = {}
+
+    def order(self, items: List[WorkItem]) -> List[WorkItem]:
+        """Longest expected duration first (LPT) so stragglers don't start last"""
+        for item in items:
+            item.expected_seconds = self.history.expected(item) if self.history else DEFAULT_EXPECTED_SECONDS
+        return sorted(items, key=lambda w: w.expected_seconds, reverse=True)
+
+    def _can_start(self, item: WorkItem) -> bool:
+        if item.device_key in self._busy_devices:
+            return False
+        return self._site_sessions.get(item.site, 0) < self.per_site
+
+    def _acquire(self, item: WorkItem):
+        self._busy_devices.add(item.device_key)
+        self._site_sessions[item.site] = self._site_sessions.get(item.site, 0) + 1
+
+    def _release(self, item: WorkItem):
+        self._busy_devices.discard(item.device_key)
+        self._site_sessions[item.site] = self._site_sessions.get(item.site, 1) - 1
+
+    def run(self, items: List[WorkItem]) -> List[Dict[str, Any]]:
+        pending = self.order(items)
+        total = len(pending)
+        results = []
+        running = {}
+
+        for item in pending:
+            Path(item.config['output_dir']).mkdir(parents=True, exist_ok=True)
+
+        with ThreadPoolExecutor(max_workers=self.max_sessions) as pool:
+            while pending or running:
+                # Fill free slots with the longest eligible item
+                index = 0
+                while len(running) < self.max_sessions and index < len(pending):
+                    item = pending[index]
+                    if not self._can_start(item):
+                        index += 1
+                        continue
+
+                    pending.pop(index)
+                    self._acquire(item)
+                    future = pool.submit(execute_single_device, (item.device, item.config))
+                    running[future] = item
+                    if self.verbose:
+                        log_message(f"Started {item.device_name} [{item.capture_type}] "
+                                    f"(expected {item.expected_seconds:.0f}s, site {item.site})", "INFO", item.job_name)
+
+                if not running:
+                    # Nothing can start and nothing is running - limits are unsatisfiable
+                    log_message(f"{len(pending)} work items could not be scheduled", "ERROR")
+                    break
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = running.pop(future)
+                    self._release(item)
+
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {
+                            'device': item.device_name,
+                            'host': item.device.get('host', ''),
+                            'success': False,
+                            'message': f'Scheduler exception: {e}',
+                            'execution_time': 0
+                        }
+
+                    result['capture_type'] = item.capture_type
+                    result['job_name'] = item.job_name
+                    result['expected_seconds'] = item.expected_seconds
+                    results.append(result)
+
+                    if self.history and result.get('success'):
+                        self.history.record(item, result.get('execution_time', 0))
+
+                    status = "SUCCESS" if result.get('success') else "FAILED"
+                    log_message(f"[{len(results)}/{total}] [{status}] {item.device_name} [{item.capture_type}] "
+                                f"{result.get('execution_time', 0):.1f}s - {result.get('message', '')}",
+                                "INFO" if result.get('success') else "ERROR", item.job_name)
+
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Central collection scheduler - run all jobs in a job list through one "
+                    "concurrency budget",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s job_batch_full.txt                          # 24 sessions, 4 per site
+  %(prog)s job_batch_full.txt --max-sessions 40 --per-site 6
+  %(prog)s job_batch_full.txt --dry-run                # show scheduling order only
+        """
+    )
+    parser.add_argument('job_list_file', help='File containing list of job configuration files')
+    parser.add_argument('--max-sessions', type=int, default=24,
+                        help='Global cap on concurrent SSH sessions (default: 24)')
+    parser.add_argument('--per-site', type=int, default=4,
+                        help='Maximum concurrent sessions per site/folder (default: 4)')
+    parser.add_argument('--history-file', default='collection_history.json',
+                        help='Duration history used for longest-first ordering (default: collection_history.json)')
+    parser.add_argument('--spn-script', default='spn.py', help='Path to spn.py script (default: spn.py)')
+    parser.add_argument('--output-base', default='capture', help='Base output directory (default: capture)')
+    parser.add_argument('--save-summary', help='Save execution summary to JSON file')
+    parser.add_argument('--telemetry-db', default=DEFAULT_TELEMETRY_DB,
+                        help=f'Record per-device timing to this SQLite file (default: {DEFAULT_TELEMETRY_DB})')
+    parser.add_argument('--no-telemetry', action='store_true', help='Do not record per-device timing')
+    parser.add_argument('--circuit-threshold', type=int, default=DEFAULT_CIRCUIT_THRESHOLD,
+                        help='Skip devices that failed this many consecutive runs, 0 to disable '
+                             f'(default: {DEFAULT_CIRCUIT_THRESHOLD})')
+    parser.add_argument('--circuit-cooldown', type=float, default=DEFAULT_CIRCUIT_COOLDOWN_HOURS,
+                        help='Hours before a skipped device gets a trial attempt '
+                             f'(default: {DEFAULT_CIRCUIT_COOLDOWN_HOURS})')
+    parser.add_argument('--dry-run', action='store_true', help='Show the work plan without connecting')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Log every dispatch')
+    args = parser.parse_args()
+
+    if args.max_sessions < 1 or args.per_site < 1:
+        print("Error: --max-sessions and --per-site must be at least 1")
+        return 1
+
+    runner = JobBatchRunner(verbose=args.verbose)
+    try:
+        job_files = runner.load_job_list(args.job_list_file)
+    except Exception as e:
+        log_message(str(e), "ERROR")
+        return 1
+
+    builder = WorkItemBuilder(args.spn_script, args.output_base)
+    items: List[WorkItem] = []
+    for job_file in job_files:
+        try:
+            job_items = builder.build(job_file, runner.load_job_config(job_file))
+            items.extend(job_items)
+            log_message(f"{len(job_items)} work items", "INFO", os.path.basename(job_file))
+        except Exception as e:
+            log_message(f"Skipping job: {e}", "ERROR", os.path.basename(job_file))
+
+    if not items:
+        log_message("No work items to schedule", "ERROR")
+        return 1
+
+    skipped_results = []
+    if not args.no_telemetry and args.circuit_threshold > 0:
+        try:
+            circuits = TelemetryStore(args.telemetry_db).open_circuits(args.circuit_threshold,
+                                                                       args.circuit_cooldown)
+        except Exception as e:
+            log_message(f"Circuit breaker unavailable: {e}", "WARN")
+            circuits = {}
+        if circuits:
+            runnable = []
+            for item in items:
+                circuit = circuits.get(item.device_name)
+                if not circuit:
+                    runnable.append(item)
+                    continue
+                skipped_results.append({
+                    'device': item.device_name,
+                    'host': item.device.get('host', ''),
+                    'vendor': item.device.get('Vendor', ''),
+                    'capture_type': item.capture_type,
+                    'job_name': item.job_name,
+                    'success': False,
+                    'skipped': True,
+                    'execution_time': 0,
+                    'message': f"Circuit open: failed last {circuit['failures']} runs"
+                })
+            log_message(f"Circuit breaker: skipping {len(skipped_results)} work items on "
+                        f"{len(set(r['device'] for r in skipped_results))} devices "
+                        f"(retry after {args.circuit_cooldown:g}h)", "WARN")
+            items = runnable
+
+    history = DurationHistory(args.history_file)
+    scheduler = CollectionScheduler(max_sessions=args.max_sessions, per_site=args.per_site,
+                                    history=history, verbose=args.verbose)
+
+    device_count = len(set(item.device_key for item in items))
+    log_message(f"Scheduling {len(items)} work items across {device_count} devices "
+                f"(max {args.max_sessions} sessions, {args.per_site} per site, 1 per device)")
+
+    if args.dry_run:
+        for item in scheduler.order(items):
+            print(f"  {item.expected_seconds:7.1f}s  {item.device_name:<30} {item.capture_type:<20} "
+                  f"[{item.site}] ({item.job_name})")
+        return 0
+
+    start_time = datetime.now()
+    try:
+        results = scheduler.run(items)
+    except KeyboardInterrupt:
+        print("\nScheduler interrupted by user")
+        history.save()
+        return 1
+    end_time = datetime.now()
+    history.save()
+    results.extend(skipped_results)
+
+    if not args.no_telemetry and results:
+        try:
+            run_id = TelemetryStore(args.telemetry_db).record_run(
+                'collection_scheduler', results, start_time, end_time, max_workers=args.max_sessions)
+            log_message(f"Telemetry recorded: run {run_id} -> {args.telemetry_db}")
+        except Exception as e:
+            log_message(f"Could not record telemetry: {e}", "WARN")
+
+    successful = len([r for r in results if r.get('success')])
+    failed = len(results) - successful - len(skipped_results)
+    total_time = (end_time - start_time).total_seconds()
+    busy_time = sum(r.get('execution_time', 0) for r in results)
+
+    log_message("=" * 60)
+    log_message("COLLECTION SCHEDULER SUMMARY")
+    log_message("=" * 60)
+    log_message(f"Work items: {len(results)}")
+    log_message(f"Successful: {successful}")
+    log_message(f"Failed: {failed}")
+    if skipped_results:
+        log_message(f"Skipped (circuit open): {len(skipped_results)}")
+    log_message(f"Wall time: {total_time:.1f}s")
+    log_message(f"Session utilisation: {busy_time / (total_time * args.max_sessions) * 100:.0f}%"
+                if total_time > 0 else "Session utilisation: N/A")
+
+    if args.save_summary:
+        summary = {
+            'start_time': start_time.isoformat(),
+            'end_time': end_time.isoformat(),
+            'total_time': total_time,
+            'max_sessions': args.max_sessions,
+            'per_site': args.per_site,
+            'successful': successful,
+            'failed': failed,
+            'skipped': len(skipped_results),
+            'results': results
+        }
+        with open(args.save_summary, 'w') as f:
+            json.dump(summary, f, indent=2)
+        log_message(f"Execution summary saved to {args.save_summary}")
+
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
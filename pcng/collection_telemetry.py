@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Collection Telemetry Store
+Persists per-device timing from batch collection runs into a sidecar SQLite database
+(collection_telemetry.db) and reports p50/p95 per vendor and capture type.
+
+Tables:
+  collection_runs      - one row per batch_spn_concurrent / scheduler run
+  collection_attempts  - one row per device attempt: connect, auth, prompt and command
+                         timings, bytes received and outcome
+
+Usage:
+  python collection_telemetry.py report
+  python collection_telemetry.py report --group-by device_name --since-days 7
+  python collection_telemetry.py report --group-by vendor,capture_type --failures
+"""
+
+import sys
+import json
+import math
+import sqlite3
+import argparse
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+
+
+DEFAULT_TELEMETRY_DB = "collection_telemetry.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS collection_runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    runner TEXT NOT NULL,
+    job_name TEXT,
+    capture_type TEXT,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    max_workers INTEGER,
+    total_attempts INTEGER DEFAULT 0,
+    successful INTEGER DEFAULT 0,
+    failed INTEGER DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS collection_attempts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES collection_runs(id) ON DELETE CASCADE,
+    device_name TEXT NOT NULL,
+    host TEXT,
+    vendor TEXT,
+    capture_type TEXT,
+    recorded_at TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    return_code INTEGER,
+    message TEXT,
+    total_seconds REAL,
+    connect_seconds REAL,
+    auth_seconds REAL,
+    prompt_seconds REAL,
+    command_seconds REAL,
+    bytes_received INTEGER,
+    command_timings TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_attempts_run ON collection_attempts(run_id);
+CREATE INDEX IF NOT EXISTS idx_attempts_device ON collection_attempts(device_name, recorded_at);
+CREATE INDEX IF NOT EXISTS idx_attempts_vendor_capture ON collection_attempts(vendor, capture_type, recorded_at);
+"""
+
+# Metrics reported by percentile, in display order
+TIMING_COLUMNS = ['total_seconds', 'connect_seconds', 'auth_seconds', 'prompt_seconds', 'command_seconds']
+GROUP_COLUMNS = {'vendor', 'capture_type', 'device_name', 'host'}
+OUTCOMES = ('success', 'skipped', 'timeout', 'auth', 'unreachable', 'error')
+# Outcomes that count towards opening a device's circuit
+CIRCUIT_OUTCOMES = ('unreachable', 'timeout')
+
+
+def classify_outcome(result: Dict[str, Any]) -> str:
+    """
+    Collapse a batch result dict into success/skipped/timeout/auth/unreachable/error.
+
+    execute_single_device sets the outcome explicitly; older or synthetic results (scheduler
+    exceptions, credential errors) are classified from their message.
+    """
+    if result.get('success'):
+        return 'success'
+    if result.get('skipped'):
+        return 'skipped'
+    if result.get('outcome') in OUTCOMES:
+        return result['outcome']
+
+    message = (result.get('message') or '').lower()
+    if 'timed out' in message or 'timeout' in message:
+        return 'timeout'
+    if 'credential' in message or 'authentication' in message:
+        return 'auth'
+    if 'unreachable' in message or 'refused' in message:
+        return 'unreachable'
+    return 'error'
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """
+    Nearest-rank percentile; None for an empty list
+
+    >>> percentile(range(1, 11), 50), percentile(range(1, 21), 95), percentile(range(1, 101), 95)
+    (5, 19, 95)
+    >>> percentile([1, 2, 3, 4], 50), percentile([7], 99), percentile([], 50)
+    (2, 7, None)
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class TelemetryStore:
+    """Sidecar SQLite store for collection run timing"""
+
+    def __init__(self, db_path: str = DEFAULT_TELEMETRY_DB):
+        self.db_path = db_path
+        conn = self.get_connection()
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    def get_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA journal_mode = WAL")
+        return conn
+
+    def record_run(self, runner: str, results: List[Dict[str, Any]], started_at: datetime,
+                   finished_at: datetime, job_name: str = None, capture_type: str = None,
+                   max_workers: int = None) -> int:
+        """Record a run and all of its device attempts in one transaction"""
+        successful = len([r for r in results if r.get('success')])
+
+        conn = self.get_connection()
+        try:
+            with conn:
+                cursor = conn.execute("""
+                    INSERT INTO collection_runs
+                        (runner, job_name, capture_type, started_at, finished_at,
+                         max_workers, total_attempts, successful, failed)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (runner, job_name, capture_type, started_at.isoformat(), finished_at.isoformat(),
+                      max_workers, len(results), successful, len(results) - successful))
+                run_id = cursor.lastrowid
+
+                rows = []
+                for result in results:
+                    telemetry = result.get('telemetry') or {}
+                    commands = telemetry.get('commands') or []
+                    command_seconds = sum(c.get('seconds', 0) for c in commands) if commands else None
+                    rows.append((
+                        run_id,
+                        result.get('device', ''),
+                        result.get('host'),
+                        result.get('vendor'),
+                        result.get('capture_type', capture_type),
+                        result.get('finished_at') or finished_at.isoformat(),
+                        classify_outcome(result),
+                        result.get('return_code'),
+                        result.get('message'),
+                        result.get('execution_time'),
+                        telemetry.get('connect_seconds'),
+                        telemetry.get('auth_seconds'),
+                        telemetry.get('prompt_seconds'),
+                        command_seconds,
+                        telemetry.get('bytes_received'),
+                        json.dumps(commands) if commands else None
+                    ))
+
+                conn.executemany("""
+                    INSERT INTO collection_attempts
+                        (run_id, device_name, host, vendor, capture_type, recorded_at, outcome,
+                         return_code, message, total_seconds, connect_seconds, auth_seconds,
+                         prompt_seconds, command_seconds, bytes_received, command_timings)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+            return run_id
+        finally:
+            conn.close()
+
+    def fetch_attempts(self, since: Optional[datetime] = None) -> List[sqlite3.Row]:
+        conn = self.get_connection()
+        try:
+            if since:
+                return conn.execute("SELECT * FROM collection_attempts WHERE recorded_at >= ?",
+                                    (since.isoformat(),)).fetchall()
+            return conn.execute("SELECT * FROM collection_attempts").fetchall()
+        finally:
+            conn.close()
+
+    def open_circuits(self, threshold: int, cooldown_hours: float) -> Dict[str, Dict[str, Any]]:
+        """
+        Devices whose last `threshold` runs all failed to reach them, with the latest of those runs
+        newer than the cooldown. A run counts as failed when every one of its attempts for the
+        device (one per capture type) was unreachable or timed out. Once the cooldown passes the
+        device gets one trial attempt (half-open); a success closes the circuit, another failure
+        re-opens it.
+        """
+        if threshold <= 0:
+            return {}
+
+        placeholders = ', '.join('?' for _ in CIRCUIT_OUTCOMES)
+        conn = self.get_connection()
+        try:
+            rows = conn.execute(f"""
+                WITH device_runs AS (
+                    SELECT device_name, run_id,
+                           MAX(recorded_at) AS recorded_at,
+                           MIN(outcome IN ({placeholders})) AS failed,
+                           MAX(id) AS last_id
+                    FROM collection_attempts
+                    WHERE outcome != 'skipped'
+                    GROUP BY device_name, run_id
+                )
+                SELECT device_name, failed, recorded_at, message
+                FROM (
+                    SELECT r.device_name, r.failed, r.recorded_at, a.message,
+                           ROW_NUMBER() OVER (PARTITION BY r.device_name
+                                              ORDER BY r.recorded_at DESC, r.run_id DESC) AS rn
+                    FROM device_runs r
+                    JOIN collection_attempts a ON a.id = r.last_id
+                )
+                WHERE rn <= ?
+                ORDER BY device_name, rn
+            """, (*CIRCUIT_OUTCOMES, threshold)).fetchall()
+        finally:
+            conn.close()
+
+        recent: Dict[str, List[sqlite3.Row]] = {}
+        for row in rows:
+            recent.setdefault(row['device_name'], []).append(row)
+
+        cutoff = (datetime.now() - timedelta(hours=cooldown_hours)).isoformat()
+        circuits = {}
+        for device_name, runs in recent.items():
+            # Only dead/hung devices - auth and parsing failures are fast and need a human anyway
+            if len(runs) < threshold or not all(r['failed'] for r in runs):
+                continue
+            if runs[0]['recorded_at'] < cutoff:
+                continue  # Cooldown elapsed - allow a trial attempt
+            circuits[device_name] = {
+                'failures': len(runs),
+                'last_failure': runs[0]['recorded_at'],
+                'last_message': runs[0]['message']
+            }
+        return circuits
+
+    def summarize(self, group_by: List[str], since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """p50/p95 per group for every timing column, plus attempt and failure counts"""
+        for column in group_by:
+            if column not in GROUP_COLUMNS:
+                raise ValueError(f"Cannot group by '{column}' (choose from {sorted(GROUP_COLUMNS)})")
+
+        groups: Dict[tuple, List[sqlite3.Row]] = {}
+        for row in self.fetch_attempts(since):
+            key = tuple(row[column] or 'Unknown' for column in group_by)
+            groups.setdefault(key, []).append(row)
+
+        summary = []
+        for key, rows in groups.items():
+            entry = dict(zip(group_by, key))
+            entry['attempts'] = len(rows)
+            entry['failures'] = len([r for r in rows if r['outcome'] not in ('success', 'skipped')])
+            entry['outcomes'] = {}
+            for row in rows:
+                entry['outcomes'][row['outcome']] = entry['outcomes'].get(row['outcome'], 0) + 1
+
+            successful_rows = [r for r in rows if r['outcome'] == 'success']
+            for column in TIMING_COLUMNS:
+                values = [r[column] for r in successful_rows if r[column] is not None]
+                entry[f'{column}_p50'] = percentile(values, 50)
+                entry[f'{column}_p95'] = percentile(values, 95)
+
+            bytes_values = [r['bytes_received'] for r in successful_rows if r['bytes_received'] is not None]
+            entry['bytes_p50'] = percentile(bytes_values, 50)
+            summary.append(entry)
+
+        summary.sort(key=lambda e: e.get('total_seconds_p95') or 0, reverse=True)
+        return summary
+
+
+def _fmt(value: Optional[float]) -> str:
+    return f"{value:7.2f}" if value is not None else "      -"
+
+
+def print_report(summary: List[Dict[str, Any]], group_by: List[str], failures_only: bool = False):
+    if failures_only:
+        summary = [e for e in summary if e['failures']]
+
+    if not summary:
+        print("No telemetry recorded for the selected window")
+        return
+
+    label_width = max(20, max(len(" / ".join(str(e[c]) for c in group_by)) for e in summary))
+    header = (f"{' / '.join(group_by):<{label_width}}  {'n':>5} {'fail':>5}"
+              f"  {'total p50':>9} {'p95':>7}  {'conn p50':>8} {'p95':>7}"
+              f"  {'auth p50':>8} {'p95':>7}  {'prompt p50':>10} {'p95':>7}  {'cmd p50':>7} {'p95':>7}")
+    print(header)
+    print("-" * len(header))
+
+    for entry in summary:
+        label = " / ".join(str(entry[c]) for c in group_by)
+        print(f"{label:<{label_width}}  {entry['attempts']:>5} {entry['failures']:>5}"
+              f"  {_fmt(entry['total_seconds_p50']):>9} {_fmt(entry['total_seconds_p95'])}"
+              f"  {_fmt(entry['connect_seconds_p50']):>8} {_fmt(entry['connect_seconds_p95'])}"
+              f"  {_fmt(entry['auth_seconds_p50']):>8} {_fmt(entry['auth_seconds_p95'])}"
+              f"  {_fmt(entry['prompt_seconds_p50']):>10} {_fmt(entry['prompt_seconds_p95'])}"
+              f"  {_fmt(entry['command_seconds_p50'])} {_fmt(entry['command_seconds_p95'])}")
+
+        failures = {k: v for k, v in entry['outcomes'].items() if k != 'success'}
+        if failures and failures_only:
+            print(f"{'':<{label_width}}  outcomes: {failures}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collection telemetry report (p50/p95 timing)")
+    parser.add_argument('command', choices=['report'], help='Action to run')
+    parser.add_argument('--db', default=DEFAULT_TELEMETRY_DB,
+                        help=f'Telemetry database (default: {DEFAULT_TELEMETRY_DB})')
+    parser.add_argument('--group-by', default='vendor,capture_type',
+                        help='Comma-separated grouping: vendor, capture_type, device_name, host '
+                             '(default: vendor,capture_type)')
+    parser.add_argument('--since-days', type=int, default=30,
+                        help='Only include attempts from the last N days (default: 30, 0 = all)')
+    parser.add_argument('--failures', action='store_true', help='Only show groups with failures')
+    parser.add_argument('--json', action='store_true', help='Emit the summary as JSON')
+    args = parser.parse_args()
+
+    group_by = [c.strip() for c in args.group_by.split(',') if c.strip()]
+    since = datetime.now() - timedelta(days=args.since_days) if args.since_days > 0 else None
+
+    store = TelemetryStore(args.db)
+    try:
+        summary = store.summarize(group_by, since)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_report(summary, group_by, args.failures)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
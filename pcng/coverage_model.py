@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+Capture Coverage Model
+Which inventory devices have which capture types, shared by the web coverage view and
+gap_report.py.
+
+Coverage used to be worked out by stat()ing capture/<type>/<device>.txt for every device and
+capture type and by json.load()ing every fingerprint file. Here it comes from
+device_captures_current in assets.db, which db_load_capture.py keeps current, combined with a
+cached parse of sessions.yaml and the fingerprint store. A CoverageModel remembers what it has
+read: a refresh after a loader run only fetches the capture rows added since the last one, and
+sessions.yaml / the fingerprints are only re-read when their files change.
+
+A device is covered for a capture type when a capture file named <display_name>.<ext> for
+that type has been loaded into assets.db.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from contextlib import closing
+from pathlib import Path
+from collections import defaultdict
+from typing import Dict, List, Any, Optional
+
+import yaml
+
+try:
+    from pcng.fingerprint_store import FingerprintStore
+except ImportError:
+    from fingerprint_store import FingerprintStore
+
+_sessions_cache = {}
+_sessions_lock = threading.Lock()
+
+
+def _file_signature(*paths) -> tuple:
+    """(mtime_ns, size) per path, None for missing files"""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def load_sessions(yaml_file) -> List[Dict[str, Any]]:
+    """Parsed sessions.yaml, re-read only when the file changes. Do not modify the result."""
+    path = os.path.abspath(yaml_file)
+    signature = _file_signature(path)
+    with _sessions_lock:
+        cached = _sessions_cache.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+    with open(path, 'r') as f:
+        inventory = yaml.safe_load(f) or []
+
+    with _sessions_lock:
+        _sessions_cache[path] = (signature, inventory)
+    return inventory
+
+
+def vendor_from_driver(driver: str) -> str:
+    """Vendor label for a netmiko driver name, '' when unknown"""
+    driver = driver or ''
+    if 'cisco' in driver:
+        return 'Cisco'
+    if 'hp' in driver or 'procurve' in driver:
+        return 'HP/Aruba'
+    if 'arista' in driver:
+        return 'Arista'
+    return ''
+
+
+class CoverageReport:
+    """Coverage at one point in time; the data is shared and must not be modified"""
+
+    def __init__(self, inventory_data, capture_types, device_status):
+        self.inventory_data = inventory_data
+        self.capture_types = capture_types
+        self.device_status = device_status
+        self._summary_stats = None
+        self._vendor_coverage = None
+
+    def devices_by_folder(self) -> Dict[str, list]:
+        """(device_name, device_info) pairs per site folder, sorted by device name"""
+        devices_by_folder = defaultdict(list)
+        for device_name, device_info in self.device_status.items():
+            devices_by_folder[device_info['folder']].append((device_name, device_info))
+        for folder in devices_by_folder:
+            devices_by_folder[folder].sort(key=lambda x: x[0])
+        return dict(devices_by_folder)
+
+    def summary_stats(self) -> Dict[str, Any]:
+        """Per capture type counts plus devices with all / no captures"""
+        if self._summary_stats is not None:
+            return self._summary_stats
+
+        total_devices = len(self.device_status)
+        if total_devices == 0:
+            self._summary_stats = {}
+            return self._summary_stats
+
+        capture_stats = {}
+        for capture_type in self.capture_types:
+            count = sum(1 for d in self.device_status.values() if d['captures'].get(capture_type, False))
+            capture_stats[capture_type] = {
+                'count': count,
+                'total': total_devices,
+                'percentage': (count / total_devices) * 100
+            }
+
+        perfect_devices = [
+            name for name, info in self.device_status.items()
+            if info['total_captures'] == len(self.capture_types) and len(self.capture_types) > 0
+        ]
+        zero_capture_devices = [
+            name for name, info in self.device_status.items()
+            if info['total_captures'] == 0
+        ]
+
+        self._summary_stats = {
+            'total_devices': total_devices,
+            'capture_types_count': len(self.capture_types),
+            'total_successful_captures': sum(d['total_captures'] for d in self.device_status.values()),
+            'perfect_capture_count': len(perfect_devices),
+            'zero_capture_count': len(zero_capture_devices),
+            'capture_stats': capture_stats,
+            'perfect_devices': perfect_devices,
+            'zero_capture_devices': zero_capture_devices
+        }
+        return self._summary_stats
+
+    def vendor_coverage_matrix(self) -> Dict[str, Any]:
+        """Per capture type: success / total device counts by vendor"""
+        if self._vendor_coverage is not None:
+            return self._vendor_coverage
+
+        coverage_data = {
+            'vendors': set(),
+            'by_capture': defaultdict(lambda: {'vendors': {}, 'vendor_count': 0})
+        }
+
+        for device_info in self.device_status.values():
+            vendor = device_info['vendor']
+            if vendor and vendor.strip():
+                coverage_data['vendors'].add(vendor)
+
+        for capture_type in self.capture_types:
+            vendor_stats = defaultdict(lambda: {'success': 0, 'total': 0})
+
+            for device_info in self.device_status.values():
+                vendor = device_info['vendor'] or 'Unknown'
+                vendor_stats[vendor]['total'] += 1
+                if device_info['captures'].get(capture_type, False):
+                    vendor_stats[vendor]['success'] += 1
+
+            coverage_data['by_capture'][capture_type]['vendors'] = dict(vendor_stats)
+            coverage_data['by_capture'][capture_type]['vendor_count'] = len([
+                v for v, stats in vendor_stats.items()
+                if stats['success'] > 0 and stats['total'] > 0
+            ])
+
+        self._vendor_coverage = coverage_data
+        return coverage_data
+
+
+class CoverageModel:
+    """Keeps a CoverageReport up to date with assets.db, sessions.yaml and the fingerprints"""
+
+    def __init__(self, yaml_file, db_path='assets.db', fingerprints_dir='fingerprints',
+                 fingerprint_db='fingerprint_store.db'):
+        self.yaml_file = Path(yaml_file)
+        self.db_path = db_path
+        self.fingerprints_dir = Path(fingerprints_dir)
+        self.fingerprint_db = fingerprint_db
+        self._lock = threading.Lock()
+        self._report = None
+        self._inventory = None
+
+        # device file stem -> loaded capture types, from device_captures_current
+        self._captures = defaultdict(set)
+        self._capture_types = set()
+        self._capture_rows = 0
+        self._capture_max_id = 0
+
+        # Fingerprinted device names and the vendor their netmiko driver implies
+        self._fingerprint_signature = None
+        self._fingerprinted = set()
+        self._fingerprint_drivers = {}
+        self._json_only = set()
+
+    def _refresh_captures(self, conn: sqlite3.Connection, full: bool) -> bool:
+        """Read capture rows added since the last refresh; all rows if any were deleted"""
+        # Both queries see the same snapshot even while a loader is writing
+        conn.execute("BEGIN")
+        try:
+            rows, max_id = conn.execute(
+                "SELECT COUNT(*), COALESCE(MAX(id), 0) FROM device_captures_current").fetchone()
+            if not full and rows == self._capture_rows and max_id == self._capture_max_id:
+                return False
+
+            new_rows = conn.execute("""
+                SELECT id, capture_type, file_path FROM device_captures_current
+                WHERE id > ?
+            """, (0 if full else self._capture_max_id,)).fetchall()
+        finally:
+            conn.rollback()
+
+        # Loader updates keep (device, capture type); only inserts and deletes change
+        # coverage, and a delete leaves fewer rows than the known ones plus the new ones
+        if not full and rows != self._capture_rows + len(new_rows):
+            return self._refresh_captures(conn, full=True)
+
+        if full:
+            self._captures = defaultdict(set)
+            self._capture_types = set()
+        for row in new_rows:
+            self._captures[Path(row[2]).stem].add(row[1])
+            self._capture_types.add(row[1])
+        self._capture_rows = rows
+        self._capture_max_id = max_id
+        return True
+
+    def _refresh_fingerprints(self, full: bool) -> bool:
+        """Re-read fingerprinted devices when the store or the fingerprints directory changes"""
+        store_path = self.fingerprint_db or ''
+        signature = _file_signature(store_path, f"{store_path}-wal", self.fingerprints_dir)
+        if not full and signature == self._fingerprint_signature:
+            return False
+
+        store = FingerprintStore.open_existing(self.fingerprint_db)
+        stored = store.summaries() if store else {}
+
+        # One directory listing instead of an exists() per inventory device
+        json_names = set()
+        if self.fingerprints_dir.is_dir():
+            with os.scandir(self.fingerprints_dir) as entries:
+                json_names = {entry.name[:-5] for entry in entries if entry.name.endswith('.json')}
+
+        self._fingerprint_drivers = {name: summary['netmiko_driver'] or '' for name, summary in stored.items()}
+        self._json_only = json_names - set(stored)
+        self._fingerprinted = set(stored) | json_names
+        self._fingerprint_signature = signature
+        return True
+
+    def _fingerprint_vendor(self, device_name: str) -> str:
+        if device_name not in self._fingerprint_drivers and device_name in self._json_only:
+            # Not in the store yet: read the JSON file once per fingerprint refresh
+            driver = ''
+            try:
+                with open(self.fingerprints_dir / f"{device_name}.json", 'r') as f:
+                    driver = json.load(f).get('additional_info', {}).get('netmiko_driver', '')
+            except Exception:
+                pass
+            self._fingerprint_drivers[device_name] = driver or ''
+        return vendor_from_driver(self._fingerprint_drivers.get(device_name, ''))
+
+    def _build_report(self, inventory) -> CoverageReport:
+        capture_types = sorted(self._capture_types)
+        device_status = {}
+
+        for site in inventory:
+            folder_name = site['folder_name']
+
+            for session in site['sessions']:
+                device_name = session['display_name']
+
+                # Only devices with a fingerprint are network devices
+                if device_name not in self._fingerprinted:
+                    continue
+
+                device_info = {
+                    'folder': folder_name,
+                    'host': session.get('host', ''),
+                    'vendor': session.get('Vendor', ''),
+                    'model': session.get('Model', ''),
+                    'fingerprint': True,
+                    'captures': {},
+                    'total_captures': 0,
+                    'missing_captures': 0
+                }
+                if not device_info['vendor']:
+                    device_info['vendor'] = self._fingerprint_vendor(device_name)
+
+                captured = self._captures.get(device_name, ())
+                for capture_type in capture_types:
+                    has_capture = capture_type in captured
+                    device_info['captures'][capture_type] = has_capture
+                    if has_capture:
+                        device_info['total_captures'] += 1
+                    else:
+                        device_info['missing_captures'] += 1
+
+                device_status[device_name] = device_info
+
+        return CoverageReport(inventory, capture_types, device_status)
+
+    def refresh(self, full: bool = False, conn: Optional[sqlite3.Connection] = None) -> CoverageReport:
+        """
+        Current coverage, rebuilt only if something it depends on changed.
+
+        Args:
+            full: Re-read everything instead of only what changed
+            conn: Connection to db_path to use; a read-only one is opened if omitted
+        """
+        with self._lock:
+            inventory = load_sessions(self.yaml_file)
+            if conn is None:
+                with closing(sqlite3.connect(f"{Path(self.db_path).resolve().as_uri()}?mode=ro",
+                                             uri=True, timeout=30)) as own_conn:
+                    changed = self._refresh_captures(own_conn, full)
+            else:
+                changed = self._refresh_captures(conn, full)
+            changed = self._refresh_fingerprints(full) or changed
+            if changed or full or self._report is None or inventory is not self._inventory:
+                self._report = self._build_report(inventory)
+                self._inventory = inventory
+            return self._report
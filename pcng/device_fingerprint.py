@@ -4,10 +4,12 @@ import sys
 import time
 import json
 import traceback
+from datetime import datetime
 from enum import Enum, auto
 
 from device_info import DeviceInfo, DeviceType
 from ssh_client import SSHClient, SSHClientOptions
+from vendor_classifier import detect_textfsm_vendors, identify_device_type
 
 # Import TextFSM engine if available
 try:
@@ -18,6 +20,28 @@ except ImportError:
     TEXTFSM_AVAILABLE = False
 
 
+# Compiled once for the _could_be_* field heuristics
+HOSTNAME_RE = re.compile(r'^[a-zA-Z0-9][a-zA-Z0-9\-\.]{1,63}$')
+IPV4_RE = re.compile(r'^\d+\.\d+\.\d+\.\d+$')
+MAC_RE = re.compile(r'^[a-fA-F0-9]{2}:[a-fA-F0-9]{2}:[a-fA-F0-9]{2}:[a-fA-F0-9]{2}:[a-fA-F0-9]{2}:[a-fA-F0-9]{2}$')
+SERIAL_LIKE_RE = re.compile(r'^[A-Z0-9]{10,}$')
+VERSION_SEARCH_RES = [
+    re.compile(r'\d+\.\d+'),  # 17.9
+    re.compile(r'\d+\.\d+\.\d+'),  # 17.9.6
+    re.compile(r'\d+\.\d+\.\d+[a-zA-Z]'),  # 17.9.6a
+    re.compile(r'[vV]\d+'),  # v17
+]
+SERIAL_RES = [
+    re.compile(r'^[A-Z0-9]{8,}$'),
+    re.compile(r'^[A-Z]{2,3}[0-9]{6,}[A-Z0-9]*$'),
+]
+MODEL_RES = [
+    re.compile(r'^[A-Z]+\d+[A-Z]*$'),  # C9407R, ASR1000
+    re.compile(r'^\d+[A-Z]+$'),  # 3850X
+    re.compile(r'^[A-Z]+-\d+'),  # ASR-1000
+]
+
+
 class NetmikoDriverMap:
     """Maps device types to Netmiko driver names"""
 
@@ -68,7 +92,8 @@ class DeviceFingerprint:
     """Enhanced device fingerprinting with TextFSM integration - backwards compatible"""
 
     def __init__(self, host, port, username, password, output_callback=None,
-                 debug=False, verbose=False, connection_timeout=5000, textfsm_db_path=None):
+                 debug=False, verbose=False, connection_timeout=5000, textfsm_db_path=None,
+                 ssh_client=None, textfsm_engine=None, offline=False):
         self._device_info = DeviceInfo(
             host=host,
             port=port,
@@ -83,10 +108,10 @@ class DeviceFingerprint:
         self._connection_timeout = connection_timeout
 
         # TextFSM integration - new feature
-        self._textfsm_engine = None
+        self._textfsm_engine = textfsm_engine  # Replay workers pass one engine per process
         self._textfsm_db_path = textfsm_db_path
 
-        if TEXTFSM_AVAILABLE and textfsm_db_path and os.path.exists(textfsm_db_path):
+        if not self._textfsm_engine and TEXTFSM_AVAILABLE and textfsm_db_path and os.path.exists(textfsm_db_path):
             try:
                 self._textfsm_engine = TextFSMAutoEngine(textfsm_db_path, verbose=debug)
                 if debug:
@@ -125,7 +150,20 @@ class DeviceFingerprint:
         else:
             ssh_options.output_callback = buffer_callback
 
-        self._ssh_client = SSHClient(ssh_options)
+        # Shared session mode: run on the caller's client and leave it connected
+        # afterwards, so command execution can reuse the same transport and shell.
+        # Our options are swapped in for the duration of fingerprint().
+        self._shared_client = ssh_client is not None
+        self._fingerprint_options = ssh_options
+        self._caller_options = None
+
+        if offline:
+            # Replaying stored command outputs - no session, no credentials needed
+            self._ssh_client = None
+        elif self._shared_client:
+            self._ssh_client = ssh_client
+        else:
+            self._ssh_client = SSHClient(ssh_options)
 
     def _ensure_textfsm_engine(self):
         """
@@ -490,15 +528,25 @@ class DeviceFingerprint:
         engine_created = self._ensure_textfsm_engine()
         print(f"Engine creation result: {engine_created}")
 
+        if self._shared_client:
+            self._caller_options = self._ssh_client._options
+            self._ssh_client._options = self._fingerprint_options
+
         try:
-            # Connect to the device
-            if self._debug:
-                print("Connecting to {}:{}...".format(self._device_info.host, self._device_info.port))
-            self._ssh_client.connect()
+            # Connect to the device (a shared client may already be connected)
+            if self._shared_client and self._ssh_client.is_connected():
+                if self._debug:
+                    print("Reusing shared connection to {}:{}".format(self._device_info.host, self._device_info.port))
+            else:
+                if self._debug:
+                    print("Connecting to {}:{}...".format(self._device_info.host, self._device_info.port))
+                self._ssh_client.connect()
             self._is_connected = True
 
             # Detect prompt
+            prompt_start = time.time()
             self._device_info.detected_prompt = self.detect_prompt()
+            self._ssh_client.timings['prompt_seconds'] = time.time() - prompt_start
             if self._debug:
                 print("Detected prompt: {}".format(self._device_info.detected_prompt))
 
@@ -575,91 +623,8 @@ class DeviceFingerprint:
                                 print(f"Queued additional command: {additional_cmd}")
 
                 # Process TextFSM with priority logic
-                if self._textfsm_engine and output:
-                    should_process_textfsm = False
-
-                    # Priority 1: Always process 'show system info' if available
-                    if cmd.lower() == "show system info":
-                        should_process_textfsm = True
-                        if self._debug:
-                            print(f"Processing TextFSM for '{cmd}' (priority command)")
-
-                    # Priority 2: Only process 'show version' if 'show system info' is NOT queued
-                    elif cmd.lower() == "show version":
-                        has_show_system_info = any(
-                            cmd_name.lower() == "show system info"
-                            for cmd_name in all_commands_to_run
-                        )
-                        if not has_show_system_info:
-                            should_process_textfsm = True
-                            if self._debug:
-                                print(f"Processing TextFSM for '{cmd}' (no show system info available)")
-                        else:
-                            if self._debug:
-                                print(f"Skipping TextFSM for '{cmd}' (show system info will be processed instead)")
+                self._process_textfsm_for_command(cmd, output, all_commands_to_run)
 
-                    # Process other commands normally
-                    elif cmd.lower() in ["show inventory", "show module", "show chassis"]:
-                        should_process_textfsm = True
-                        if self._debug:
-                            print(f"Processing TextFSM for '{cmd}' (standard command)")
-
-                    if should_process_textfsm:
-                        print("Processing TextFSM")
-                        textfsm_results = self._parse_with_textfsm(output, cmd)
-                        if textfsm_results:
-                            # Store TextFSM results
-                            self._device_info.command_outputs[f"{cmd}_textfsm"] = textfsm_results
-
-                            # SET DEVICE TYPE BASED ON TEXTFSM TEMPLATE - NEW CODE BLOCK
-                            if textfsm_results.get('template_name', '').startswith('hp_procurve'):
-                                self._device_info.device_type = DeviceType.HPProCurve
-                                if self._debug:
-                                    print(
-                                        f"Set device type to HPProCurve based on TextFSM template: {textfsm_results.get('template_name')}")
-                            elif textfsm_results.get('template_name', '').startswith('cisco_ios'):
-                                self._device_info.device_type = DeviceType.CiscoIOS
-                                if self._debug:
-                                    print(
-                                        f"Set device type to CiscoIOS based on TextFSM template: {textfsm_results.get('template_name')}")
-                            elif textfsm_results.get('template_name', '').startswith('cisco_nxos'):
-                                self._device_info.device_type = DeviceType.CiscoNXOS
-                                if self._debug:
-                                    print(
-                                        f"Set device type to CiscoNXOS based on TextFSM template: {textfsm_results.get('template_name')}")
-                            elif textfsm_results.get('template_name', '').startswith('arista'):
-                                self._device_info.device_type = DeviceType.AristaEOS
-                                if self._debug:
-                                    print(
-                                        f"Set device type to AristaEOS based on TextFSM template: {textfsm_results.get('template_name')}")
-                            elif textfsm_results.get('template_name', '').startswith('juniper'):
-                                self._device_info.device_type = DeviceType.JuniperJunOS
-                                if self._debug:
-                                    print(
-                                        f"Set device type to JuniperJunOS based on TextFSM template: {textfsm_results.get('template_name')}")
-                            # END NEW CODE BLOCK
-
-                            # Extract information - THIS WAS MISSING!
-                            pre_textfsm_state = {
-                                'hostname': self._device_info.hostname,
-                                'version': self._device_info.version,
-                                'model': self._device_info.model,
-                                'serial_number': self._device_info.serial_number
-                            }
-
-
-                            extraction_success = self._extract_from_textfsm(textfsm_results)
-
-                            if self._debug:
-                                post_textfsm_state = {
-                                    'hostname': self._device_info.hostname,
-                                    'version': self._device_info.version,
-                                    'model': self._device_info.model,
-                                    'serial_number': self._device_info.serial_number
-                                }
-                                print(f"TextFSM extraction result: {extraction_success}")
-                                print(f"Before: {pre_textfsm_state}")
-                                print(f"After:  {post_textfsm_state}")
                 # Try to identify device type from command output if still unknown
                 if self._device_info.device_type == DeviceType.Unknown:
                     detected_type = self.identify_vendor_from_output(output)
@@ -691,38 +656,7 @@ class DeviceFingerprint:
 
                 i += 1
             # Continue with TextFSM fallback logic and cleanup
-            textfsm_attempted = any(key.endswith('_textfsm') for key in self._device_info.command_outputs.keys())
-
-            if not textfsm_attempted:
-                print("TextFSM not available or no templates found - using regex extraction fallback")
-                self.extract_device_details()
-            else:
-                missing_fields = []
-                textfsm_extracted_something = any([
-                    self._device_info.version,
-                    self._device_info.model,
-                    self._device_info.serial_number
-                ])
-
-                if not textfsm_extracted_something:
-                    print("TextFSM didn't extract any key fields - running regex fallback...")
-                    self.extract_device_details()
-                    missing_fields.append("Data")
-                else:
-                    if self._debug:
-                        extracted_fields = []
-                        if self._device_info.version:
-                            extracted_fields.append(f"version='{self._device_info.version}'")
-                        if self._device_info.model:
-                            extracted_fields.append(f"model='{self._device_info.model}'")
-                        if self._device_info.serial_number:
-                            extracted_fields.append(f"serial='{self._device_info.serial_number}'")
-                        print(f"TextFSM successfully extracted: {', '.join(extracted_fields)}")
-
-                if missing_fields:
-                    print(f"TextFSM succeeded but missing fields: {', '.join(missing_fields)}")
-                    print("Running regex fallback for missing fields...")
-                    self.extract_device_details()
+            self._finalize_extraction()
 
             # Add enhanced metadata
             self._add_enhanced_metadata()
@@ -738,9 +672,182 @@ class DeviceFingerprint:
             self._device_info.detected_prompt = None
             return self._device_info
         finally:
-            if self._is_connected:
+            if self._shared_client:
+                # Hand the live session back to the caller with its own options
+                self._ssh_client._options = self._caller_options
+                if self._device_info.detected_prompt:
+                    self._ssh_client.set_expect_prompt(self._device_info.detected_prompt)
+            elif self._is_connected:
                 self._ssh_client.disconnect()
-                self._is_connected = False
+            self._is_connected = False
+
+    def replay_stored_outputs(self, stored):
+        """
+        Re-derive a fingerprint from a saved fingerprint dict without touching the network.
+
+        The raw identification outputs in stored['command_outputs'] are fed through the same
+        TextFSM / field-analysis / regex pipeline as fingerprint(), in the order they were
+        captured. Connection facts (host, port, prompt, paging command, fingerprint_time)
+        are kept; everything derived from the outputs is recomputed.
+        """
+        original = DeviceInfo.from_dict(stored)
+
+        self._device_info = DeviceInfo(host=original.host, port=original.port, username=original.username)
+        self._device_info.detected_prompt = original.detected_prompt
+        self._device_info.disable_paging_command = original.disable_paging_command
+        self._device_info.fingerprint_time = original.fingerprint_time
+
+        raw_outputs = [(cmd, output) for cmd, output in original.command_outputs.items()
+                       if not cmd.endswith('_textfsm') and isinstance(output, str)]
+        self._output_buffer = [original.detected_prompt or ''] + [output for _, output in raw_outputs]
+
+        if original.detected_prompt:
+            self._device_info.device_type = self.identify_vendor_from_output(original.detected_prompt)
+
+        # Keep every stored output even if extraction completes early
+        all_commands = [cmd for cmd, _ in raw_outputs]
+        self._device_info.command_outputs.update(raw_outputs)
+
+        for cmd, output in raw_outputs:
+            self._process_textfsm_for_command(cmd, output, all_commands)
+
+            if self._device_info.device_type == DeviceType.Unknown:
+                self._device_info.device_type = self.identify_vendor_from_output(output)
+
+            if self.is_fingerprint_complete():
+                break
+
+        self._finalize_extraction()
+
+        if not self._device_info.disable_paging_command:
+            self._device_info.disable_paging_command = self._device_info.device_type.get_disable_paging_command()
+
+        self._add_enhanced_metadata()
+        self._device_info.additional_info['replayed_time'] = datetime.now().isoformat()
+        return self._device_info
+
+    def _process_textfsm_for_command(self, cmd, output, all_commands_to_run):
+        """TextFSM parse + extraction for one identification command output (live or replayed)"""
+        if self._textfsm_engine and output:
+            should_process_textfsm = False
+
+            # Priority 1: Always process 'show system info' if available
+            if cmd.lower() == "show system info":
+                should_process_textfsm = True
+                if self._debug:
+                    print(f"Processing TextFSM for '{cmd}' (priority command)")
+
+            # Priority 2: Only process 'show version' if 'show system info' is NOT queued
+            elif cmd.lower() == "show version":
+                has_show_system_info = any(
+                    cmd_name.lower() == "show system info"
+                    for cmd_name in all_commands_to_run
+                )
+                if not has_show_system_info:
+                    should_process_textfsm = True
+                    if self._debug:
+                        print(f"Processing TextFSM for '{cmd}' (no show system info available)")
+                else:
+                    if self._debug:
+                        print(f"Skipping TextFSM for '{cmd}' (show system info will be processed instead)")
+
+            # Process other commands normally
+            elif cmd.lower() in ["show inventory", "show module", "show chassis"]:
+                should_process_textfsm = True
+                if self._debug:
+                    print(f"Processing TextFSM for '{cmd}' (standard command)")
+
+            if should_process_textfsm:
+                print("Processing TextFSM")
+                textfsm_results = self._parse_with_textfsm(output, cmd)
+                if textfsm_results:
+                    # Store TextFSM results
+                    self._device_info.command_outputs[f"{cmd}_textfsm"] = textfsm_results
+
+                    # SET DEVICE TYPE BASED ON TEXTFSM TEMPLATE - NEW CODE BLOCK
+                    if textfsm_results.get('template_name', '').startswith('hp_procurve'):
+                        self._device_info.device_type = DeviceType.HPProCurve
+                        if self._debug:
+                            print(
+                                f"Set device type to HPProCurve based on TextFSM template: {textfsm_results.get('template_name')}")
+                    elif textfsm_results.get('template_name', '').startswith('cisco_ios'):
+                        self._device_info.device_type = DeviceType.CiscoIOS
+                        if self._debug:
+                            print(
+                                f"Set device type to CiscoIOS based on TextFSM template: {textfsm_results.get('template_name')}")
+                    elif textfsm_results.get('template_name', '').startswith('cisco_nxos'):
+                        self._device_info.device_type = DeviceType.CiscoNXOS
+                        if self._debug:
+                            print(
+                                f"Set device type to CiscoNXOS based on TextFSM template: {textfsm_results.get('template_name')}")
+                    elif textfsm_results.get('template_name', '').startswith('arista'):
+                        self._device_info.device_type = DeviceType.AristaEOS
+                        if self._debug:
+                            print(
+                                f"Set device type to AristaEOS based on TextFSM template: {textfsm_results.get('template_name')}")
+                    elif textfsm_results.get('template_name', '').startswith('juniper'):
+                        self._device_info.device_type = DeviceType.JuniperJunOS
+                        if self._debug:
+                            print(
+                                f"Set device type to JuniperJunOS based on TextFSM template: {textfsm_results.get('template_name')}")
+                    # END NEW CODE BLOCK
+
+                    # Extract information - THIS WAS MISSING!
+                    pre_textfsm_state = {
+                        'hostname': self._device_info.hostname,
+                        'version': self._device_info.version,
+                        'model': self._device_info.model,
+                        'serial_number': self._device_info.serial_number
+                    }
+
+
+                    extraction_success = self._extract_from_textfsm(textfsm_results)
+
+                    if self._debug:
+                        post_textfsm_state = {
+                            'hostname': self._device_info.hostname,
+                            'version': self._device_info.version,
+                            'model': self._device_info.model,
+                            'serial_number': self._device_info.serial_number
+                        }
+                        print(f"TextFSM extraction result: {extraction_success}")
+                        print(f"Before: {pre_textfsm_state}")
+                        print(f"After:  {post_textfsm_state}")
+
+    def _finalize_extraction(self):
+        """Regex fallback when TextFSM was unavailable or extracted nothing useful"""
+        textfsm_attempted = any(key.endswith('_textfsm') for key in self._device_info.command_outputs.keys())
+
+        if not textfsm_attempted:
+            print("TextFSM not available or no templates found - using regex extraction fallback")
+            self.extract_device_details()
+        else:
+            missing_fields = []
+            textfsm_extracted_something = any([
+                self._device_info.version,
+                self._device_info.model,
+                self._device_info.serial_number
+            ])
+
+            if not textfsm_extracted_something:
+                print("TextFSM didn't extract any key fields - running regex fallback...")
+                self.extract_device_details()
+                missing_fields.append("Data")
+            else:
+                if self._debug:
+                    extracted_fields = []
+                    if self._device_info.version:
+                        extracted_fields.append(f"version='{self._device_info.version}'")
+                    if self._device_info.model:
+                        extracted_fields.append(f"model='{self._device_info.model}'")
+                    if self._device_info.serial_number:
+                        extracted_fields.append(f"serial='{self._device_info.serial_number}'")
+                    print(f"TextFSM successfully extracted: {', '.join(extracted_fields)}")
+
+            if missing_fields:
+                print(f"TextFSM succeeded but missing fields: {', '.join(missing_fields)}")
+                print("Running regex fallback for missing fields...")
+                self.extract_device_details()
 
     def is_fingerprint_complete(self):
         # Remove this line: return True
@@ -759,62 +866,8 @@ class DeviceFingerprint:
     def _create_textfsm_filter(self, output, command):
         """Build intelligent filter based on output analysis and command"""
 
-        # Vendor detection patterns from actual output
-        vendor_patterns = {
-            'cisco_ios': [
-                'cisco ios', 'cisco internetwork operating system', 'ios software',
-                'catalyst', 'c9300', 'c9200', 'c3850', 'c2960', 'ws-c'
-            ],
-            'cisco_nxos': [
-                'nx-os', 'nexus', 'cisco nexus', 'nxos'
-            ],
-            'cisco_asa': [
-                'adaptive security appliance', 'cisco asa', 'asa version'
-            ],
-            'cisco_xr': [
-                'ios xr', 'cisco xr', 'asr9k', 'crs-'
-            ],
-            'arista_eos': [
-                'arista', 'eos version', 'dcs-', 'arista dcs'
-            ],
-            'juniper_junos': [
-                'juniper', 'junos', 'ex4200', 'mx', 'srx', 'qfx'
-            ],
-            'hp_procurve': [
-                'hp ', 'hewlett-packard', 'procurve', 'aruba', 'hpe','Status and Counters - General System Information'
-            ],
-            'fortinet': [
-                'fortinet', 'fortigate', 'fortios'
-            ],
-            'paloalto_panos': [
-                'palo alto', 'pan-os', 'pa-'
-            ],
-            'dell_force10': [
-                'dell', 'force10', 's4810', 's6000'
-            ],
-            'brocade_fastiron': [
-                'brocade', 'fastiron', 'icx'
-            ],
-            'checkpoint_gaia': [
-                'checkpoint', 'gaia', 'secureplatform'
-            ],
-            'ubiquiti_edgerouter': [
-                'ubiquiti', 'edgerouter', 'unifi'
-            ],
-            'ubiquiti_edgeswitch': [
-                'edgeswitch', 'ubnt'
-            ]
-        }
-
-        # Analyze output to detect vendor
-        output_lower = output.lower()
-        detected_vendors = []
-
-        for vendor, patterns in vendor_patterns.items():
-            for pattern in patterns:
-                if pattern in output_lower:
-                    detected_vendors.append(vendor)
-                    break
+        # Vendors whose keywords appear in the output (one scan, shared with identify_vendor_from_output)
+        detected_vendors = detect_textfsm_vendors(output)
 
         # Command analysis
         cmd_lower = command.lower().replace(" ", "_")
@@ -1293,14 +1346,11 @@ class DeviceFingerprint:
             return True
 
         # Hostname-like patterns (letters, numbers, dashes)
-        import re
-        if re.match(r'^[a-zA-Z0-9][a-zA-Z0-9\-\.]{1,63}$', value):
+        if HOSTNAME_RE.match(value):
             # Not an IP, not a MAC, not a serial
-            if not re.match(r'^\d+\.\d+\.\d+\.\d+$', value):  # Not IP
-                if not re.match(
-                        r'^[a-fA-F0-9]{2}:[a-fA-F0-9]{2}:[a-fA-F0-9]{2}:[a-fA-F0-9]{2}:[a-fA-F0-9]{2}:[a-fA-F0-9]{2}$',
-                        value):  # Not MAC
-                    if not re.match(r'^[A-Z0-9]{10,}$', value):  # Not likely a serial
+            if not IPV4_RE.match(value):  # Not IP
+                if not MAC_RE.match(value):  # Not MAC
+                    if not SERIAL_LIKE_RE.match(value):  # Not likely a serial
                         return True
 
         return False
@@ -1312,16 +1362,8 @@ class DeviceFingerprint:
             return False
 
         # Version patterns
-        import re
-        version_patterns = [
-            r'\d+\.\d+',  # 17.9
-            r'\d+\.\d+\.\d+',  # 17.9.6
-            r'\d+\.\d+\.\d+[a-zA-Z]',  # 17.9.6a
-            r'[vV]\d+',  # v17
-        ]
-
-        for pattern in version_patterns:
-            if re.search(pattern, value):
+        for pattern in VERSION_SEARCH_RES:
+            if pattern.search(value):
                 return True
 
         return False
@@ -1332,14 +1374,10 @@ class DeviceFingerprint:
         if not value or len(value) < 6:
             return False
 
-        # Serial patterns - typically alphanumeric, 8+ chars
-        import re
-        if re.match(r'^[A-Z0-9]{8,}$', value):
-            return True
-
-        # More flexible serial patterns
-        if re.match(r'^[A-Z]{2,3}[0-9]{6,}[A-Z0-9]*$', value):
-            return True
+        # Serial patterns - typically alphanumeric 8+ chars, or letter prefix + digits
+        for pattern in SERIAL_RES:
+            if pattern.match(value):
+                return True
 
         return False
 
@@ -1350,15 +1388,8 @@ class DeviceFingerprint:
             return False
 
         # Model patterns
-        import re
-        model_patterns = [
-            r'^[A-Z]+\d+[A-Z]*$',  # C9407R, ASR1000
-            r'^\d+[A-Z]+$',  # 3850X
-            r'^[A-Z]+-\d+',  # ASR-1000
-        ]
-
-        for pattern in model_patterns:
-            if re.match(pattern, value):
+        for pattern in MODEL_RES:
+            if pattern.match(value):
                 return True
 
         # Special cases
@@ -1819,42 +1850,11 @@ class DeviceFingerprint:
 
     def identify_vendor_from_output(self, output):
         """Enhanced vendor detection with more specific patterns matching TextFSM database"""
-        output_lower = output.lower()
-
-        # More specific detection rules based on actual TextFSM template names
-        # Order matters - most specific first
-        detection_rules = [
-            # Cisco variants (most specific first)
-            (DeviceType.CiscoASA, ['adaptive security appliance', 'cisco asa']),
-            (DeviceType.CiscoNXOS, ['nx-os', 'nexus operating system', 'cisco nexus']),
-            (DeviceType.CiscoIOS, ['cisco ios', 'cisco internetwork operating system', 'catalyst l3 switch', 'ios-xe']),
-
-            # Other vendors
-            (DeviceType.AristaEOS, ['arista', 'arista networks', 'dcs-', 'eos version']),
-            (DeviceType.JuniperJunOS, ['juniper networks', 'junos', 'juniper']),
-            (DeviceType.HPProCurve, ['hp ', 'hewlett-packard', 'procurve', 'aruba']),
-            (DeviceType.FortiOS, ['fortinet', 'fortigate', 'fortios']),
-            (DeviceType.PaloAltoOS, ['palo alto networks', 'pan-os']),
-            (DeviceType.Linux, ['linux', 'ubuntu', 'centos', 'debian', 'redhat', 'fedora']),
-            (DeviceType.FreeBSD, ['freebsd']),
-            (DeviceType.Windows, ['windows', 'microsoft'])
-        ]
-
-        for device_type, patterns in detection_rules:
-            if any(pattern in output_lower for pattern in patterns):
-                if self._debug:
-                    matching_pattern = next(pattern for pattern in patterns if pattern in output_lower)
-                    print(f"Vendor detection: {device_type.name} (matched: '{matching_pattern}')")
-                return device_type
-
-        # Fallback pattern matching for model numbers
-        if re.search(r'\bws-c\d{4}\b', output_lower) or re.search(r'\bc\d{4}\b', output_lower):
-            return DeviceType.CiscoIOS
-
-        if re.search(r'\bn\d{4}\b', output_lower) or "nexus" in output_lower:
-            return DeviceType.CiscoNXOS
-
-        return DeviceType.Unknown
+        # Rules live in vendor_classifier.DEVICE_TYPE_PATTERNS - order matters, most specific first
+        device_type, confidence = identify_device_type(output)
+        if self._debug and device_type != DeviceType.Unknown:
+            print(f"Vendor detection: {device_type.name} (confidence: {confidence:.2f})")
+        return device_type
 
     def extract_device_details(self):
 
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Offline Fingerprint Replay
+Re-derives fingerprint JSON files from the raw command outputs they already store, using the
+same TextFSM / field-analysis / regex pipeline as a live fingerprint - no SSH, no credentials.
+
+Run it after updating tfsm_templates.db or the extraction heuristics in device_fingerprint.py
+instead of re-fingerprinting the fleet.
+
+Usage:
+  python fingerprint_replay.py fingerprints
+  python fingerprint_replay.py fingerprints --dry-run
+  python fingerprint_replay.py fingerprints --output-dir fingerprints_replayed --workers 8
+  python fingerprint_replay.py fingerprints --textfsm-db ../tfsm_templates.db
+
+Without the TextFSM database, extraction falls back to regex only, which loses fields TextFSM
+would parse. In-place rewrites are then refused unless --allow-regex-only is given; --dry-run
+and --output-dir still work.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+import concurrent.futures
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from device_fingerprint import DeviceFingerprint, TEXTFSM_AVAILABLE
+
+# Fields compared between the stored and replayed fingerprint
+COMPARED_FIELDS = ['device_type', 'hostname', 'model', 'version', 'serial_number', 'disable_paging_command']
+
+# One TextFSM engine per worker process (template DB load is the expensive part)
+_worker_engine = None
+
+
+def _init_worker(textfsm_db_path: Optional[str]):
+    global _worker_engine
+    _worker_engine = None
+    if TEXTFSM_AVAILABLE and textfsm_db_path and os.path.exists(textfsm_db_path):
+        from tfsm_fire import TextFSMAutoEngine
+        _worker_engine = TextFSMAutoEngine(textfsm_db_path, verbose=False)
+
+
+def replay_fingerprint_file(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Replay one fingerprint file; module level so it can run in a worker process"""
+    source = Path(job['source'])
+    target = Path(job['target'])
+    result = {'file': source.name, 'success': False, 'changes': {}}
+
+    try:
+        with open(source, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+    except (OSError, ValueError) as e:
+        result['message'] = f'Unreadable: {e}'
+        return result
+
+    if not any(not k.endswith('_textfsm') for k in stored.get('command_outputs', {})):
+        result['message'] = 'No stored command outputs'
+        return result
+
+    fingerprinter = DeviceFingerprint(
+        host=stored.get('host', ''),
+        port=stored.get('port', 22),
+        username='',
+        password=None,
+        debug=job.get('debug', False),
+        textfsm_engine=_worker_engine,
+        offline=True
+    )
+
+    # The extraction pipeline prints progress; keep worker output to the summary line
+    with open(os.devnull, 'w') as devnull:
+        stdout = sys.stdout
+        if not job.get('debug'):
+            sys.stdout = devnull
+        try:
+            device_info = fingerprinter.replay_stored_outputs(stored)
+        except Exception as e:
+            result['message'] = f'Replay error: {e}'
+            return result
+        finally:
+            sys.stdout = stdout
+
+    replayed = device_info.to_dict()
+    for field in COMPARED_FIELDS:
+        if stored.get(field) != replayed.get(field):
+            result['changes'][field] = [stored.get(field), replayed.get(field)]
+
+    if not job.get('dry_run'):
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = target.with_suffix('.json.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(replayed, f, indent=2)
+        os.replace(tmp_file, target)
+
+    result['success'] = True
+    result['message'] = 'changed' if result['changes'] else 'unchanged'
+    return result
+
+
+def find_fingerprint_files(fingerprint_dir: str, pattern: str) -> List[Path]:
+    return sorted(p for p in Path(fingerprint_dir).glob(pattern) if p.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-derive fingerprints offline from stored command outputs")
+    parser.add_argument('fingerprint_dir', help='Directory of fingerprint JSON files')
+    parser.add_argument('--pattern', default='*.json', help='File glob inside the directory (default: *.json)')
+    parser.add_argument('--output-dir', help='Write replayed fingerprints here instead of in place')
+    parser.add_argument('--textfsm-db', default='tfsm_templates.db',
+                        help='TextFSM template database (default: tfsm_templates.db)')
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count(),
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing')
+    parser.add_argument('--allow-regex-only', action='store_true',
+                        help='Rewrite fingerprints in place even without the TextFSM database')
+    parser.add_argument('--debug', action='store_true', help='Show extraction output (forces one worker)')
+    args = parser.parse_args()
+
+    files = find_fingerprint_files(args.fingerprint_dir, args.pattern)
+    if not files:
+        print(f"No fingerprint files matching {args.pattern} in {args.fingerprint_dir}")
+        return 1
+
+    output_dir = Path(args.output_dir) if args.output_dir else None
+    in_place = not args.dry_run and (
+        output_dir is None or output_dir.resolve() == Path(args.fingerprint_dir).resolve())
+
+    if not (TEXTFSM_AVAILABLE and os.path.exists(args.textfsm_db)):
+        if in_place and not args.allow_regex_only:
+            print(f"Error: TextFSM database {args.textfsm_db} not available. Regex-only extraction "
+                  f"would overwrite fingerprints with less complete data.")
+            print("  Pass --textfsm-db, or use --dry-run / --output-dir / --allow-regex-only")
+            return 1
+        print(f"Warning: TextFSM database {args.textfsm_db} not available - regex extraction only")
+    jobs = [{
+        'source': str(path),
+        'target': str(output_dir / path.name if output_dir else path),
+        'dry_run': args.dry_run,
+        'debug': args.debug
+    } for path in files]
+
+    workers = 1 if args.debug else max(1, min(args.workers, len(jobs)))
+    print(f"Replaying {len(jobs)} fingerprints with {workers} workers"
+          f"{' (dry run)' if args.dry_run else ''}")
+
+    start_time = time.time()
+    results = []
+    if workers == 1:
+        _init_worker(args.textfsm_db)
+        results = [replay_fingerprint_file(job) for job in jobs]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                                    initargs=(args.textfsm_db,)) as executor:
+            results = list(executor.map(replay_fingerprint_file, jobs, chunksize=8))
+    elapsed = time.time() - start_time
+
+    changed = [r for r in results if r['success'] and r['changes']]
+    failed = [r for r in results if not r['success']]
+
+    for result in changed:
+        print(f"  ~ {result['file']}")
+        for field, (before, after) in result['changes'].items():
+            print(f"      {field}: {before!r} -> {after!r}")
+    for result in failed:
+        print(f"  ! {result['file']}: {result['message']}")
+
+    print(f"\n{'=' * 60}")
+    print(f"Replayed: {len(results) - len(failed)}  Changed: {len(changed)}  Failed: {len(failed)}")
+    print(f"Time: {elapsed:.2f}s ({len(results) / elapsed:.0f} files/s)" if elapsed > 0 else "Time: 0s")
+    return 0 if not failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Fingerprint Store
+SQLite home for device fingerprints (fingerprint_store.db). The fields everything filters on -
+hostname, vendor, netmiko driver, model, version, serials, prompt, time - are typed columns;
+the complete fingerprint document (command outputs, TextFSM records, additional_info) is kept
+as a zlib-compressed JSON blob and only inflated when a caller asks for it.
+
+spn.py and the batch runners write here (--fingerprint-db) alongside the per-device JSON
+files, which remain as an export for older tools. Readers query the store and fall back to
+the JSON files for devices it does not know yet.
+
+Usage:
+  python fingerprint_store.py import fingerprints
+  python fingerprint_store.py list --vendor cisco
+  python fingerprint_store.py show cal-cr-core-01
+  python fingerprint_store.py export fingerprints_export
+"""
+
+import sys
+import json
+import zlib
+import sqlite3
+import argparse
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Iterable
+
+DEFAULT_FINGERPRINT_DB = "fingerprint_store.db"
+
+# Bump when the fingerprints table changes and add the upgrade step to MIGRATIONS
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    device_name TEXT PRIMARY KEY,
+    host TEXT,
+    port INTEGER,
+    hostname TEXT,
+    normalized_hostname TEXT,
+    vendor TEXT,
+    netmiko_driver TEXT,
+    device_type INTEGER,
+    model TEXT,
+    version TEXT,
+    serial_number TEXT,
+    serials TEXT,
+    detected_prompt TEXT,
+    disable_paging_command TEXT,
+    success INTEGER NOT NULL DEFAULT 0,
+    fingerprint_time TEXT,
+    stored_at TEXT NOT NULL,
+    document BLOB NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_fingerprints_hostname ON fingerprints(normalized_hostname);
+CREATE INDEX IF NOT EXISTS idx_fingerprints_vendor ON fingerprints(vendor, model);
+CREATE INDEX IF NOT EXISTS idx_fingerprints_time ON fingerprints(fingerprint_time);
+"""
+
+# version -> SQL that upgrades a database from version - 1
+MIGRATIONS: Dict[int, str] = {}
+
+# Typed columns returned by summaries() - everything except the document blob
+SUMMARY_COLUMNS = [
+    'device_name', 'host', 'port', 'hostname', 'normalized_hostname', 'vendor', 'netmiko_driver',
+    'device_type', 'model', 'version', 'serial_number', 'serials', 'detected_prompt',
+    'disable_paging_command', 'success', 'fingerprint_time', 'stored_at'
+]
+
+
+def normalize_hostname(hostname: str) -> str:
+    return (hostname or '').lower().strip()
+
+
+def fingerprint_serials(fingerprint: Dict[str, Any]) -> List[str]:
+    """serial_number (comma separated for stacks) plus any SERIAL values in TextFSM records"""
+    serials = [s.strip() for s in (fingerprint.get('serial_number') or '').split(',') if s.strip()]
+    for name, data in (fingerprint.get('command_outputs') or {}).items():
+        if not name.endswith('_textfsm') or not isinstance(data, dict):
+            continue
+        for record in data.get('records') or []:
+            value = record.get('SERIAL') if isinstance(record, dict) else None
+            for serial in (value if isinstance(value, list) else [value]):
+                if serial and str(serial).strip() not in serials:
+                    serials.append(str(serial).strip())
+    return serials
+
+
+def pack_document(fingerprint: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(fingerprint, separators=(',', ':')).encode('utf-8'), 6)
+
+
+def unpack_document(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+class FingerprintStore:
+    """SQLite fingerprint store: typed hot columns plus the compressed full document"""
+
+    def __init__(self, db_path: str = DEFAULT_FINGERPRINT_DB):
+        self.db_path = db_path
+        conn = self.get_connection()
+        try:
+            self._ensure_schema(conn)
+        finally:
+            conn.close()
+
+    @classmethod
+    def open_existing(cls, db_path: Optional[str]) -> Optional['FingerprintStore']:
+        """Store for readers: None when the database has not been created yet"""
+        if not db_path or not Path(db_path).exists():
+            return None
+        try:
+            return cls(db_path)
+        except sqlite3.Error as e:
+            print(f"Warning: fingerprint store {db_path} unusable: {e}")
+            return None
+
+    def get_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        return conn
+
+    def _ensure_schema(self, conn: sqlite3.Connection):
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > SCHEMA_VERSION:
+            raise sqlite3.DatabaseError(
+                f"{self.db_path} is schema version {version}, this code knows {SCHEMA_VERSION}")
+        if version == SCHEMA_VERSION:
+            return
+        with conn:
+            if version == 0:
+                # New database: SCHEMA is already the current layout, no migrations apply
+                conn.executescript(SCHEMA)
+            else:
+                for step in range(version + 1, SCHEMA_VERSION + 1):
+                    conn.executescript(MIGRATIONS[step])
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @staticmethod
+    def _row_values(device_name: str, fingerprint: Dict[str, Any]) -> tuple:
+        additional_info = fingerprint.get('additional_info') or {}
+        device_type = fingerprint.get('device_type')
+        return (
+            device_name,
+            fingerprint.get('host'),
+            int(fingerprint['port']) if str(fingerprint.get('port') or '').isdigit() else None,
+            fingerprint.get('hostname'),
+            normalize_hostname(fingerprint.get('hostname')) or None,
+            additional_info.get('vendor'),
+            additional_info.get('netmiko_driver'),
+            device_type if isinstance(device_type, int) else None,
+            fingerprint.get('model'),
+            fingerprint.get('version'),
+            fingerprint.get('serial_number'),
+            json.dumps(fingerprint_serials(fingerprint)),
+            fingerprint.get('detected_prompt'),
+            fingerprint.get('disable_paging_command'),
+            1 if fingerprint.get('success') else 0,
+            fingerprint.get('fingerprint_time'),
+            datetime.now().isoformat(),
+            pack_document(fingerprint),
+        )
+
+    def put_many(self, items: Iterable[tuple]) -> int:
+        """Upsert (device_name, fingerprint dict) pairs in one transaction"""
+        rows = [self._row_values(name, fingerprint) for name, fingerprint in items]
+        if not rows:
+            return 0
+        conn = self.get_connection()
+        try:
+            with conn:
+                conn.executemany(f"""
+                    INSERT OR REPLACE INTO fingerprints ({', '.join(SUMMARY_COLUMNS)}, document)
+                    VALUES ({', '.join('?' * (len(SUMMARY_COLUMNS) + 1))})
+                """, rows)
+        finally:
+            conn.close()
+        return len(rows)
+
+    def put(self, device_name: str, fingerprint: Dict[str, Any]):
+        self.put_many([(device_name, fingerprint)])
+
+    def get(self, device_name: str) -> Optional[Dict[str, Any]]:
+        """Full fingerprint document, exactly as written"""
+        conn = self.get_connection()
+        try:
+            row = conn.execute("SELECT document FROM fingerprints WHERE device_name = ?",
+                               (device_name,)).fetchone()
+        finally:
+            conn.close()
+        return unpack_document(row['document']) if row else None
+
+    def find(self, name: str) -> Optional[Dict[str, Any]]:
+        """Full document by device name, falling back to the (normalized) reported hostname"""
+        fingerprint = self.get(name)
+        if fingerprint is not None:
+            return fingerprint
+        conn = self.get_connection()
+        try:
+            row = conn.execute("""
+                SELECT document FROM fingerprints WHERE normalized_hostname = ?
+                ORDER BY fingerprint_time DESC LIMIT 1
+            """, (normalize_hostname(name),)).fetchone()
+        finally:
+            conn.close()
+        return unpack_document(row['document']) if row else None
+
+    def summary(self, device_name: str) -> Optional[Dict[str, Any]]:
+        """Typed columns for one device"""
+        return self.summaries([device_name]).get(device_name)
+
+    def summaries(self, device_names: Optional[Iterable[str]] = None, vendor: Optional[str] = None,
+                  success_only: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Typed columns keyed by device name, without touching the document blobs"""
+        where, params = [], []
+        wanted = set(device_names) if device_names is not None else None
+        if wanted is not None and len(wanted) <= 500:
+            where.append(f"device_name IN ({', '.join('?' * len(wanted))})")
+            params.extend(sorted(wanted))
+        if vendor:
+            where.append("(LOWER(vendor) LIKE ? OR LOWER(netmiko_driver) LIKE ?)")
+            params.extend([f"%{vendor.lower()}%"] * 2)
+        if success_only:
+            where.append("success = 1")
+
+        conn = self.get_connection()
+        try:
+            rows = conn.execute(f"""
+                SELECT {', '.join(SUMMARY_COLUMNS)} FROM fingerprints
+                {'WHERE ' + ' AND '.join(where) if where else ''}
+                ORDER BY device_name
+            """, params).fetchall()
+        finally:
+            conn.close()
+
+        summaries = {}
+        for row in rows:
+            if wanted is not None and row['device_name'] not in wanted:
+                continue
+            summary = dict(row)
+            summary['serials'] = json.loads(summary['serials'] or '[]')
+            summaries[row['device_name']] = summary
+        return summaries
+
+    def device_names(self) -> set:
+        conn = self.get_connection()
+        try:
+            return {row[0] for row in conn.execute("SELECT device_name FROM fingerprints")}
+        finally:
+            conn.close()
+
+    def import_directory(self, fingerprint_dir: str, pattern: str = '*.json') -> Dict[str, int]:
+        """Load <device>.json files (device name = file stem); existing rows are replaced"""
+        results = {'imported': 0, 'skipped': 0}
+        items = []
+        for path in sorted(Path(fingerprint_dir).glob(pattern)):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    fingerprint = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"  ! {path.name}: {e}")
+                results['skipped'] += 1
+                continue
+            if not isinstance(fingerprint, dict) or 'command_outputs' not in fingerprint:
+                results['skipped'] += 1
+                continue
+            items.append((path.stem, fingerprint))
+        results['imported'] = self.put_many(items)
+        return results
+
+    def export_directory(self, output_dir: str) -> int:
+        """Write every stored fingerprint back out as <device>.json"""
+        target = Path(output_dir)
+        target.mkdir(parents=True, exist_ok=True)
+        conn = self.get_connection()
+        try:
+            count = 0
+            for row in conn.execute("SELECT device_name, document FROM fingerprints"):
+                with open(target / f"{row['device_name']}.json", 'w', encoding='utf-8') as f:
+                    json.dump(unpack_document(row['document']), f, indent=2)
+                count += 1
+            return count
+        finally:
+            conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite fingerprint store")
+    parser.add_argument('--db', default=DEFAULT_FINGERPRINT_DB,
+                        help=f'Fingerprint store database (default: {DEFAULT_FINGERPRINT_DB})')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = subparsers.add_parser('import', help='Load a directory of fingerprint JSON files')
+    import_parser.add_argument('fingerprint_dir')
+    import_parser.add_argument('--pattern', default='*.json', help='File glob (default: *.json)')
+
+    export_parser = subparsers.add_parser('export', help='Write stored fingerprints out as JSON files')
+    export_parser.add_argument('output_dir')
+
+    list_parser = subparsers.add_parser('list', help='List stored fingerprints')
+    list_parser.add_argument('--vendor', help='Vendor or netmiko driver substring')
+    list_parser.add_argument('--json', action='store_true', help='Output JSON')
+
+    show_parser = subparsers.add_parser('show', help='Print one full fingerprint document')
+    show_parser.add_argument('device_name')
+
+    args = parser.parse_args()
+    store = FingerprintStore(args.db)
+
+    if args.command == 'import':
+        results = store.import_directory(args.fingerprint_dir, args.pattern)
+        print(f"Imported {results['imported']} fingerprints into {args.db} ({results['skipped']} skipped)")
+    elif args.command == 'export':
+        print(f"Exported {store.export_directory(args.output_dir)} fingerprints to {args.output_dir}/")
+    elif args.command == 'list':
+        summaries = store.summaries(vendor=args.vendor)
+        if args.json:
+            print(json.dumps(list(summaries.values()), indent=2))
+        else:
+            print(f"{'Device':<32}{'Vendor':<12}{'Driver':<16}{'Model':<20}{'Version':<18}{'Fingerprinted'}")
+            for s in summaries.values():
+                print(f"{s['device_name']:<32}{s['vendor'] or '':<12}{s['netmiko_driver'] or '':<16}"
+                      f"{s['model'] or '':<20}{s['version'] or '':<18}{(s['fingerprint_time'] or '')[:19]}")
+            print(f"\n{len(summaries)} fingerprints")
+    elif args.command == 'show':
+        fingerprint = store.find(args.device_name)
+        if fingerprint is None:
+            print(f"No fingerprint stored for {args.device_name}")
+            return 1
+        print(json.dumps(fingerprint, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
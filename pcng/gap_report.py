@@ -4,109 +4,40 @@ Network Capture Gap Report Generator
 
 Analyzes YAML inventory against captured data and generates an HTML gap report
 showing which devices have successful captures and which are missing data.
+Coverage comes from the captures loaded into assets.db (see coverage_model.py).
 """
 
-import yaml
-import json
-from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 import argparse
 
+from coverage_model import CoverageModel
+from fingerprint_store import DEFAULT_FINGERPRINT_DB
+
 
 class NetworkGapReporter:
-    def __init__(self, yaml_file, capture_dir, fingerprints_dir):
-        self.yaml_file = Path(yaml_file)
-        self.capture_dir = Path(capture_dir)
-        self.fingerprints_dir = Path(fingerprints_dir)
+    def __init__(self, yaml_file, db_path, fingerprints_dir, fingerprint_db=DEFAULT_FINGERPRINT_DB):
+        self.db_path = db_path
+        self.model = CoverageModel(yaml_file, db_path, fingerprints_dir, fingerprint_db)
+        self.report = None
         self.inventory_data = {}
         self.capture_types = []
-        self.device_status = defaultdict(dict)
+        self.device_status = {}
 
-    def load_inventory(self):
-        """Load and parse the YAML inventory file."""
-        print(f"Loading inventory from {self.yaml_file}")
+    def analyze_devices(self):
+        """Load each device's capture status (only devices with fingerprints) from the coverage model."""
+        print(f"Loading inventory from {self.model.yaml_file} and captures from {self.db_path}")
 
-        with open(self.yaml_file, 'r') as f:
-            self.inventory_data = yaml.safe_load(f)
+        self.report = self.model.refresh()
+        self.inventory_data = self.report.inventory_data
+        self.capture_types = self.report.capture_types
+        self.device_status = self.report.device_status
 
         print(f"Loaded {len(self.inventory_data)} site folders")
-
-    def discover_capture_types(self):
-        """Discover available capture types from directory structure."""
-        if not self.capture_dir.exists():
-            print(f"Capture directory not found: {self.capture_dir}")
-            return
-
-        self.capture_types = []
-        for item in self.capture_dir.iterdir():
-            if item.is_dir():
-                self.capture_types.append(item.name)
-
-        self.capture_types.sort()
         print(f"Found {len(self.capture_types)} capture types: {', '.join(self.capture_types)}")
 
-    def analyze_devices(self):
-        """Analyze each device's capture status (only devices with fingerprints)."""
-        print("Analyzing device capture status...")
-
-        total_devices_in_yaml = 0
-        devices_with_fingerprints = 0
-
-        for site in self.inventory_data:
-            folder_name = site['folder_name']
-
-            for session in site['sessions']:
-                device_name = session['display_name']
-                total_devices_in_yaml += 1
-
-                # Check for fingerprint file first - skip if doesn't exist
-                fingerprint_file = self.fingerprints_dir / f"{device_name}.json"
-                if not fingerprint_file.exists():
-                    continue  # Skip devices without fingerprints
-
-                devices_with_fingerprints += 1
-
-                # Initialize device status
-                device_info = {
-                    'folder': folder_name,
-                    'host': session.get('host', ''),
-                    'vendor': session.get('Vendor', ''),
-                    'model': session.get('Model', ''),
-                    'fingerprint': True,  # We know it exists
-                    'captures': {},
-                    'total_captures': 0,
-                    'missing_captures': 0
-                }
-
-                # Load fingerprint data for vendor info
-                try:
-                    with open(fingerprint_file, 'r') as f:
-                        fp_data = json.load(f)
-                        if not device_info['vendor']:
-                            # Extract vendor from fingerprint if not in YAML
-                            driver = fp_data.get('additional_info', {}).get('netmiko_driver', '')
-                            if 'cisco' in driver:
-                                device_info['vendor'] = 'Cisco'
-                            elif 'hp' in driver or 'procurve' in driver:
-                                device_info['vendor'] = 'HP/Aruba'
-                            elif 'arista' in driver:
-                                device_info['vendor'] = 'Arista'
-                except Exception as e:
-                    print(f"Error reading fingerprint for {device_name}: {e}")
-
-                # Check each capture type
-                for capture_type in self.capture_types:
-                    capture_file = self.capture_dir / capture_type / f"{device_name}.txt"
-                    has_capture = capture_file.exists()
-
-                    device_info['captures'][capture_type] = has_capture
-                    if has_capture:
-                        device_info['total_captures'] += 1
-                    else:
-                        device_info['missing_captures'] += 1
-
-                self.device_status[device_name] = device_info
+        total_devices_in_yaml = sum(len(site['sessions']) for site in self.inventory_data)
+        devices_with_fingerprints = len(self.device_status)
 
         print(f"Total devices in YAML: {total_devices_in_yaml}")
         print(f"Network devices (with fingerprints): {devices_with_fingerprints}")
@@ -115,35 +46,7 @@ class NetworkGapReporter:
 
     def generate_vendor_coverage_matrix(self):
         """Generate vendor coverage analysis by capture type."""
-        coverage_data = {
-            'vendors': set(),
-            'by_capture': defaultdict(lambda: {'vendors': {}, 'vendor_count': 0})
-        }
-
-        # Collect all vendors
-        for device_info in self.device_status.values():
-            vendor = device_info['vendor']
-            if vendor and vendor.strip():
-                coverage_data['vendors'].add(vendor)
-
-        # Analyze coverage by capture type
-        for capture_type in self.capture_types:
-            vendor_stats = defaultdict(lambda: {'success': 0, 'total': 0})
-
-            for device_info in self.device_status.values():
-                vendor = device_info['vendor'] or 'Unknown'
-                vendor_stats[vendor]['total'] += 1
-
-                if device_info['captures'].get(capture_type, False):
-                    vendor_stats[vendor]['success'] += 1
-
-            coverage_data['by_capture'][capture_type]['vendors'] = dict(vendor_stats)
-            coverage_data['by_capture'][capture_type]['vendor_count'] = len([
-                v for v, stats in vendor_stats.items()
-                if stats['success'] > 0 and stats['total'] > 0
-            ])
-
-        return coverage_data
+        return self.report.vendor_coverage_matrix()
 
     def generate_html_report(self, output_file):
         """Generate comprehensive HTML gap report."""
@@ -600,19 +503,25 @@ class NetworkGapReporter:
 def main():
     parser = argparse.ArgumentParser(description="Generate network capture gap report")
     parser.add_argument("--yaml", "-y", required=True, help="Path to sessions.yaml inventory file")
-    parser.add_argument("--capture-dir", "-c", required=True, help="Path to capture directory")
+    parser.add_argument("--db", "-d", default="assets.db",
+                        help="Assets database with loaded captures (db_load_capture.py)")
+    parser.add_argument("--capture-dir", "-c", help=argparse.SUPPRESS)
     parser.add_argument("--fingerprints-dir", "-f", required=True, help="Path to fingerprints directory")
+    parser.add_argument("--fingerprint-db", default=DEFAULT_FINGERPRINT_DB,
+                        help=f"Fingerprint store database (default: {DEFAULT_FINGERPRINT_DB})")
     parser.add_argument("--output", "-o", default="network_gap_report.html", help="Output HTML file name")
     parser.add_argument("--stats-only", "-s", action="store_true", help="Only print statistics, don't generate HTML")
 
     args = parser.parse_args()
 
+    if args.capture_dir:
+        print(f"Note: --capture-dir is no longer used; coverage is read from {args.db}. "
+              f"Load new captures with db_load_capture.py first.")
+
     # Create reporter
-    reporter = NetworkGapReporter(args.yaml, args.capture_dir, args.fingerprints_dir)
+    reporter = NetworkGapReporter(args.yaml, args.db, args.fingerprints_dir, args.fingerprint_db)
 
     # Load data and analyze
-    reporter.load_inventory()
-    reporter.discover_capture_types()
     reporter.analyze_devices()
 
     # Generate output
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Map Thumbnails
+PNG previews of topology SVGs for the web maps overview, keyed by the SVG's content hash.
+
+A thumbnail is stored as <maps>/thumbnails/<site>/<map>.<sha256[:16]>.png beside the site
+folders, so an SVG rewritten with identical content keeps its thumbnail and is never rendered
+again. sc_enhance_all_maps.py and topology-merge.py render thumbnails right after they write
+SVGs; the web app renders any that are still missing on a background process pool and serves
+a placeholder until they are ready.
+
+Requires cairosvg and Pillow; without them callers fall back to serving the SVG itself.
+
+Usage:
+  python map_thumbnails.py maps                 # every <site>/<map>.svg under maps/
+  python map_thumbnails.py maps/site1/site1.svg --force
+"""
+
+import os
+import re
+import sys
+import hashlib
+import logging
+import argparse
+import threading
+import importlib.util
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = (300, 200)
+THUMBNAILS_DIR_NAME = 'thumbnails'
+DEFAULT_RENDER_WORKERS = 2
+
+_digest_cache = {}
+_digest_lock = threading.Lock()
+
+
+def thumbnails_available() -> bool:
+    """True when cairosvg and Pillow are installed"""
+    return all(importlib.util.find_spec(name) for name in ('cairosvg', 'PIL'))
+
+
+def svg_digest(svg_path) -> str:
+    """Content hash of an SVG, recomputed only when its size or mtime changes"""
+    path = os.path.abspath(svg_path)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _digest_lock:
+        cached = _digest_cache.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            sha.update(block)
+    digest = sha.hexdigest()[:16]
+
+    with _digest_lock:
+        _digest_cache[path] = (signature, digest)
+    return digest
+
+
+def thumbnail_path(svg_path, digest: Optional[str] = None) -> Path:
+    """<maps>/thumbnails/<site>/<map>.<digest>.png for <maps>/<site>/<map>.svg"""
+    svg_path = Path(svg_path)
+    digest = digest or svg_digest(svg_path)
+    return svg_path.parent.parent / THUMBNAILS_DIR_NAME / svg_path.parent.name / f"{svg_path.stem}.{digest}.png"
+
+
+def _remove_stale_thumbnails(output_path: Path):
+    """Drop thumbnails of earlier versions of the same map (and the old <map>_thumb.png)"""
+    map_name = output_path.name.rsplit('.', 2)[0]
+    pattern = re.compile(rf"^{re.escape(map_name)}\.[0-9a-f]{{16}}\.png$")
+    for candidate in output_path.parent.iterdir():
+        if candidate != output_path and (pattern.match(candidate.name) or
+                                         candidate.name == f"{map_name}_thumb.png"):
+            try:
+                candidate.unlink()
+            except OSError:
+                pass
+
+
+def render_thumbnail(svg_path, output_path) -> str:
+    """
+    Render one SVG to a PNG thumbnail. Runs in worker processes, so it only takes paths.
+
+    The PNG is written to a temporary file and moved into place, so readers never see a
+    partial image.
+    """
+    from PIL import Image
+    import cairosvg
+    import io
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    width, height = THUMBNAIL_SIZE
+    png_data = cairosvg.svg2png(url=str(svg_path), output_width=width, output_height=height)
+
+    img = Image.open(io.BytesIO(png_data))
+    img.thumbnail(THUMBNAIL_SIZE, Image.Resampling.LANCZOS)
+
+    tmp_path = output_path.with_name(f"{output_path.name}.{os.getpid()}.tmp")
+    img.save(tmp_path, 'PNG', optimize=True)
+    os.replace(tmp_path, output_path)
+
+    _remove_stale_thumbnails(output_path)
+    return str(output_path)
+
+
+def render_thumbnails(svg_paths: Iterable, workers: int = DEFAULT_RENDER_WORKERS,
+                      force: bool = False) -> Dict[str, int]:
+    """
+    Render thumbnails for SVGs whose current content has none yet (all of them with force).
+
+    Returns:
+        Counts of rendered, unchanged (already had a thumbnail) and failed maps
+    """
+    results = {'rendered': 0, 'unchanged': 0, 'failed': 0}
+    jobs = []
+    for svg_path in svg_paths:
+        svg_path = Path(svg_path)
+        try:
+            output_path = thumbnail_path(svg_path)
+        except OSError as e:
+            print(f"  ! {svg_path}: {e}")
+            results['failed'] += 1
+            continue
+        if output_path.exists() and not force:
+            results['unchanged'] += 1
+        else:
+            jobs.append((svg_path, output_path))
+
+    if not jobs:
+        return results
+
+    if not thumbnails_available():
+        print("Thumbnails skipped: cairosvg and Pillow are required")
+        results['failed'] += len(jobs)
+        return results
+
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as executor:
+        futures = {executor.submit(render_thumbnail, str(svg), str(out)): svg for svg, out in jobs}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                results['rendered'] += 1
+            except Exception as e:
+                print(f"  ! thumbnail for {futures[future]}: {e}")
+                results['failed'] += 1
+
+    return results
+
+
+class ThumbnailQueue:
+    """
+    Background thumbnail rendering for the web app.
+
+    Each content hash is rendered at most once: requests for a thumbnail that is already
+    being rendered share the pending job, and SVG content that failed to render is not
+    retried until it changes.
+    """
+
+    READY = 'ready'
+    PENDING = 'pending'
+    FAILED = 'failed'
+
+    def __init__(self, workers: int = DEFAULT_RENDER_WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._failed = {}
+
+    def _submit(self, svg_path: Path, output_path: Path):
+        for attempt in range(2):
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            try:
+                return self._executor.submit(render_thumbnail, str(svg_path), str(output_path))
+            except BrokenProcessPool:
+                # A worker died (e.g. killed on a huge SVG); start a fresh pool once
+                self._executor = None
+        raise BrokenProcessPool("thumbnail render pool keeps failing")
+
+    def _finished(self, key: str, future):
+        with self._lock:
+            self._pending.pop(key, None)
+            error = None if future.cancelled() else future.exception()
+            if error is not None:
+                self._failed[key] = str(error)
+                logger.error(f"Thumbnail render failed for {key}: {error}")
+
+    def request(self, svg_path, force: bool = False) -> tuple:
+        """
+        Thumbnail state for an SVG, queueing a render when there is none.
+
+        Returns:
+            (READY | PENDING | FAILED, thumbnail path)
+        """
+        svg_path = Path(svg_path)
+        output_path = thumbnail_path(svg_path)
+        key = str(output_path)
+
+        if output_path.exists() and not force:
+            return self.READY, output_path
+
+        with self._lock:
+            if key in self._pending:
+                return self.PENDING, output_path
+            if key in self._failed and not force:
+                return self.FAILED, output_path
+            self._failed.pop(key, None)
+
+            future = self._submit(svg_path, output_path)
+            self._pending[key] = future
+        future.add_done_callback(lambda done: self._finished(key, done))
+
+        if output_path.exists():
+            # Forced re-render: keep serving the current image meanwhile
+            return self.READY, output_path
+        return self.PENDING, output_path
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def find_svgs(paths: Iterable[str]) -> List[Path]:
+    """SVG files given directly, plus <site>/<map>.svg under any directories given"""
+    svgs = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            svgs.extend(p for p in sorted(path.glob('*/*.svg')) if p.parent.name != THUMBNAILS_DIR_NAME)
+        elif path.suffix.lower() == '.svg':
+            svgs.append(path)
+    return svgs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render PNG thumbnails for topology map SVGs")
+    parser.add_argument("paths", nargs='+', help="SVG files or maps directories (<maps>/<site>/<map>.svg)")
+    parser.add_argument("--workers", "-w", type=int, default=DEFAULT_RENDER_WORKERS,
+                        help=f"Render processes (default: {DEFAULT_RENDER_WORKERS})")
+    parser.add_argument("--force", action="store_true", help="Re-render thumbnails that already exist")
+    args = parser.parse_args()
+
+    svgs = find_svgs(args.paths)
+    print(f"Found {len(svgs)} SVG map(s)")
+    results = render_thumbnails(svgs, workers=args.workers, force=args.force)
+    print(f"Thumbnails: {results['rendered']} rendered, {results['unchanged']} unchanged, "
+          f"{results['failed']} failed")
+    return 1 if results['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
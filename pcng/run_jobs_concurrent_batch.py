@@ -11,6 +11,7 @@ import yaml
 import subprocess
 import argparse
 import time
+import re
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
@@ -54,6 +55,11 @@ class VendorCommandManager:
                 'additional_args': '--invoke-shell',
                 'description': 'Fortinet FortiGate firewalls'
             },
+            'aruba': {
+                'paging_disable': 'no page',
+                'additional_args': '--invoke-shell',
+                'description': 'Aruba/HP ProCurve switches'
+            },
             'generic': {
                 'paging_disable': '',
                 'additional_args': '',
@@ -65,6 +71,18 @@ class VendorCommandManager:
         """Get configuration for a specific vendor"""
         return self.vendor_configs.get(vendor.lower(), self.vendor_configs['generic'])
 
+    def resolve_vendor_key(self, vendor: str) -> str:
+        """Map a free-form vendor string (e.g. sessions.yaml 'Palo Alto') to a config key"""
+        normalized = re.sub(r'[^a-z0-9]', '', (vendor or '').lower())
+        if not normalized:
+            return 'generic'
+        for key in self.vendor_configs:
+            if key != 'generic' and key in normalized:
+                return key
+        if normalized.startswith('hp') or 'procurve' in normalized:
+            return 'aruba'
+        return 'generic'
+
     def build_command_with_paging(self, vendor: str, commands: str) -> str:
         """Build command string with vendor-specific paging disable prefix"""
         config = self.get_vendor_config(vendor)
@@ -222,6 +240,12 @@ def execute_single_job(job_file_and_config: Tuple[str, Dict[str, Any]],
                             if verbose:
                                 log_message(f"Applied fingerprint base: {fingerprint_base.strip()}", "INFO", job_name)
 
+                        # SQLite fingerprint store (empty string disables it)
+                        if 'fingerprint_db' in fingerprint_options:
+                            fingerprint_db = (fingerprint_options.get('fingerprint_db') or '').strip()
+                            cmd_args.extend(['--fingerprint-db', fingerprint_db] if fingerprint_db
+                                            else ['--no-fingerprint-db'])
+
             # Add execution parameters
             cmd_args.extend(['-c', final_commands])
             cmd_args.extend(['-o', output_dir])
@@ -237,6 +261,12 @@ def execute_single_job(job_file_and_config: Tuple[str, Dict[str, Any]],
                 cmd_args.extend(['--max-processes', str(max_workers)])
                 if job_verbose:
                     cmd_args.append('--verbose')
+                # Per-device retry / circuit breaker settings - retrying a few dead hosts
+                # is much cheaper than re-running the whole job with --retries
+                for option in ('device_timeout', 'connect_timeout', 'device_retries',
+                               'retry_backoff', 'circuit_threshold', 'circuit_cooldown'):
+                    if option in execution_info:
+                        cmd_args.extend([f"--{option.replace('_', '-')}", str(execution_info[option])])
             elif script_name == 'batch_spn.py':
                 cmd_args.extend(['--max-workers', str(max_workers)])
                 # batch_spn.py doesn't support --verbose
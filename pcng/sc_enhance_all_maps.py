@@ -11,6 +11,8 @@ from pathlib import Path
 from typing import List, Tuple
 from concurrent.futures import ProcessPoolExecutor, as_completed
 
+from map_thumbnails import render_thumbnails
+
 
 def find_topology_files(base_dir: Path) -> List[Path]:
     """
@@ -134,6 +136,9 @@ Examples:
 
   # Skip SVG generation for faster processing
   %(prog)s --skip-svg --workers 8
+
+  # Enhance without rendering dashboard thumbnails
+  %(prog)s --svg-no-endpoints --no-thumbnails
         '''
     )
 
@@ -188,6 +193,12 @@ Examples:
         help='Skip SVG generation for faster processing'
     )
 
+    parser.add_argument(
+        '--no-thumbnails',
+        action='store_true',
+        help='Do not render web dashboard thumbnails for new SVGs'
+    )
+
     parser.add_argument(
         '--workers',
         type=int,
@@ -320,6 +331,17 @@ Examples:
                 print(f"  ✓ {site_name}: {message}")
         print()
 
+    # Pre-render dashboard thumbnails; unchanged SVG content keeps its existing thumbnail
+    if success_count > 0 and not args.skip_svg and not args.no_thumbnails:
+        succeeded = {site_name for site_name, success, _ in results if success}
+        svg_files = [json_file.parent / f"{json_file.stem}.svg" for json_file in json_files
+                     if json_file.stem in succeeded]
+        svg_files = [svg_file for svg_file in svg_files if svg_file.exists()]
+        print(f"Rendering thumbnails for {len(svg_files)} SVG(s)...")
+        thumbs = render_thumbnails(svg_files, workers=max(1, args.workers))
+        print(f"Thumbnails: {thumbs['rendered']} rendered, {thumbs['unchanged']} unchanged, "
+              f"{thumbs['failed']} failed\n")
+
     return 0 if success_count == total else 1
 
 
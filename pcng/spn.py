@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import os
 import sys
+import re
 import json
 import time
 import argparse
@@ -12,6 +13,7 @@ from datetime import datetime
 from device_info import DeviceInfo, DeviceType
 from ssh_client import SSHClient, SSHClientOptions
 from device_fingerprint import DeviceFingerprint
+from fingerprint_store import FingerprintStore
 
 
 
@@ -90,6 +92,12 @@ class EnhancedSPN:
         # Setup logging
         self.log_file = self.setup_logging()
 
+        # Sessions used during this run, for --telemetry-file
+        self._fingerprint_client = None
+        self._command_client = None
+        self._command_offset = 0
+        self._fingerprint_seconds = None
+
     def parse_arguments(self):
         """Parse command line arguments with environment variable support"""
         parser = argparse.ArgumentParser(
@@ -164,6 +172,21 @@ class EnhancedSPN:
                             help="Save fingerprint results to JSON file")
         parser.add_argument("--use-fingerprint-prompt", action="store_true",
                             help="Use detected prompt from fingerprinting")
+        parser.add_argument("--shared-session", action="store_true",
+                            help="Run fingerprinting and commands over one SSH session\n"
+                                 "(single handshake, prompt detected once, paging already disabled)")
+        parser.add_argument("--fingerprint-db", default="",
+                            help="Also store the fingerprint in this SQLite fingerprint store\n"
+                                 "(see fingerprint_store.py)")
+        parser.add_argument("--device-name", default="",
+                            help="Device name for the fingerprint store (default: --fingerprint-output\n"
+                                 "file name without .json, else the host)")
+        parser.add_argument("--fingerprint-cache", default="",
+                            help="Previous fingerprint JSON for this device: if the live prompt still\n"
+                                 "matches it, reuse it and skip the identification commands")
+        parser.add_argument("--telemetry-file", default="",
+                            help="Write connect/auth/prompt/per-command timing and bytes received\n"
+                                 "to this JSON file when the run ends")
 
         # Legacy support
         parser.add_argument("--legacy-mode", action="store_true",
@@ -296,7 +319,7 @@ class EnhancedSPN:
 
         return commands
 
-    def run_fingerprint(self) -> Optional[DeviceInfo]:
+    def run_fingerprint(self, ssh_client: Optional[SSHClient] = None) -> Optional[DeviceInfo]:
         """Run device fingerprinting using your existing methodology"""
         if self.args.verbose:
             print(f"Starting device fingerprinting on {self.host}:{self.port}...")
@@ -304,6 +327,9 @@ class EnhancedSPN:
         def fingerprint_output_callback(output):
             if self.args.debug:
                 self.output_manager.write(output)
+
+        device_info = None
+        fingerprint_start = time.time()
         try:
             fingerprinter = DeviceFingerprint(
                 host=self.host,
@@ -313,15 +339,21 @@ class EnhancedSPN:
                 output_callback=fingerprint_output_callback,
                 debug=self.args.debug,
                 verbose=self.args.verbose,
-                textfsm_db_path="tfsm_templates.db"
+                textfsm_db_path="tfsm_templates.db",
+                ssh_client=ssh_client
             )
+            self._fingerprint_client = fingerprinter._ssh_client
             device_info = fingerprinter.fingerprint()
             structured = fingerprinter.to_structured_output()
             print(json.dumps(structured, indent=2))
         except Exception as e:
             print(f"Error instantiating fingerprinter: {e}")
             traceback.print_exc()
+        self._fingerprint_seconds = time.time() - fingerprint_start
 
+        if device_info is None:
+            print("Warning: Device fingerprinting failed, proceeding with default settings")
+            return None
 
         if device_info.success:
             if self.args.verbose:
@@ -337,11 +369,76 @@ class EnhancedSPN:
                     print(f"Fingerprint saved to {self.args.fingerprint_output}")
                 except Exception as e:
                     print(f"Error saving fingerprint: {str(e)}")
+
+            if self.args.fingerprint_db:
+                self.store_fingerprint(device_info)
         else:
             print("Warning: Device fingerprinting failed, proceeding with default settings")
 
         return device_info
 
+    def _store_device_name(self) -> str:
+        return (self.args.device_name
+                or (Path(self.args.fingerprint_output).stem if self.args.fingerprint_output else '')
+                or self.args.host)
+
+    def _stored_fingerprint(self) -> Optional[Dict[str, Any]]:
+        """This device's fingerprint from the SQLite store, when --fingerprint-db is set"""
+        store = FingerprintStore.open_existing(self.args.fingerprint_db)
+        return store.get(self._store_device_name()) if store else None
+
+    def store_fingerprint(self, device_info: DeviceInfo):
+        """Upsert the fingerprint into the SQLite fingerprint store"""
+        device_name = self._store_device_name()
+        try:
+            FingerprintStore(self.args.fingerprint_db).put(device_name, device_info.to_dict())
+            print(f"Fingerprint stored in {self.args.fingerprint_db} as {device_name}")
+        except Exception as e:
+            print(f"Error storing fingerprint: {str(e)}")
+
+    @staticmethod
+    def _prompt_base(prompt: Optional[str]) -> str:
+        """'core-01(config)#' -> 'core-01'; user@host prompts keep the host part"""
+        base = (prompt or '').strip()
+        base = re.sub(r'\([^)]*\)\s*[#>$%]?\s*$', '', base)
+        base = re.sub(r'[#>$%:\]\s]+$', '', base)
+        if '@' in base:
+            base = base.split('@', 1)[1].split(':', 1)[0]
+        return base.lower()
+
+    def probe_cached_fingerprint(self, ssh_client: SSHClient) -> Optional[DeviceInfo]:
+        """
+        Cheap "is it still the same box" check: detect the prompt and compare it with the cached
+        fingerprint's prompt/hostname. Returns the cached DeviceInfo on a match, None otherwise.
+        """
+        try:
+            with open(self.args.fingerprint_cache, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError) as e:
+            cached = self._stored_fingerprint()
+            if cached is None:
+                if self.args.verbose:
+                    print(f"Fingerprint cache unavailable ({e}), running full fingerprint")
+                return None
+
+        ssh_client._options.invoke_shell = True
+        if not ssh_client.is_connected():
+            ssh_client.connect()
+        prompt = ssh_client.find_prompt()
+
+        live = self._prompt_base(prompt)
+        expected = {self._prompt_base(cached.get('detected_prompt')), (cached.get('hostname') or '').lower()}
+        if not live or live not in expected:
+            print(f"Fingerprint cache miss: prompt '{prompt}' does not match cached "
+                  f"'{cached.get('detected_prompt')}' - running full fingerprint")
+            return None
+
+        device_info = DeviceInfo.from_dict(cached)
+        device_info.detected_prompt = prompt
+        print(f"Fingerprint cache hit: '{prompt}' matches cached {device_info.device_type.name} fingerprint "
+              f"from {cached.get('fingerprint_time', 'unknown')[:16]}")
+        return device_info
+
     def calculate_prompt_count(self, commands: List[str]) -> int:
         """Calculate intelligent prompt count based on your methodology"""
         # Count all commands including newline commands (they all expect prompts)
@@ -407,8 +504,15 @@ class EnhancedSPN:
 
         return ssh_options
 
-    def execute_commands(self, commands: List[str], device_info: Optional[DeviceInfo] = None):
-        """Execute commands using single-session shell mode with aggregate prompt counting"""
+    def execute_commands(self, commands: List[str], device_info: Optional[DeviceInfo] = None,
+                         ssh_client: Optional[SSHClient] = None, paging_disabled: bool = True):
+        """Execute commands using single-session shell mode with aggregate prompt counting
+
+        When ssh_client is given it is the session the fingerprinter just used:
+        it is reused as-is (no reconnect, no prompt detection, paging already
+        disabled) and left open for the caller to disconnect. paging_disabled=False
+        is for a shared session that only had its prompt probed.
+        """
         if not commands:
             print("No commands to execute.")
             return
@@ -416,12 +520,26 @@ class EnhancedSPN:
         if self.args.verbose:
             print(f"Executing {len(commands)} commands on {self.host}:{self.port}")
 
+        shared_session = ssh_client is not None
         ssh_options = self.create_ssh_options(device_info, commands)
-        ssh_client = SSHClient(ssh_options)
+
+        if shared_session:
+            # Same shell the fingerprinter ran in, so its prompt is authoritative
+            if device_info and device_info.detected_prompt and not self.args.prompt:
+                ssh_options.expect_prompt = device_info.detected_prompt
+            ssh_client._options = ssh_options
+        else:
+            ssh_client = SSHClient(ssh_options)
+
+        self._command_client = ssh_client
+        self._command_offset = len(ssh_client.timings['commands'])
 
         try:
             # Connect using your existing robust connection logic
-            ssh_client.connect()
+            if not ssh_client.is_connected():
+                ssh_client.connect()
+                # A fresh session has not had paging disabled by the fingerprinter
+                shared_session = False
 
             # If in shell mode and no prompt specified, detect it automatically
             if self.args.invoke_shell and not self.args.prompt and not ssh_options.expect_prompt:
@@ -444,14 +562,18 @@ class EnhancedSPN:
                         print("Warning: Prompt detection failed, using fallback timing")
 
             # Add disable paging commands if we have device info
-            if device_info and device_info.disable_paging_command and not self.args.legacy_mode:
+            if shared_session and paging_disabled and device_info and device_info.disable_paging_command:
+                if self.args.verbose:
+                    print(f"Paging already disabled in shared session ({device_info.disable_paging_command})")
+            elif device_info and device_info.disable_paging_command and not self.args.legacy_mode:
                 disable_cmd = device_info.disable_paging_command
                 if self.args.verbose:
                     print(f"Disabling paging with: {disable_cmd}")
                 # Insert at the beginning of command list
                 commands.insert(0, disable_cmd)
-                # Recalculate SSH options with updated command count
+                # Recalculate SSH options with updated command count, keeping the prompt we already know
                 ssh_options = self.create_ssh_options(device_info, commands)
+                ssh_options.expect_prompt = ssh_options.expect_prompt or ssh_client._options.expect_prompt
                 ssh_client._options = ssh_options
             elif self.args.disable_paging_commands:
                 # Use custom disable paging commands
@@ -460,8 +582,9 @@ class EnhancedSPN:
                     print(f"Using custom paging commands: {paging_cmds}")
                 # Insert at the beginning
                 commands = paging_cmds + commands
-                # Recalculate SSH options
+                # Recalculate SSH options, keeping the prompt we already know
                 ssh_options = self.create_ssh_options(device_info, commands)
+                ssh_options.expect_prompt = ssh_options.expect_prompt or ssh_client._options.expect_prompt
                 ssh_client._options = ssh_options
 
             # CRITICAL: Execute all commands in ONE session when using shell mode
@@ -509,7 +632,8 @@ class EnhancedSPN:
 
                     result = ssh_client.execute_command(cmd)
 
-            ssh_client.disconnect()
+            if not shared_session:
+                ssh_client.disconnect()
 
         except Exception as e:
             print(f"Error during command execution: {str(e)}")
@@ -517,6 +641,78 @@ class EnhancedSPN:
                 traceback.print_exc()
             sys.exit(1)
 
+    def run_shared_session(self, commands: List[str]):
+        """Fingerprint and execute commands over a single authenticated session"""
+        if self.args.verbose:
+            print("Shared session mode: fingerprint and commands on one connection")
+
+        ssh_client = SSHClient(self.create_ssh_options(None, commands))
+        try:
+            device_info = None
+            if self.args.fingerprint_cache:
+                self._fingerprint_client = ssh_client
+                try:
+                    device_info = self.probe_cached_fingerprint(ssh_client)
+                except Exception as e:
+                    print(f"Fingerprint cache probe failed: {e}")
+
+            if device_info:
+                self.execute_commands(commands, device_info, ssh_client=ssh_client, paging_disabled=False)
+            else:
+                device_info = self.run_fingerprint(ssh_client=ssh_client)
+                self.execute_commands(commands, device_info, ssh_client=ssh_client)
+        finally:
+            ssh_client.disconnect()
+
+    def run_cached_fingerprint(self) -> Optional[DeviceInfo]:
+        """Fingerprint step with --fingerprint-cache on its own session: probe first, full run on a miss"""
+        probe_client = SSHClient(self.create_ssh_options(None, None))
+        self._fingerprint_client = probe_client
+        try:
+            device_info = self.probe_cached_fingerprint(probe_client)
+        except Exception as e:
+            print(f"Fingerprint cache probe failed: {e}")
+            device_info = None
+        finally:
+            probe_client.disconnect()
+
+        return device_info or self.run_fingerprint()
+
+    def collect_telemetry(self) -> dict:
+        """Combine timings from the fingerprint and command sessions (one object when shared)"""
+        clients = []
+        for client in (self._fingerprint_client, self._command_client):
+            if client is not None and all(client is not c for c in clients):
+                clients.append(client)
+
+        def total(key):
+            values = [c.timings[key] for c in clients if c.timings.get(key) is not None]
+            return round(sum(values), 3) if values else None
+
+        commands = []
+        if self._command_client is not None:
+            commands = self._command_client.timings['commands'][self._command_offset:]
+
+        return {
+            'host': self.host,
+            'port': self.port,
+            'sessions': len([c for c in clients if c.timings.get('auth_seconds') is not None]),
+            'connect_seconds': total('connect_seconds'),
+            'auth_seconds': total('auth_seconds'),
+            'prompt_seconds': total('prompt_seconds'),
+            'fingerprint_seconds': round(self._fingerprint_seconds, 3) if self._fingerprint_seconds else None,
+            'bytes_received': sum(c.timings['bytes_received'] for c in clients),
+            'commands': commands
+        }
+
+    def write_telemetry(self, telemetry_file: str):
+        """Save run timing for the batch runner; never fails the run"""
+        try:
+            with open(telemetry_file, 'w') as f:
+                json.dump(self.collect_telemetry(), f, indent=2)
+        except Exception as e:
+            print(f"Error saving telemetry: {str(e)}")
+
     def run(self):
         """Main execution logic leveraging your existing methodology"""
         print(f"Enhanced SSHPassPython {self.VERSION}")
@@ -524,17 +720,27 @@ class EnhancedSPN:
 
         device_info = None
 
-        # Run fingerprinting if requested
-        if self.args.fingerprint:
-            device_info = self.run_fingerprint()
-
         # Prepare commands early so we can calculate prompt count
         commands = self.prepare_commands()
 
-        # Execute commands if any provided
-        if commands:
-            self.execute_commands(commands, device_info)
-        elif not self.args.fingerprint:
+        try:
+            if self.args.fingerprint and commands and self.args.shared_session:
+                self.run_shared_session(commands)
+            else:
+                # Run fingerprinting if requested
+                if self.args.fingerprint and self.args.fingerprint_cache:
+                    device_info = self.run_cached_fingerprint()
+                elif self.args.fingerprint:
+                    device_info = self.run_fingerprint()
+
+                # Execute commands if any provided
+                if commands:
+                    self.execute_commands(commands, device_info)
+        finally:
+            if self.args.telemetry_file:
+                self.write_telemetry(self.args.telemetry_file)
+
+        if not commands and not self.args.fingerprint:
             print("No commands provided. Use -c, --cmd-file, or -f for fingerprinting.")
 
         # Close output manager
@@ -4,6 +4,7 @@ import time
 import re
 import logging
 import os
+import socket
 import paramiko
 from io import StringIO
 from datetime import datetime
@@ -314,6 +315,13 @@ class SSHClient:
         self._prompt_detected = False
         self._proxy_client = None
         self.router = None
+        self.timings = {
+            'connect_seconds': None,
+            'auth_seconds': None,
+            'prompt_seconds': None,
+            'bytes_received': 0,
+            'commands': []
+        }
         if self._options.routing_enabled and self._options.routing_rules:
             self.router = SimpleSSHRouter(self._options.routing_rules)
 
@@ -339,7 +347,9 @@ class SSHClient:
             return ""
 
         try:
-            raw_data = self._shell.recv(size).decode('utf-8', errors='replace')
+            raw_bytes = self._shell.recv(size)
+            self.timings['bytes_received'] += len(raw_bytes)
+            raw_data = raw_bytes.decode('utf-8', errors='replace')
             filtered_data = filter_ansi_sequences(raw_data)
 
             # Optional: log filtering stats
@@ -365,6 +375,14 @@ class SSHClient:
 
     def find_prompt(self, attempt_count=5, timeout=5):
         """Auto-detect command prompt with ANSI filtering"""
+        prompt_start = time.time()
+        try:
+            return self._detect_prompt(attempt_count, timeout)
+        finally:
+            self.timings['prompt_seconds'] = time.time() - prompt_start
+
+    def _detect_prompt(self, attempt_count, timeout):
+        """Prompt detection loop behind find_prompt"""
         if not self._shell:
             raise RuntimeError("Shell not initialized")
 
@@ -592,6 +610,7 @@ class SSHClient:
             time.sleep(self._options.inter_command_time)
 
         duration = time.time() - start_time
+        self.timings['commands'].append({'command': command[:200], 'seconds': round(duration, 3)})
         self._log_with_timestamp("SSHClient Message: Command execution completed in {:.2f}ms".format(duration * 1000), True)
 
         return result
@@ -606,7 +625,9 @@ class SSHClient:
             timeout=self._options.timeout
         )
 
-        result = stdout.read().decode('utf-8', errors='replace')
+        raw_result = stdout.read()
+        self.timings['bytes_received'] += len(raw_result)
+        result = raw_result.decode('utf-8', errors='replace')
         error = stderr.read().decode('utf-8', errors='replace')
 
         execution_time = time.time() - start_time
@@ -809,6 +830,13 @@ class SSHClient:
 
         return self._output_buffer.getvalue()
 
+    def is_connected(self):
+        """Check whether the underlying SSH transport is up"""
+        if not self._ssh_client:
+            return False
+        transport = self._ssh_client.get_transport()
+        return bool(transport and transport.is_active())
+
     def set_expect_prompt(self, prompt_string):
         """Set the expected prompt string"""
         if prompt_string:
@@ -859,6 +887,14 @@ class SSHClient:
         if self._options.legacy_mode:
             LegacySSHClientEnhancements.configure_legacy_algorithms(self._ssh_client)
 
+        # Open the TCP socket ourselves so connect time and SSH handshake/auth time
+        # can be reported separately
+        connect_start = time.time()
+        sock = socket.create_connection((self._options.host, self._options.port),
+                                        timeout=self._options.timeout)
+        self.timings['connect_seconds'] = time.time() - connect_start
+
+        auth_start = time.time()
         self._ssh_client.connect(
             hostname=self._options.host,
             port=self._options.port,
@@ -866,8 +902,10 @@ class SSHClient:
             password=self._options.password,
             timeout=self._options.timeout,
             allow_agent=False,
-            look_for_keys=False
+            look_for_keys=False,
+            sock=sock
         )
+        self.timings['auth_seconds'] = time.time() - auth_start
 
     def _connect_through_proxy(self):
         """Connect through SSH proxy using environment settings"""
@@ -878,6 +916,7 @@ class SSHClient:
             f"Connecting via proxy: {self._options.proxy_username}@{self._options.proxy_host}:{self._options.proxy_port}")
 
         # Step 1: Connect to proxy
+        connect_start = time.time()
         self._proxy_client = paramiko.SSHClient()
         self._proxy_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
 
@@ -911,6 +950,7 @@ class SSHClient:
         dest_addr = (self._options.host, self._options.port)
         local_addr = ('localhost', 0)
         tunnel_channel = transport.open_channel('direct-tcpip', dest_addr, local_addr)
+        self.timings['connect_seconds'] = time.time() - connect_start
 
         # Step 3: Connect to final destination through tunnel
         self._ssh_client = paramiko.SSHClient()
@@ -920,6 +960,7 @@ class SSHClient:
         if self._options.legacy_mode:
             LegacySSHClientEnhancements.configure_legacy_algorithms(self._ssh_client)
 
+        auth_start = time.time()
         self._ssh_client.connect(
             hostname=self._options.host,
             port=self._options.port,
@@ -930,6 +971,7 @@ class SSHClient:
             look_for_keys=False,
             sock=tunnel_channel  # This is the key - route through tunnel!
         )
+        self.timings['auth_seconds'] = time.time() - auth_start
 
         self._log_with_timestamp("Established connection through proxy tunnel")
 
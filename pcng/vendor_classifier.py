@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Single-pass vendor classifier for device command output.
+
+DeviceFingerprint used to lower-case each output and run its own `pattern in output` loops
+in both _create_textfsm_filter and identify_vendor_from_output, with the pattern tables
+rebuilt on every call. This module compiles every vendor keyword once per process into a
+prefix-trie regex; one scan of an output returns the keyword set, which is cached per
+output so the filter builder and device-type detection share it. Vendors and a confidence
+score (share of a vendor's keywords present) are derived from that set.
+
+Semantics match the substring loops exactly, including keywords that overlap across
+vendors ('cisco ios' / 'ios xr') - the benchmark checks this on every run.
+
+Benchmark (stored `show version` outputs from capture dirs or fingerprint JSON):
+  python vendor_classifier.py capture/version fingerprints
+  python vendor_classifier.py --iterations 200
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple, Iterable, FrozenSet
+
+from device_info import DeviceType
+
+
+# Netmiko driver -> keywords, used to build TextFSM template filters (order is filter priority)
+TEXTFSM_VENDOR_PATTERNS = {
+    'cisco_ios': [
+        'cisco ios', 'cisco internetwork operating system', 'ios software',
+        'catalyst', 'c9300', 'c9200', 'c3850', 'c2960', 'ws-c'
+    ],
+    'cisco_nxos': ['nx-os', 'nexus', 'cisco nexus', 'nxos'],
+    'cisco_asa': ['adaptive security appliance', 'cisco asa', 'asa version'],
+    'cisco_xr': ['ios xr', 'cisco xr', 'asr9k', 'crs-'],
+    'arista_eos': ['arista', 'eos version', 'dcs-', 'arista dcs'],
+    'juniper_junos': ['juniper', 'junos', 'ex4200', 'mx', 'srx', 'qfx'],
+    'hp_procurve': ['hp ', 'hewlett-packard', 'procurve', 'aruba', 'hpe'],
+    'fortinet': ['fortinet', 'fortigate', 'fortios'],
+    'paloalto_panos': ['palo alto', 'pan-os', 'pa-'],
+    'dell_force10': ['dell', 'force10', 's4810', 's6000'],
+    'brocade_fastiron': ['brocade', 'fastiron', 'icx'],
+    'checkpoint_gaia': ['checkpoint', 'gaia', 'secureplatform'],
+    'ubiquiti_edgerouter': ['ubiquiti', 'edgerouter', 'unifi'],
+    'ubiquiti_edgeswitch': ['edgeswitch', 'ubnt'],
+}
+
+# DeviceType detection rules - order matters, most specific first
+DEVICE_TYPE_PATTERNS = {
+    DeviceType.CiscoASA: ['adaptive security appliance', 'cisco asa'],
+    DeviceType.CiscoNXOS: ['nx-os', 'nexus operating system', 'cisco nexus'],
+    DeviceType.CiscoIOS: ['cisco ios', 'cisco internetwork operating system', 'catalyst l3 switch', 'ios-xe'],
+    DeviceType.AristaEOS: ['arista', 'arista networks', 'dcs-', 'eos version'],
+    DeviceType.JuniperJunOS: ['juniper networks', 'junos', 'juniper'],
+    DeviceType.HPProCurve: ['hp ', 'hewlett-packard', 'procurve', 'aruba'],
+    DeviceType.FortiOS: ['fortinet', 'fortigate', 'fortios'],
+    DeviceType.PaloAltoOS: ['palo alto networks', 'pan-os'],
+    DeviceType.Linux: ['linux', 'ubuntu', 'centos', 'debian', 'redhat', 'fedora'],
+    DeviceType.FreeBSD: ['freebsd'],
+    DeviceType.Windows: ['windows', 'microsoft'],
+}
+
+# Model-number fallbacks when no keyword matched
+CISCO_IOS_MODEL_RE = re.compile(r'\bws-c\d{4}\b|\bc\d{4}\b')
+CISCO_NXOS_MODEL_RE = re.compile(r'\bn\d{4}\b')
+
+
+def _trie_regex(keywords: Iterable[str]) -> str:
+    """Regex alternation factored as a prefix trie, longest continuation first"""
+    trie: Dict = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node: Dict) -> str:
+        terminal = '' in node
+        branches = [re.escape(char) + build(child) for char, child in node.items() if char != '']
+        if not branches:
+            return ''
+        # Longer branches first so the lookahead captures the longest keyword at a position
+        branches.sort(key=len, reverse=True)
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if terminal:
+            body = '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+
+class KeywordScanner:
+    """
+    Which of a fixed keyword set occur in a text, in one regex scan.
+
+    The keywords are compiled into a prefix trie (the regex engine skips positions that
+    cannot start a keyword). A match also credits every keyword contained in it; the few
+    keywords that can start inside a match and run past its end are confirmed with a
+    direct substring check, so the result equals `{k for k in keywords if k in text}`.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = sorted({k.lower() for k in keywords if k})
+        self._regex = re.compile(_trie_regex(self.keywords))
+
+        # Keywords that can begin inside a match and end past it, found via their proper prefixes
+        by_prefix: Dict[str, List[str]] = {}
+        for keyword in self.keywords:
+            for i in range(1, len(keyword)):
+                by_prefix.setdefault(keyword[:i], []).append(keyword)
+
+        self._contained: Dict[str, Tuple[str, ...]] = {}
+        self._overlapping: Dict[str, Tuple[str, ...]] = {}
+        for keyword in self.keywords:
+            self._contained[keyword] = tuple(k for k in self.keywords if k in keyword)
+            overlapping = {k for j in range(1, len(keyword)) for k in by_prefix.get(keyword[j:], ())}
+            self._overlapping[keyword] = tuple(sorted(overlapping - set(self._contained[keyword])))
+
+    def scan(self, text_lower: str) -> Set[str]:
+        found: Set[str] = set()
+        for match in set(self._regex.findall(text_lower)):
+            found.update(self._contained[match])
+            for keyword in self._overlapping[match]:
+                if keyword not in found and keyword in text_lower:
+                    found.add(keyword)
+        return found
+
+
+class VendorClassifier:
+    """Labels (vendor / DeviceType) in priority order, from a keyword set found by KeywordScanner"""
+
+    def __init__(self, label_patterns: Dict[object, List[str]]):
+        self.labels = list(label_patterns.keys())
+        self._pattern_counts = {label: len(patterns) for label, patterns in label_patterns.items()}
+        self._labels_by_keyword: Dict[str, List[int]] = {}
+        for index, patterns in enumerate(label_patterns.values()):
+            for pattern in {p.lower() for p in patterns}:
+                self._labels_by_keyword.setdefault(pattern, []).append(index)
+
+    def classify_keywords(self, found: Iterable[str]) -> List[Tuple[object, float]]:
+        """
+        All matching labels in declaration (priority) order, each with a confidence:
+        the share of that label's keywords present in the text.
+        """
+        hits: Dict[int, int] = {}
+        for keyword in found:
+            for index in self._labels_by_keyword.get(keyword, ()):
+                hits[index] = hits.get(index, 0) + 1
+        matches = []
+        for index in sorted(hits):
+            label = self.labels[index]
+            matches.append((label, hits[index] / self._pattern_counts[label]))
+        return matches
+
+
+_scanner: Optional[KeywordScanner] = None
+_textfsm_classifier = VendorClassifier(TEXTFSM_VENDOR_PATTERNS)
+_device_type_classifier = VendorClassifier(DEVICE_TYPE_PATTERNS)
+
+
+def keyword_scanner() -> KeywordScanner:
+    """Scanner over every vendor keyword, built once per process"""
+    global _scanner
+    if _scanner is None:
+        _scanner = KeywordScanner(
+            [p for patterns in TEXTFSM_VENDOR_PATTERNS.values() for p in patterns] +
+            [p for patterns in DEVICE_TYPE_PATTERNS.values() for p in patterns])
+    return _scanner
+
+
+@lru_cache(maxsize=64)
+def scan_output(output: str) -> FrozenSet[str]:
+    """Vendor keywords present in an output - filter building and type detection share one scan"""
+    return frozenset(keyword_scanner().scan(output.lower()))
+
+
+def detect_textfsm_vendors(output: str) -> List[str]:
+    """Netmiko driver names whose keywords appear in the output, in filter priority order"""
+    return [vendor for vendor, _ in _textfsm_classifier.classify_keywords(scan_output(output))]
+
+
+def identify_device_type(output: str) -> Tuple[DeviceType, float]:
+    """DeviceType by rule priority with confidence, including the model-number fallbacks"""
+    matches = _device_type_classifier.classify_keywords(scan_output(output))
+    if matches:
+        return matches[0]
+
+    output_lower = output.lower()
+    if CISCO_IOS_MODEL_RE.search(output_lower):
+        return DeviceType.CiscoIOS, 0.1
+    if CISCO_NXOS_MODEL_RE.search(output_lower) or "nexus" in output_lower:
+        return DeviceType.CiscoNXOS, 0.1
+    return DeviceType.Unknown, 0.0
+
+
+# ===== Benchmark =====
+
+def _legacy_textfsm_vendors(output: str) -> List[str]:
+    """The per-pattern substring loop this module replaces (reference for the benchmark)"""
+    output_lower = output.lower()
+    detected = []
+    for vendor, patterns in TEXTFSM_VENDOR_PATTERNS.items():
+        for pattern in patterns:
+            if pattern in output_lower:
+                detected.append(vendor)
+                break
+    return detected
+
+
+def _legacy_device_type(output: str) -> DeviceType:
+    output_lower = output.lower()
+    for device_type, patterns in DEVICE_TYPE_PATTERNS.items():
+        if any(pattern in output_lower for pattern in patterns):
+            return device_type
+    if re.search(r'\bws-c\d{4}\b', output_lower) or re.search(r'\bc\d{4}\b', output_lower):
+        return DeviceType.CiscoIOS
+    if re.search(r'\bn\d{4}\b', output_lower) or "nexus" in output_lower:
+        return DeviceType.CiscoNXOS
+    return DeviceType.Unknown
+
+
+def load_corpus(paths: List[str]) -> List[str]:
+    """show version text from capture .txt files and fingerprint JSON command_outputs"""
+    corpus = []
+    for path in map(Path, paths):
+        files = sorted(path.rglob('*')) if path.is_dir() else [path]
+        for file in files:
+            if not file.is_file():
+                continue
+            try:
+                if file.suffix == '.json':
+                    with open(file, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                    outputs = data.get('command_outputs', {}) if isinstance(data, dict) else {}
+                    corpus.extend(v for k, v in outputs.items() if isinstance(v, str) and not k.endswith('_textfsm'))
+                elif file.suffix in ('.txt', '.log'):
+                    corpus.append(file.read_text(encoding='utf-8', errors='replace'))
+            except (OSError, ValueError):
+                continue
+    return [text for text in corpus if text]
+
+
+def run_benchmark(corpus: List[str], iterations: int):
+    def timed(fn) -> float:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for text in corpus:
+                fn(text)
+        return time.perf_counter() - start
+
+    build_start = time.perf_counter()
+    scanner = KeywordScanner(keyword_scanner().keywords)
+    build_time = time.perf_counter() - build_start
+
+    mismatches = 0
+    for text in corpus:
+        text_lower = text.lower()
+        if scanner.scan(text_lower) != {k for k in scanner.keywords if k in text_lower}:
+            mismatches += 1
+        if _legacy_textfsm_vendors(text) != detect_textfsm_vendors(text):
+            mismatches += 1
+        if _legacy_device_type(text) != identify_device_type(text)[0]:
+            mismatches += 1
+
+    def single_pass(text: str):
+        # Uncached, as for an output seen for the first time
+        scan_output.cache_clear()
+        detect_textfsm_vendors(text)
+        identify_device_type(text)
+
+    def legacy(text: str):
+        _legacy_textfsm_vendors(text)
+        _legacy_device_type(text)
+
+    calls = iterations * len(corpus)
+    total_chars = sum(len(t) for t in corpus)
+    print(f"Corpus: {len(corpus)} outputs, {total_chars / 1024:.1f} KB, {iterations} iterations")
+    print(f"Scanner build ({len(scanner.keywords)} keywords, once per process): {build_time * 1000:.2f} ms")
+    print(f"Result mismatches vs substring loops: {mismatches}")
+    print(f"{'':<28}{'legacy loops':>14}{'single pass':>14}{'speedup':>10}")
+    legacy_time = timed(legacy)
+    new_time = timed(single_pass)
+    print(f"{'filter vendors + type':<28}{legacy_time / calls * 1e6:>11.1f} us{new_time / calls * 1e6:>11.1f} us"
+          f"{legacy_time / new_time if new_time else 0:>9.1f}x")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the single-pass vendor classifier")
+    parser.add_argument('paths', nargs='*', default=['.'],
+                        help='Capture dirs/files (.txt) and fingerprint JSON files/dirs (default: .)')
+    parser.add_argument('--iterations', type=int, default=100, help='Passes over the corpus (default: 100)')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.paths)
+    if not corpus:
+        print("No show version outputs found")
+        return 1
+    return 1 if run_benchmark(corpus, args.iterations) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
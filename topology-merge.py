@@ -14,6 +14,8 @@ import math
 import networkx as nx
 import matplotlib.pyplot as plt
 
+from pcng.map_thumbnails import render_thumbnails
+
 
 class TopologyMerger:
     """CLI topology merging functionality extracted from GUI version."""
@@ -383,6 +385,12 @@ Examples:
         help='Use dark mode for SVG visualization (default: true)'
     )
 
+    parser.add_argument(
+        '--no-thumbnail',
+        action='store_true',
+        help='Do not render the web dashboard thumbnail for an SVG written under a maps/ directory'
+    )
+
     parser.add_argument(
         '-v', '--verbose',
         action='store_true',
@@ -431,6 +439,13 @@ Examples:
             merger.log(f"Generating SVG visualization: {svg_path}")
             if merger.create_network_svg(merged_topology, svg_path, args.dark_mode):
                 print(f"Generated SVG: {svg_path}")
+
+                # <maps>/<site>/<map>.svg is what the web maps view serves
+                if not args.no_thumbnail and svg_path.resolve().parent.parent.name == 'maps':
+                    merger.log("Rendering dashboard thumbnail...")
+                    thumbs = render_thumbnails([svg_path], workers=1)
+                    if thumbs['failed']:
+                        print("WARNING: Thumbnail rendering failed")
             else:
                 print("WARNING: SVG generation failed")
 